@@ -5,13 +5,26 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
+from selenium.common.exceptions import TimeoutException
 import time
 import logging
 import datetime
-import pandas as pd
-import numpy as np
+import argparse
+import csv
+import json
+import queue
+import threading
 import os
 from urllib.parse import urlparse, parse_qs, urlencode, urlunparse
+from rate_limit import AdaptiveRateLimiter
+from course_page import (
+    create_session,
+    fetch_course,
+    COURSE_TITLE_SELECTOR,
+    INSTITUTION_SELECTOR,
+    REQUIREMENTS_SELECTOR,
+    REQUIREMENT_ITEMS,
+)
 
 today = datetime.date.today().isoformat()
 
@@ -21,30 +34,202 @@ os.makedirs('./logs', exist_ok=True)
 logging.basicConfig(filename='./logs/log_'+str(today) +'.txt', level=logging.DEBUG)
 
 base_url = "https://www2.daad.de/deutschland/studienangebote/international-programmes/en/result/?cert=&admReq=&langExamPC=&langExamLC=&langExamSC=&degree%5B%5D=3&fos%5B%5D=&langDeAvailable=&langEnAvailable=&lang%5B%5D=&modStd%5B%5D=&cit%5B%5D=&tyi%5B%5D=&ins%5B%5D=&fee=&bgn%5B%5D=&dat%5B%5D=&prep_subj%5B%5D=&prep_degree%5B%5D=&sort=4&dur=&q=&limit=100&offset=100&display=list&lvlEn%5B%5D=&subjectGroup%5B%5D=&subjects%5B%5D="
-# Configure Chrome options
-options = Options()
-options.add_argument('--no-sandbox')
-options.add_argument('--disable-dev-shm-usage')
-options.add_argument('--disable-blink-features=AutomationControlled')
-options.add_experimental_option("excludeSwitches", ["enable-automation"])
-options.add_experimental_option('useAutomationExtension', False)
-
-try:
-    service = Service(ChromeDriverManager().install())
+# Page loads per second per host across ALL workers, so adding workers never
+# adds load on daad.de. The rate starts at REQUESTS_PER_SECOND, creeps up to
+# MAX_REQUESTS_PER_SECOND while pages load quickly and halves after an error
+# or a page slower than SLOW_PAGE_SECONDS.
+REQUESTS_PER_SECOND = 1.0
+MAX_REQUESTS_PER_SECOND = 3.0
+SLOW_PAGE_SECONDS = 5.0
+PAGE_LOAD_TIMEOUT = 30
+politeness = AdaptiveRateLimiter(rate=REQUESTS_PER_SECOND, max_rate=MAX_REQUESTS_PER_SECOND,
+                                 slow_seconds=SLOW_PAGE_SECONDS)
+
+# Course links of a listing page, and what DAAD shows instead once the
+# offset is past the last course
+COURSE_LINK_SELECTOR = ".list-inline-item.mr-0.js-course-detail-link"
+NO_RESULTS_SELECTOR = ".js-no-results, .c-result-list__no-results"
+NO_RESULTS = "no results"
+# Loads of a listing page before a crawl gives up on it
+LISTING_ATTEMPTS = 3
+
+# What the old fixed sleeps cost: per listing page, per course and once per crawl
+FIXED_SLEEP_SECONDS = {'listing_page': 3 + 3 + 3, 'course': 2, 'crawl': 3 + 2}
+
+_driver_path = None
+_driver_path_lock = threading.Lock()
+
+
+def get_driver_path():
+    """Download/locate chromedriver once (workers start their drivers concurrently)"""
+    global _driver_path
+    with _driver_path_lock:
+        if _driver_path is None:
+            _driver_path = ChromeDriverManager().install()
+        return _driver_path
+
+
+def create_driver(headless=True):
+    """Start a Chrome instance; returns (driver, wait)"""
+    # Configure Chrome options
+    options = Options()
+    if headless:
+        options.add_argument('--headless=new')
+    options.add_argument('--no-sandbox')
+    options.add_argument('--disable-dev-shm-usage')
+    options.add_argument('--disable-blink-features=AutomationControlled')
+    options.add_experimental_option("excludeSwitches", ["enable-automation"])
+    options.add_experimental_option('useAutomationExtension', False)
+
+    service = Service(get_driver_path())
     driver = webdriver.Chrome(service=service, options=options)
-    wait = WebDriverWait(driver, 10)
-    print("✓ Chrome driver initialized successfully")
-except Exception as e:
-    print(f"✗ Failed to initialize Chrome driver: {e}")
-    logging.critical(f"Driver initialization failed: {e}", exc_info=True)
-    exit(1)
+    driver.set_page_load_timeout(PAGE_LOAD_TIMEOUT)
+    return driver, WebDriverWait(driver, 10)
+
+
+def polite_get(driver, url):
+    """
+    Load a page once the host's rate limit allows it
+    
+    The load time (or failure) is fed back to the adaptive rate limiter.
+    
+    Returns:
+        Seconds the page took to load (not counting the rate-limit wait)
+    """
+    politeness.acquire(url)
+    started = time.perf_counter()
+    try:
+        driver.get(url)
+    except Exception:
+        politeness.record(url, time.perf_counter() - started, ok=False)
+        raise
+    seconds = time.perf_counter() - started
+    politeness.record(url, seconds)
+    return seconds
+
 
 params = ["course", "institution", "url", "admission req",
           "language req", "deadline"]
 cols = ["course", "institution", "url", "admission req",
         "language req", "deadline"]
 
-final_data = []
+# Reads all course fields at once: arguments are the title, institution and
+# requirements selectors plus REQUIREMENT_ITEMS. Returns null until the
+# course header exists.
+EXTRACT_COURSE_SCRIPT = """
+const [titleSelector, institutionSelector, requirementsSelector, requirementItems] = arguments;
+const title = document.querySelector(titleSelector);
+if (!title) {
+    return null;
+}
+const institution = document.querySelector(institutionSelector);
+const requirements = {};
+for (const [column, child] of Object.entries(requirementItems)) {
+    const items = document.querySelectorAll(requirementsSelector.replace('{}', child));
+    requirements[column] = items.length ? Array.from(items, item => item.innerText).join('\\n') : null;
+}
+return {
+    course: title.innerText,
+    institution: institution ? institution.innerHTML : null,
+    requirements: requirements
+};
+"""
+
+# Output files (rows are streamed to the .jsonl as they are scraped)
+OUTPUT_DIR = './PHD'
+OUTPUT_NAME = "PHD Informatik Course List for Summer 2023 - Tuition Free"
+
+
+class JsonlSink:
+    """
+    Append-only JSONL file of scraped rows (thread-safe)
+    
+    Each line is {"index": position in the link list, "url": ..., "row": {...}},
+    flushed immediately so a crash loses at most the page in progress.
+    """
+    
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self.written = 0
+    
+    def reset(self):
+        """Start an empty file"""
+        open(self.path, 'w', encoding='utf-8').close()
+    
+    def visited_urls(self):
+        """URLs already in the file (skipped on --resume)"""
+        visited = set()
+        if not os.path.exists(self.path):
+            return visited
+        line = "\n"
+        with open(self.path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    visited.add(json.loads(line)['url'])
+                except (ValueError, KeyError):
+                    continue  # Half-written last line of a crashed run
+        if not line.endswith("\n"):
+            # Terminate the half-written line so new rows start on their own line
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write("\n")
+        return visited
+    
+    def write(self, index, url, row):
+        line = json.dumps({'index': index, 'url': url, 'row': dict(zip(cols, row))}, ensure_ascii=False)
+        with self._lock:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(line + "\n")
+            self.written += 1
+
+
+class CrawlCheckpoint:
+    """
+    Listing progress of a crawl: completed listing offsets and the course
+    links found so far, saved atomically after every listing page
+    """
+    
+    def __init__(self, path, url):
+        self.path = path
+        self.url = url
+        self.completed_offsets = []
+        self.links = []
+        self.listing_done = False
+    
+    def load(self):
+        """Load a previous run's checkpoint (returns False if there is none)"""
+        if not os.path.exists(self.path):
+            return False
+        with open(self.path, encoding='utf-8') as f:
+            state = json.load(f)
+        if state.get('base_url') != self.url:
+            raise ValueError("Checkpoint was written for a different base_url, run without --resume")
+        self.completed_offsets = state['completed_offsets']
+        self.links = state['links']
+        self.listing_done = state['listing_done']
+        return True
+    
+    def add_page(self, offset, page_links):
+        """Record a finished listing page"""
+        known = set(self.links)
+        self.links.extend(link for link in page_links if link not in known)
+        self.completed_offsets.append(offset)
+        self.save()
+    
+    def finish_listing(self):
+        self.listing_done = True
+        self.save()
+    
+    def save(self):
+        temp_path = self.path + ".tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'base_url': self.url,
+                'completed_offsets': self.completed_offsets,
+                'links': self.links,
+                'listing_done': self.listing_done
+            }, f)
+        os.replace(temp_path, self.path)
 
 
 def build_url_with_offset(offset):
@@ -71,85 +256,87 @@ def build_url_with_offset(offset):
     return new_url
 
 
-def accept_cookies():
+def accept_cookies(wait):
     try:
         wait.until(EC.element_to_be_clickable((
             By.CSS_SELECTOR, "button.qa-cookie-consent-accept-selected"))).click()
+        # Ready once the banner is gone
+        wait.until(EC.invisibility_of_element_located((
+            By.CSS_SELECTOR, "button.qa-cookie-consent-accept-selected")))
         print("✓ Cookies accepted")
-        time.sleep(2)
     except Exception as e:
         print(f"No cookie banner found or already accepted")
 
 
-def get_links_from_current_page():
-    """Get all course links from the current page"""
-    try:
-        time.sleep(3)  # Wait for page to load
-        links = wait.until(EC.presence_of_all_elements_located(
-            (By.CSS_SELECTOR, ".list-inline-item.mr-0.js-course-detail-link")))
-        return [link.get_attribute("href") for link in links]
-    except Exception as e:
-        print(f"Error getting links from page: {e}")
-        logging.error(f"Error getting links: {e}", exc_info=True)
-        return []
+class ListingPageTimeout(Exception):
+    """A listing page showed neither course links nor a "no results" message"""
 
 
-def check_if_page_has_results():
-    """Check if the current page has any results"""
-    try:
-        # Look for the "no results" message or check if links exist
-        links = driver.find_elements(By.CSS_SELECTOR, ".list-inline-item.mr-0.js-course-detail-link")
-        return len(links) > 0
-    except Exception as e:
+def get_links_from_current_page(wait):
+    """
+    Get all course links from the current page (waits for them to render)
+    
+    Returns:
+        The links, or [] if the page says there are no results
+    
+    Raises:
+        TimeoutException: Neither rendered before the wait ran out
+    """
+    def listing_rendered(driver):
+        links = driver.find_elements(By.CSS_SELECTOR, COURSE_LINK_SELECTOR)
+        if links:
+            return [link.get_attribute("href") for link in links]
+        if driver.find_elements(By.CSS_SELECTOR, NO_RESULTS_SELECTOR):
+            return NO_RESULTS
         return False
+    
+    links = wait.until(listing_rendered)
+    return [] if links is NO_RESULTS else links
 
 
-def textcombiner(targetIndex):
-    all_text = []
-    try:
-        reqs = wait.until(EC.presence_of_all_elements_located((
-            By.CSS_SELECTOR, "#registration > .container > .c-description-list > *:nth-child("+targetIndex+") > *")))
-        for p in reqs:
-            all_text.append(p.get_attribute('innerText'))
-        return "\n".join(all_text)
-    except Exception as e:
-        return "N/A"
-
-
-def paramData(param, item_link):
+def extract_course(wait, item_link):
+    """
+    Read every field of the loaded course page in one execute_script call
+    
+    The script returns null until the course header has rendered, so the
+    wait polls it as the readiness check; a ready page costs a single
+    WebDriver round trip.
+    
+    Returns:
+        The course row in `params` order, with "N/A" for missing fields
+    """
     try:
-        if param == "course":
-            return wait.until(EC.presence_of_element_located((
-                By.CSS_SELECTOR, "h2.c-detail-header__title > span:nth-child(1)"))).get_attribute('innerText')
-        if param == "institution":
-            return wait.until(EC.presence_of_element_located((
-                By.CSS_SELECTOR, "h3.c-detail-header__subtitle"))).get_attribute('innerHTML').splitlines()[1].strip()
-        if param == "url":
-            return item_link
-        if param == 'admission req':
-            return textcombiner("2")
-        if param == 'language req':
-            return textcombiner("4")
-        if param == 'deadline':
-            return textcombiner("6")
-    except Exception as e:
-        print(f'Error extracting {param}: {e}')
-        logging.error(f"Error extracting {param} from {item_link}: {e}", exc_info=True)
-        return "N/A"
+        page = wait.until(lambda driver: driver.execute_script(
+            EXTRACT_COURSE_SCRIPT, COURSE_TITLE_SELECTOR, INSTITUTION_SELECTOR,
+            REQUIREMENTS_SELECTOR, REQUIREMENT_ITEMS))
+    except TimeoutException:
+        print(f"    ✗ Course header never rendered")
+        logging.error(f"Course header never rendered on {item_link}")
+        page = {'requirements': {}}
+    
+    institution_lines = (page.get('institution') or '').splitlines()
+    fields = {
+        'course': page.get('course') or "N/A",
+        'institution': institution_lines[1].strip() if len(institution_lines) > 1 else "N/A",
+        'url': item_link,
+    }
+    for column in REQUIREMENT_ITEMS:
+        fields[column] = page['requirements'].get(column) or "N/A"
+    return [fields[param] for param in params]
 
 
-def scrape_course(item_link, index, total):
+def scrape_course(driver, wait, item_link, index, total):
     """Scrape a single course page"""
     try:
         print(f"  [{index}/{total}] Visiting: {item_link}")
-        driver.get(item_link)
-        time.sleep(2)
-
-        dataFromURL = []
-        for param in params:
-            dataFromURL.append(paramData(param, item_link))
-
-        print(f"    ✓ Extracted: {dataFromURL[0]}")
+        navigation_seconds = polite_get(driver, item_link)
+        
+        started = time.perf_counter()
+        dataFromURL = extract_course(wait, item_link)
+        extraction_seconds = time.perf_counter() - started
+        
+        print(f"    ✓ Extracted: {dataFromURL[0]} (navigation {navigation_seconds:.2f}s, extraction {extraction_seconds:.2f}s)")
+        logging.info(f"Timing {item_link}: navigation {navigation_seconds:.3f}s, extraction {extraction_seconds:.3f}s")
         return dataFromURL
         
     except Exception as e:
@@ -158,8 +345,39 @@ def scrape_course(item_link, index, total):
         return None
 
 
-def scrape_page(page_number, offset):
-    """Scrape all courses from a single page"""
+def scrape_course_http(session, item_link, index, total):
+    """
+    Scrape a single course page over HTTP (no browser)
+    
+    Returns:
+        The course row, or None if the page needs JavaScript or failed to
+        load (the caller falls back to Selenium)
+    """
+    try:
+        print(f"  [{index}/{total}] Fetching: {item_link}")
+        politeness.acquire(item_link)
+        started = time.perf_counter()
+        try:
+            dataFromURL = fetch_course(session, item_link)
+        except Exception:
+            politeness.record(item_link, time.perf_counter() - started, ok=False)
+            raise
+        politeness.record(item_link, time.perf_counter() - started)
+        if dataFromURL is None:
+            print(f"    ➜ Needs a browser, falling back to Selenium")
+            return None
+        
+        print(f"    ✓ Extracted: {dataFromURL[0]}")
+        return dataFromURL
+    
+    except Exception as e:
+        print(f'    ✗ HTTP error, falling back to Selenium: {e}')
+        logging.error(f"HTTP fetch failed for {item_link}: {e}", exc_info=True)
+        return None
+
+
+def scrape_page(driver, wait, page_number, offset):
+    """Collect the course links of a single listing page"""
     print(f"\n{'='*60}")
     print(f"SCRAPING PAGE {page_number} (offset={offset})")
     print(f"{'='*60}")
@@ -168,93 +386,316 @@ def scrape_page(page_number, offset):
     page_url = build_url_with_offset(offset)
     print(f"  URL: {page_url}")
     
-    # Navigate to the page
-    driver.get(page_url)
-    time.sleep(3)
-    
-    # Check if page has results
-    if not check_if_page_has_results():
-        print(f"  ✗ No results found on this page")
-        return 0, False  # Return 0 courses and False to indicate no more pages
-    
-    # Get all links from current page
-    links = get_links_from_current_page()
+    for attempt in range(1, LISTING_ATTEMPTS + 1):
+        polite_get(driver, page_url)
+        try:
+            links = get_links_from_current_page(wait)
+            break
+        except TimeoutException:
+            print(f"  ⏱️  Page {page_number} did not render (attempt {attempt}/{LISTING_ATTEMPTS})")
+            logging.warning(f"Listing page {page_url} did not render (attempt {attempt})")
+    else:
+        # Not checkpointed: a --resume run loads this page again
+        raise ListingPageTimeout(f"Listing page {page_number} (offset={offset}) did not render "
+                                 f"after {LISTING_ATTEMPTS} attempts")
     
     if not links:
-        print(f"  ✗ No links found on page {page_number}")
-        return 0, False
+        print(f"  ✗ No results found on page {page_number}")
+        return []
     
     print(f"  ✓ Found {len(links)} courses on page {page_number}")
+    return links
+
+
+def collect_links(driver, wait, checkpoint, limit=100):
+    """
+    Walk the listing pages by offset and collect every course link
+    
+    Pages whose offset is already in the checkpoint are skipped; each new
+    page is checkpointed as soon as its links are read. The listing is only
+    marked done on a page that says there are no results; a page that never
+    renders raises ListingPageTimeout instead.
+    
+    Returns:
+        Course links in listing order (duplicates removed)
+    """
+    page_number = 1
+    offset = 0
+    
+    while True:
+        if offset in checkpoint.completed_offsets:
+            print(f"  ⏭️  Page {page_number} (offset={offset}) already collected")
+        else:
+            page_links = scrape_page(driver, wait, page_number, offset)
+            
+            # Past the last page, stop
+            if not page_links:
+                checkpoint.finish_listing()
+                print(f"\n✓ No more results available. Found {len(checkpoint.links)} courses on {page_number - 1} pages.")
+                break
+            
+            checkpoint.add_page(offset, page_links)
+        
+        # Move to next page
+        page_number += 1
+        offset += limit
+        print(f"\n➜ Moving to page {page_number}...")
+    
+    return checkpoint.links
+
+
+def scrape_courses(links, on_row, workers=4, headless=True, use_http=True, skip_urls=()):
+    """
+    Scrape course detail pages on a pool of workers
+    
+    Each worker reads pages over a keep-alive HTTP session first and only
+    starts its own Chrome driver when a page needs JavaScript. Workers take
+    the next link from a shared queue; every page load goes through the
+    per-host adaptive rate limit.
+    
+    Args:
+        links: All course links (a row's index is its position here)
+        on_row: Called as on_row(index, link, row) from the worker threads
+                for every scraped course
+        workers: Number of workers
+        headless: Run Chrome without a window
+        use_http: Try the browserless HTTP path before Selenium
+        skip_urls: Links that were already scraped (--resume)
+    
+    Returns:
+        worker_stats - worker number -> courses, errors, missing_fields
+        (fields that came back as N/A), http/browser page counts and seconds
+    """
+    tasks = queue.Queue()
+    for index, link in enumerate(links):
+        if link not in skip_urls:
+            tasks.put((index, link))
+    pending = tasks.qsize()
     
-    # Scrape each course on this page
-    courses_scraped = 0
-    for i, link in enumerate(links, 1):
-        result = scrape_course(link, i, len(links))
-        if result:
-            final_data.append(result)
-            courses_scraped += 1
-        time.sleep(2)  # Delay between courses
+    worker_stats = {}
+    
+    def worker(worker_id):
+        stats = {'courses': 0, 'errors': 0, 'missing_fields': 0, 'http': 0, 'browser': 0, 'seconds': 0.0}
+        worker_stats[worker_id] = stats
+        started = time.perf_counter()
+        session = create_session() if use_http else None
+        driver = wait = None
+        browser_failed = False
         
-        # Go back to listing page
-        driver.get(page_url)
-        time.sleep(2)
+        try:
+            while True:
+                try:
+                    index, link = tasks.get_nowait()
+                except queue.Empty:
+                    break
+                
+                row = None
+                if session is not None:
+                    row = scrape_course_http(session, link, index + 1, len(links))
+                    if row:
+                        stats['http'] += 1
+                
+                if row is None and not browser_failed:
+                    # Chrome only starts once a page actually needs it
+                    if driver is None:
+                        try:
+                            driver, wait = create_driver(headless)
+                        except Exception as e:
+                            print(f"✗ Worker {worker_id} failed to start Chrome: {e}")
+                            logging.critical(f"Driver initialization failed in worker {worker_id}: {e}", exc_info=True)
+                            browser_failed = True
+                    if driver is not None:
+                        row = scrape_course(driver, wait, link, index + 1, len(links))
+                        if row:
+                            stats['browser'] += 1
+                
+                if row:
+                    on_row(index, link, row)
+                    stats['courses'] += 1
+                    stats['missing_fields'] += row.count("N/A")
+                else:
+                    stats['errors'] += 1
+        finally:
+            if driver is not None:
+                driver.quit()
+            if session is not None:
+                session.close()
+            stats['seconds'] = time.perf_counter() - started
     
-    print(f"\n  ✓ Completed page {page_number}: {courses_scraped}/{len(links)} courses scraped")
-    print(f"  Total courses so far: {len(final_data)}")
+    threads = [
+        threading.Thread(target=worker, args=(worker_id,), name=f"scraper-{worker_id}")
+        for worker_id in range(1, max(1, min(workers, pending)) + 1)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
     
-    # Return True if we got results (there might be more pages)
-    return courses_scraped, True
+    return worker_stats
+
 
+def report_worker_stats(worker_stats):
+    """Print throughput and error counts per worker"""
+    print(f"\n{'='*60}")
+    print("WORKER STATS")
+    print(f"{'='*60}")
+    for worker_id, stats in sorted(worker_stats.items()):
+        rate = stats['courses'] / stats['seconds'] if stats['seconds'] else 0.0
+        line = (f"  Worker {worker_id}: {stats['courses']} courses ({stats['http']} http, "
+                f"{stats['browser']} browser), {stats['errors']} errors, {stats['missing_fields']} missing fields, "
+                f"{stats['seconds']:.1f}s ({rate:.2f} courses/sec)")
+        print(line)
+        logging.info(line)
 
-def exportCSV():
-    os.makedirs('./PHD', exist_ok=True)
-    filename = "PHD Informatik Course List for Summer 2023 - Tuition Free"
-    df2 = pd.DataFrame(np.array(final_data), columns=cols)
+
+def report_crawl_time(elapsed, listing_pages, listing_seconds, worker_stats):
+    """
+    Print where the crawl's time went: waiting on the rate limiter (sleep)
+    versus loading and extracting pages (work), per host rate control, and
+    what the old fixed sleeps would have added on top
+    """
+    hosts = politeness.stats()
+    thread_seconds = listing_seconds + sum(stats['seconds'] for stats in worker_stats.values())
+    sleep_seconds = sum(host['waited'] for host in hosts.values())
+    work_seconds = max(0.0, thread_seconds - sleep_seconds)
+    browser_courses = sum(stats['browser'] for stats in worker_stats.values())
+    fixed_sleeps = (listing_pages * FIXED_SLEEP_SECONDS['listing_page']
+                    + browser_courses * FIXED_SLEEP_SECONDS['course']
+                    + (FIXED_SLEEP_SECONDS['crawl'] if listing_pages else 0))
+    
+    lines = [
+        f"  Wall time: {elapsed:.1f}s (listing {listing_seconds:.1f}s, {listing_pages} pages)",
+        f"  Thread time: {thread_seconds:.1f}s = {sleep_seconds:.1f}s rate-limit sleep "
+        f"({sleep_seconds / thread_seconds * 100 if thread_seconds else 0.0:.0f}%) + {work_seconds:.1f}s work",
+        f"  Old fixed sleeps would have added: {fixed_sleeps:.0f}s of thread time",
+    ]
+    for host, stats in sorted(hosts.items()):
+        lines.append(f"  {host}: {stats['requests']} requests, {stats['errors']} errors, {stats['slow']} slow, "
+                     f"rate now {stats['rate']:.2f}/s, {stats['waited']:.1f}s waiting, "
+                     f"{stats['response_seconds']:.1f}s in responses")
+    
+    print(f"\n{'='*60}")
+    print("CRAWL TIME")
+    print(f"{'='*60}")
+    for line in lines:
+        print(line)
+        logging.info(line)
+
+
+def export_csv(jsonl_path, csv_path):
+    """
+    Stream the JSONL rows into the final CSV in listing order
+    
+    Only (index, file offset) pairs are held in memory; rows are read back
+    one at a time. Returns the number of rows written.
+    """
+    positions = {}
+    with open(jsonl_path, 'rb') as f:
+        while True:
+            position = f.tell()
+            line = f.readline()
+            if not line:
+                break
+            try:
+                index = json.loads(line)['index']
+            except (ValueError, KeyError):
+                continue
+            positions.setdefault(index, position)
+    
     print("\n" + "="*60)
     print("PREVIEW OF SCRAPED DATA:")
     print("="*60)
-    print(df2.head(10))
+    
+    with open(jsonl_path, 'rb') as source, open(csv_path, 'w', newline='', encoding='utf-8-sig') as target:
+        writer = csv.writer(target)
+        writer.writerow(cols)
+        for count, index in enumerate(sorted(positions)):
+            source.seek(positions[index])
+            row = json.loads(source.readline())['row']
+            writer.writerow([row.get(col, "N/A") for col in cols])
+            if count < 10:
+                print(f"  {index:>5}  {row.get('course')} | {row.get('institution')}")
+    
     print("="*60)
-    df2.to_csv("./PHD/"+filename+".csv", encoding='utf-8-sig', index=False)
-    print(f"\n✓ Saved {len(final_data)} courses to ./PHD/{filename}.csv")
+    print(f"\n✓ Saved {len(positions)} courses to {csv_path}")
+    return len(positions)
 
 
 def main():
+    arg_parser = argparse.ArgumentParser(description="Scrape DAAD international programmes")
+    arg_parser.add_argument("--workers", type=int, default=4, help="Chrome instances scraping detail pages")
+    arg_parser.add_argument("--rate", type=float, default=REQUESTS_PER_SECOND,
+                            help="Starting page loads per second per host across all workers")
+    arg_parser.add_argument("--max-rate", type=float, default=MAX_REQUESTS_PER_SECOND,
+                            help="Page loads per second the rate may rise to while pages load quickly")
+    arg_parser.add_argument("--show-browser", action="store_true", help="Run Chrome with a window")
+    arg_parser.add_argument("--browser-only", action="store_true",
+                            help="Read detail pages with Selenium only (skip the HTTP fast path)")
+    arg_parser.add_argument("--resume", action="store_true",
+                            help="Continue the previous crawl, skipping listing pages and courses already done")
+    args = arg_parser.parse_args()
+    
+    global politeness
+    politeness = AdaptiveRateLimiter(rate=args.rate, max_rate=max(args.rate, args.max_rate),
+                                     slow_seconds=SLOW_PAGE_SECONDS)
+    headless = not args.show_browser
+    
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    output_path = os.path.join(OUTPUT_DIR, OUTPUT_NAME)
+    sink = JsonlSink(output_path + ".jsonl")
+    checkpoint = CrawlCheckpoint(output_path + ".checkpoint.json", base_url)
+    
+    links = []
+    visited = set()
+    worker_stats = {}
+    listing_pages = 0
+    listing_seconds = 0.0
+    started = time.perf_counter()
     try:
         print("\n" + "="*60)
         print("DAAD COURSE SCRAPER - URL-BASED PAGINATION")
         print("="*60)
         print(f"Base URL: {base_url}\n")
         
-        # Load initial page and accept cookies
-        driver.get(base_url)
-        print("✓ Initial page loaded")
-        time.sleep(3)
-        accept_cookies()
-        
-        # Scrape page by page using offset
-        page_number = 1
-        offset = 0
-        limit = 100  # Results per page
+        if args.resume and checkpoint.load():
+            visited = sink.visited_urls()
+            print(f"↻ Resuming: {len(checkpoint.completed_offsets)} listing pages and {len(visited)} courses already done")
+        else:
+            sink.reset()
+            checkpoint.save()
         
-        while True:
-            # Scrape current page
-            courses_on_page, has_results = scrape_page(page_number, offset)
+        # Collect every course link first, then fan the detail pages out
+        if not checkpoint.listing_done:
+            try:
+                driver, wait = create_driver(headless)
+                print("✓ Chrome driver initialized successfully")
+            except Exception as e:
+                print(f"✗ Failed to initialize Chrome driver: {e}")
+                logging.critical(f"Driver initialization failed: {e}", exc_info=True)
+                return
             
-            # If no results found, stop
-            if not has_results or courses_on_page == 0:
-                print(f"\n✓ No more results available. Completed scraping.")
-                break
-            
-            # Move to next page
-            page_number += 1
-            offset += limit
-            print(f"\n➜ Moving to page {page_number}...")
-            time.sleep(3)
+            listing_started = time.perf_counter()
+            pages_before = len(checkpoint.completed_offsets)
+            try:
+                polite_get(driver, base_url)
+                print("✓ Initial page loaded")
+                accept_cookies(wait)
+                collect_links(driver, wait, checkpoint)
+            finally:
+                driver.quit()
+                # Every new listing page plus the empty one that ended the listing
+                listing_pages = len(checkpoint.completed_offsets) - pages_before + int(checkpoint.listing_done)
+                listing_seconds = time.perf_counter() - listing_started
+        links = checkpoint.links
+        
+        pending = sum(1 for link in links if link not in visited)
+        print(f"\n➜ Scraping {pending} of {len(links)} courses with {args.workers} workers...")
+        worker_stats = scrape_courses(links, sink.write, args.workers, headless,
+                                      use_http=not args.browser_only, skip_urls=visited)
         
         # Export results
-        if final_data:
-            exportCSV()
+        if sink.written or visited:
+            export_csv(sink.path, output_path + ".csv")
         else:
             print("\n✗ No data was scraped")
             
@@ -262,13 +703,16 @@ def main():
         print(f"\n✗ Critical error in main: {e}")
         logging.critical(e, exc_info=True)
     finally:
+        if worker_stats:
+            report_worker_stats(worker_stats)
+        report_crawl_time(time.perf_counter() - started, listing_pages, listing_seconds, worker_stats)
         print(f'\n{"="*60}')
         print(f"SCRAPING COMPLETED")
-        print(f"Total pages scraped: {page_number}")
-        print(f"Total courses scraped: {len(final_data)}")
+        print(f"Total courses found: {len(links)}")
+        print(f"Courses scraped this run: {sink.written} (+{len(visited)} from earlier runs)")
+        print(f"Total time: {time.perf_counter() - started:.1f}s")
         print("="*60)
-        driver.quit()
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -1,26 +1,205 @@
 from dotenv import load_dotenv
 load_dotenv()
-from flask import Flask, request, jsonify
+from flask import Flask, Request, request, jsonify, Response, stream_with_context
 from flask_cors import CORS
+from werkzeug.exceptions import HTTPException, RequestEntityTooLarge
+import io
 import os
-from document_parser import DocumentParser
+import json
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from document_parser import (
+    DocumentParser,
+    DocumentTooLarge,
+    merge_parsed_documents,
+    MAX_REQUEST_BYTES,
+    PARSE_CHAR_LIMIT,
+    SPOOL_THRESHOLD_BYTES,
+)
 from rag_pipeline import DAADCourseRAG
+from warmup import ComponentWarmup, ComponentNotReady
+from recommendations import build_recommendations
+from formatting import format_line, format_response
+from session_store import create_session_store
+from llm_client import LLMUnavailable, get_llm_client
+
+class UploadRequest(Request):
+    """
+    Request that spools large multipart uploads to named temporary files
+    
+    Small bodies stay in memory; bigger ones go to disk so DocumentParser can
+    read them in place (memory-mapped) instead of copying them into memory.
+    """
+    
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        if total_content_length is None or total_content_length > SPOOL_THRESHOLD_BYTES:
+            return tempfile.NamedTemporaryFile("wb+", prefix="upload_")
+        return io.BytesIO()
 
 app = Flask(__name__)
+app.request_class = UploadRequest
+
+# Whole request bodies larger than this are rejected with 413 before they are read
+app.config['MAX_CONTENT_LENGTH'] = MAX_REQUEST_BYTES
 
 CORS(app)
 
-parser = DocumentParser()
-rag = DAADCourseRAG()
-rag.load_courses_to_db()
+# Heavy components load on a background thread so the port binds immediately;
+# requests that arrive early wait for them (up to WARMUP_TIMEOUT seconds).
+# Nothing starts at import: spawned extraction workers re-import this module,
+# and pre-forked server workers start their own warm-up on first use.
+warmup = ComponentWarmup(timeout=float(os.getenv("WARMUP_TIMEOUT", "120")))
+warmup.register('parser', DocumentParser)
+warmup.register('rag', DAADCourseRAG)
+# Only one server process writes the course sync; the others wait and read
+warmup.register('courses', lambda: warmup.get('rag').sync_courses_once())
+
+def get_parser():
+    """Document parser (waits for warm-up)"""
+    return warmup.get('parser')
+
+def get_rag():
+    """RAG pipeline with courses loaded (waits for warm-up)"""
+    warmup.get('courses')
+    return warmup.get('rag')
+
+@app.errorhandler(ComponentNotReady)
+def component_not_ready(e):
+    """Service is still warming up (or a component failed to load)"""
+    print(f"⏳ {str(e)}")
+    return jsonify({
+        'success': False,
+        'error': f'Service is starting up, please retry shortly ({str(e)})'
+    }), 503
+
+@app.errorhandler(RequestEntityTooLarge)
+@app.errorhandler(DocumentTooLarge)
+def upload_too_large(e):
+    """Upload exceeds the configured request, file or page size limits"""
+    message = e.description if isinstance(e, HTTPException) else str(e)
+    print(f"🚫 Upload rejected: {message}")
+    return jsonify({
+        'success': False,
+        'error': f'Upload too large: {message}'
+    }), 413
+
+@app.errorhandler(LLMUnavailable)
+def llm_unavailable(e):
+    """Gemini is throttled, overloaded or failing (circuit breaker open)"""
+    print(f"⏳ {str(e)}")
+    return jsonify({
+        'success': False,
+        'error': 'The AI service is busy, please retry shortly'
+    }), 503
+
+# Saved applications; the default SQLite backend is shared by all worker processes
+user_sessions = create_session_store()
+
+# Upload field -> (label used in logs, icon), in the order results are merged
+DOCUMENT_TYPES = [
+    ('transcript', 'TRANSCRIPT', '📄'),
+    ('cv', 'CV/RESUME', '📄'),
+    ('degree', 'DEGREE CERTIFICATE', '📜'),
+    ('language_cert', 'LANGUAGE CERTIFICATE', '🌍'),
+]
+
+# Max documents extracted/parsed at the same time per request
+PARSE_WORKERS = int(os.getenv("PARSE_WORKERS", "4"))
+
+# 'per_document' sends one Gemini request per document, 'batch' packs documents
+# into as few requests as BATCH_PROMPT_CHAR_BUDGET allows (can be overridden per
+# request with a parse_mode form field)
+PARSE_MODE = os.getenv("PARSE_MODE", "per_document")
+
+def extract_and_parse(parser, doc_type, label, icon, file, parse=True):
+    """
+    Extract text from one upload and (optionally) parse it with Gemini
+    
+    Returns:
+        (text, content_digest, parsed) - text is None if nothing could be
+        extracted, parsed is None if parsing failed or was skipped
+    """
+    print(f"\n{icon} Processing {label}...")
+    print(f"Filename: {file.filename}")
+    print(f"Content-Type: {file.content_type}")
+    
+    try:
+        # Gemini only ever sees the first PARSE_CHAR_LIMIT characters, so stop there
+        text, content_digest = parser.extract_document(file, file.filename, char_budget=PARSE_CHAR_LIMIT)
+        
+        if not text or len(text) <= 50:
+            print(f"⚠️  No text extracted from {doc_type}")
+            return None, None, None
+        print(f"✅ Extracted {len(text)} characters from {doc_type}")
+    except DocumentTooLarge:
+        raise
+    except Exception as e:
+        print(f"❌ Error processing {doc_type}: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return None, None, None
+    
+    if not parse:
+        return text, content_digest, None
+    
+    print(f"\n--- Parsing {doc_type} ---")
+    try:
+        parsed = parser.parse_any_document(text, doc_type, content_digest=content_digest)
+        if parsed:
+            print(f"✅ Successfully parsed {doc_type}")
+        else:
+            print(f"⚠️  Failed to parse {doc_type}")
+        return text, content_digest, parsed
+    except LLMUnavailable:
+        raise
+    except Exception as e:
+        print(f"❌ Error parsing {doc_type}: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return text, content_digest, None
 
-user_sessions = {}
+def parse_batch(parser, results):
+    """
+    Parse all extracted documents in as few Gemini requests as possible (batch mode)
+    
+    Returns:
+        (results, merged) - results with their parsed JSON filled in and the
+        merged profile from parse_documents_batch (None if nothing was parsed)
+    """
+    documents = [
+        (doc_type, text, content_digest)
+        for doc_type, (text, content_digest, _) in results
+        if text is not None
+    ]
+    if not documents:
+        return results, None
+    
+    try:
+        batch = parser.parse_documents_batch(documents, max_workers=PARSE_WORKERS)
+    except LLMUnavailable:
+        raise
+    except Exception as e:
+        print(f"❌ Error parsing documents: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return results, None
+    
+    print(f"✅ Parsed {len(documents)} documents with {batch['requests']} Gemini requests ({batch['mode']})")
+    results = [
+        (doc_type, (text, content_digest, batch['documents'].get(doc_type) if text is not None else None))
+        for doc_type, (text, content_digest, _) in results
+    ]
+    return results, batch['merged']
 
 @app.route('/api/parse-documents', methods=['POST'])
 def parse_documents():
     """
     Parse uploaded documents and extract data
+    
+    Documents are extracted and parsed concurrently; results are merged in
+    DOCUMENT_TYPES order so the output does not depend on which finishes first.
     """
+    parser = get_parser()
     try:
         print("\n" + "="*60)
         print("📥 NEW DOCUMENT PARSING REQUEST")
@@ -42,145 +221,51 @@ def parse_documents():
             'raw_documents': {}
         }
         
-        # Process each document type
-        documents_to_parse = []
+        uploads = [
+            (doc_type, label, icon, files[doc_type])
+            for doc_type, label, icon in DOCUMENT_TYPES
+            if doc_type in files
+        ]
         
-        # Transcript
-        if 'transcript' in files:
-            print("\n📄 Processing TRANSCRIPT...")
-            file = files['transcript']
-            print(f"Filename: {file.filename}")
-            print(f"Content-Type: {file.content_type}")
-            
-            try:
-                text = parser.extract_text(file, file.filename)
-                
-                if text and len(text) > 50:
-                    documents_to_parse.append(('transcript', text))
-                    extracted_data['raw_documents']['transcript'] = text[:500]
-                    print(f"✅ Extracted {len(text)} characters from transcript")
-                else:
-                    print("⚠️  No text extracted from transcript")
-            except Exception as e:
-                print(f"❌ Error processing transcript: {str(e)}")
-                import traceback
-                traceback.print_exc()
+        parse_mode = request.form.get('parse_mode', PARSE_MODE)
+        batch_mode = parse_mode == 'batch'
         
-        # CV/Resume
-        if 'cv' in files:
-            print("\n📄 Processing CV/RESUME...")
-            file = files['cv']
-            print(f"Filename: {file.filename}")
-            print(f"Content-Type: {file.content_type}")
-            
-            try:
-                text = parser.extract_text(file, file.filename)
-                
-                if text and len(text) > 50:
-                    documents_to_parse.append(('cv', text))
-                    extracted_data['raw_documents']['cv'] = text[:500]
-                    print(f"✅ Extracted {len(text)} characters from CV")
-                else:
-                    print("⚠️  No text extracted from CV")
-            except Exception as e:
-                print(f"❌ Error processing CV: {str(e)}")
-                import traceback
-                traceback.print_exc()
+        # Reject an oversized file before any document reaches Gemini
+        for _, _, _, file in uploads:
+            parser.check_upload_size(file)
         
-        # Degree
-        if 'degree' in files:
-            print("\n📜 Processing DEGREE CERTIFICATE...")
-            file = files['degree']
-            print(f"Filename: {file.filename}")
-            
-            try:
-                text = parser.extract_text(file, file.filename)
-                
-                if text and len(text) > 50:
-                    documents_to_parse.append(('degree', text))
-                    extracted_data['raw_documents']['degree'] = text[:500]
-                    print(f"✅ Extracted {len(text)} characters from degree")
-                else:
-                    print("⚠️  No text extracted from degree")
-            except Exception as e:
-                print(f"❌ Error processing degree: {str(e)}")
-                import traceback
-                traceback.print_exc()
+        print(f"\n🔄 Extracting and parsing {len(uploads)} documents with Gemini ({parse_mode})...")
         
-        # Language Certificate
-        if 'language_cert' in files:
-            print("\n🌍 Processing LANGUAGE CERTIFICATE...")
-            file = files['language_cert']
-            print(f"Filename: {file.filename}")
-            
-            try:
-                text = parser.extract_text(file, file.filename)
-                
-                if text and len(text) > 50:
-                    documents_to_parse.append(('language_cert', text))
-                    extracted_data['raw_documents']['language_cert'] = text[:500]
-                    print(f"✅ Extracted {len(text)} characters from language cert")
-                else:
-                    print("⚠️  No text extracted from language certificate")
-            except Exception as e:
-                print(f"❌ Error processing language cert: {str(e)}")
-                import traceback
-                traceback.print_exc()
+        with ThreadPoolExecutor(max_workers=max(1, min(PARSE_WORKERS, len(uploads) or 1))) as executor:
+            futures = [
+                (doc_type, executor.submit(extract_and_parse, parser, doc_type, label, icon, file, not batch_mode))
+                for doc_type, label, icon, file in uploads
+            ]
+            results = [(doc_type, future.result()) for doc_type, future in futures]
+        
+        merged = None
+        if batch_mode:
+            results, merged = parse_batch(parser, results)
+        
+        documents_parsed = 0
+        for doc_type, (text, _, _) in results:
+            if text is None:
+                continue
+            documents_parsed += 1
+            extracted_data['raw_documents'][doc_type] = text[:500]
         
-        if not documents_to_parse:
+        # Merge in a fixed order (batch mode already returns the merged profile)
+        if merged is None:
+            merged = merge_parsed_documents(parsed for _, (_, _, parsed) in results)
+        extracted_data.update(merged)
+        
+        if not documents_parsed:
             print("❌ No documents could be processed")
             return jsonify({
                 'success': False,
                 'error': 'Could not extract text from any uploaded documents. Please check file formats (PDF or DOCX only).'
             }), 400
         
-        # Parse all documents and merge data
-        print(f"\n🔄 Parsing {len(documents_to_parse)} documents with Gemini...")
-        
-        for doc_type, text in documents_to_parse:
-            print(f"\n--- Parsing {doc_type} ---")
-            try:
-                parsed = parser.parse_any_document(text, doc_type)
-                
-                if parsed:
-                    # Merge personal info
-                    if parsed.get('student_name') and not extracted_data['personal_info'].get('name'):
-                        extracted_data['personal_info']['name'] = parsed['student_name']
-                    if parsed.get('email'):
-                        extracted_data['personal_info']['email'] = parsed['email']
-                    if parsed.get('phone'):
-                        extracted_data['personal_info']['phone'] = parsed['phone']
-                    if parsed.get('nationality'):
-                        extracted_data['personal_info']['nationality'] = parsed['nationality']
-                    
-                    # Merge academic info
-                    if parsed.get('university'):
-                        extracted_data['academic_info']['university'] = parsed['university']
-                    if parsed.get('degree'):
-                        extracted_data['academic_info']['degree'] = parsed['degree']
-                    if parsed.get('major'):
-                        extracted_data['academic_info']['major'] = parsed['major']
-                    if parsed.get('cgpa'):
-                        extracted_data['academic_info']['cgpa'] = parsed['cgpa']
-                    if parsed.get('gpa_scale'):
-                        extracted_data['academic_info']['gpa_scale'] = parsed['gpa_scale']
-                    if parsed.get('graduation_date'):
-                        extracted_data['academic_info']['graduation_date'] = parsed['graduation_date']
-                    if parsed.get('courses'):
-                        extracted_data['academic_info']['courses'] = parsed['courses']
-                    if parsed.get('honors'):
-                        extracted_data['academic_info']['honors'] = parsed['honors']
-                    if parsed.get('skills'):
-                        extracted_data['academic_info']['skills'] = parsed['skills']
-                    
-                    print(f"✅ Successfully parsed {doc_type}")
-                else:
-                    print(f"⚠️  Failed to parse {doc_type}")
-            except Exception as e:
-                print(f"❌ Error parsing {doc_type}: {str(e)}")
-                import traceback
-                traceback.print_exc()
-        
         print("\n" + "="*60)
         print("✅ DOCUMENT PARSING COMPLETED")
         print("="*60)
@@ -195,6 +280,8 @@ def parse_documents():
             'data': extracted_data
         })
     
+    except (DocumentTooLarge, HTTPException, LLMUnavailable):
+        raise
     except Exception as e:
         print(f"\n❌ CRITICAL ERROR: {str(e)}")
         import traceback
@@ -212,11 +299,11 @@ def save_application():
         data = request.json
         user_id = data.get('userId')
         
-        user_sessions[user_id] = {
+        user_sessions.set(user_id, {
             'profile': data.get('profile'),
             'countries': data.get('countries'),
             'preferences': data.get('preferences')
-        }
+        })
         
         print(f"✅ Application saved for user: {user_id}")
         return jsonify({
@@ -236,6 +323,7 @@ def get_recommendations():
     """
     Get top university recommendations based on user profile
     """
+    rag = get_rag()
     try:
         print("\n" + "="*60)
         print("🎓 GETTING UNIVERSITY RECOMMENDATIONS")
@@ -251,39 +339,10 @@ def get_recommendations():
         # Get recommendations from RAG
         search_results = rag.search_courses(query, n_results=10)
         
-        # Format recommendations
-        recommendations = []
-        if search_results and 'metadatas' in search_results and len(search_results['metadatas']) > 0:
-            metadatas = search_results['metadatas'][0]
-            documents = search_results['documents'][0]
-            
-            for i, (metadata, doc_text) in enumerate(zip(metadatas, documents)):
-                # Parse the document text to extract details
-                lines = doc_text.split('\n')
-                admission_req = ''
-                language_req = ''
-                deadline = ''
-                
-                for line in lines:
-                    if 'Admission Requirements:' in line:
-                        admission_req = line.split('Admission Requirements:')[1].strip()
-                    elif 'Language Requirements:' in line:
-                        language_req = line.split('Language Requirements:')[1].strip()
-                    elif 'Deadline:' in line:
-                        deadline = line.split('Deadline:')[1].strip()
-                
-                recommendation = {
-                    'course': metadata.get('course', 'N/A'),
-                    'institution': metadata.get('institution', 'N/A'),
-                    'url': metadata.get('url', '#'),
-                    'degree_type': metadata.get('degree_type', 'N/A'),
-                    'admission_requirements': admission_req,
-                    'language_requirements': language_req,
-                    'deadline': deadline,
-                    'match_score': max(70, min(95, 85 + (i * -2)))
-                }
-                recommendations.append(recommendation)
-                print(f"✓ Found: {recommendation['course']} at {recommendation['institution']}")
+        # Format recommendations (requirement fields come straight from metadata)
+        recommendations = build_recommendations(search_results)
+        for recommendation in recommendations:
+            print(f"✓ Found: {recommendation['course']} at {recommendation['institution']}")
         
         print(f"\n✅ Returning {len(recommendations)} recommendations")
         print("="*60 + "\n")
@@ -302,73 +361,65 @@ def get_recommendations():
             'error': str(e)
         }), 500
 
+def build_enhanced_query(query, user_id):
+    """Append the saved user profile (if any) to the chat query"""
+    user_data = user_sessions.get(user_id) or {}
+    
+    enhanced_query = query
+    if user_data:
+        profile = user_data.get('profile', {})
+        countries = user_data.get('countries', [])
+        
+        context = f"\nUser Context: Looking for {profile.get('desired_degree')} in {profile.get('field_of_study')}."
+        if countries:
+            context += f" Interested in: {', '.join(countries)}."
+        
+        enhanced_query = query + context
+    
+    return enhanced_query
+
+def build_chat_recommendations(query, search_results):
+    """
+    Return course recommendations for chat queries that ask for them
+    
+    Reuses the retrieval the answer was generated from (top 3 courses)
+    instead of running a second search.
+    """
+    recommendation_keywords = ['recommend', 'suggest', 'show', 'find', 'best', 'top', 'university', 'program']
+    needs_recommendations = any(keyword in query.lower() for keyword in recommendation_keywords)
+    
+    new_recommendations = []
+    if needs_recommendations:
+        new_recommendations = build_recommendations(search_results, match_score=88, limit=3)
+    
+    return new_recommendations
+
 @app.route('/api/chat-with-recommendations', methods=['POST'])
 def chat_with_recommendations():
     """Chat endpoint that can also return new recommendations"""
+    rag = get_rag()
     try:
         print("\n💬 Chat with recommendations request")
         data = request.json
         query = data.get('query')
         user_id = data.get('userId')
         
-        user_data = user_sessions.get(user_id, {})
+        enhanced_query = build_enhanced_query(query, user_id)
         
-        enhanced_query = query
-        if user_data:
-            profile = user_data.get('profile', {})
-            countries = user_data.get('countries', [])
-            
-            context = f"\nUser Context: Looking for {profile.get('desired_degree')} in {profile.get('field_of_study')}."
-            if countries:
-                context += f" Interested in: {', '.join(countries)}."
-            
-            enhanced_query = query + context
+        result = rag.ask_detailed(enhanced_query, n_results=5)
+        formatted = format_response(result['answer'])
         
-        answer = rag.ask(enhanced_query, n_results=5)
-        formatted = format_response(answer)
-        
-        recommendation_keywords = ['recommend', 'suggest', 'show', 'find', 'best', 'top', 'university', 'program']
-        needs_recommendations = any(keyword in query.lower() for keyword in recommendation_keywords)
-        
-        new_recommendations = []
-        if needs_recommendations:
-            search_results = rag.search_courses(query, n_results=3)
-            
-            if search_results and 'metadatas' in search_results:
-                metadatas = search_results['metadatas'][0]
-                documents = search_results['documents'][0]
-                
-                for metadata, doc_text in zip(metadatas, documents):
-                    lines = doc_text.split('\n')
-                    admission_req = ''
-                    language_req = ''
-                    deadline = ''
-                    
-                    for line in lines:
-                        if 'Admission Requirements:' in line:
-                            admission_req = line.split('Admission Requirements:')[1].strip()
-                        elif 'Language Requirements:' in line:
-                            language_req = line.split('Language Requirements:')[1].strip()
-                        elif 'Deadline:' in line:
-                            deadline = line.split('Deadline:')[1].strip()
-                    
-                    new_recommendations.append({
-                        'course': metadata.get('course', 'N/A'),
-                        'institution': metadata.get('institution', 'N/A'),
-                        'url': metadata.get('url', '#'),
-                        'degree_type': metadata.get('degree_type', 'N/A'),
-                        'admission_requirements': admission_req,
-                        'language_requirements': language_req,
-                        'deadline': deadline,
-                        'match_score': 88
-                    })
+        new_recommendations = build_chat_recommendations(query, result['search_results'])
         
         return jsonify({
             'success': True,
             'response': formatted,
-            'new_recommendations': new_recommendations if new_recommendations else None
+            'new_recommendations': new_recommendations if new_recommendations else None,
+            'metadata': result['metadata']
         })
     
+    except LLMUnavailable:
+        raise
     except Exception as e:
         print(f"❌ Chat error: {str(e)}")
         import traceback
@@ -378,34 +429,97 @@ def chat_with_recommendations():
             'error': str(e)
         }), 500
 
-def format_response(text):
-    """Format response into structured sections"""
-    sections = []
-    lines = text.split('\n')
+def sse_event(event, data):
+    """Encode one Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@app.route('/api/chat-stream', methods=['POST'])
+def chat_stream():
+    """
+    Streaming variant of /api/chat-with-recommendations (Server-Sent Events)
+    
+    Events:
+        metadata: response metadata (cache hit, course IDs) before the first chunk
+        chunk: raw answer text as it arrives from Gemini
+        section: a formatted section as soon as its line is complete
+        recommendations: new recommendations (or null), sent last
+        done / error: end of stream
+    """
+    rag = get_rag()
+    data = request.json
+    query = data.get('query')
+    user_id = data.get('userId')
     
-    for line in lines:
-        line = line.strip()
-        if not line:
-            continue
+    def generate():
+        try:
+            print("\n💬 Streaming chat request")
+            enhanced_query = build_enhanced_query(query, user_id)
+            result = rag.ask_detailed(enhanced_query, n_results=5, stream=True)
+            yield sse_event('metadata', result['metadata'])
+            
+            buffer = ""
+            for chunk in result['answer']:
+                yield sse_event('chunk', {'text': chunk})
+                
+                # Format every line as soon as it is complete
+                buffer += chunk
+                *lines, buffer = buffer.split('\n')
+                for line in lines:
+                    section = format_line(line)
+                    if section:
+                        yield sse_event('section', section)
+            
+            section = format_line(buffer)
+            if section:
+                yield sse_event('section', section)
+            
+            new_recommendations = build_chat_recommendations(query, result['search_results'])
+            yield sse_event('recommendations', new_recommendations if new_recommendations else None)
+            yield sse_event('done', {'success': True})
         
-        if line and line[0].isdigit() and '.' in line[:4]:
-            sections.append({'type': 'numbered', 'content': line})
-        elif line.startswith('*') or line.startswith('-') or line.startswith('•'):
-            sections.append({'type': 'bullet', 'content': line.lstrip('*-• ')})
-        elif line.startswith('**') and line.endswith('**'):
-            sections.append({'type': 'header', 'content': line.strip('*')})
-        else:
-            sections.append({'type': 'text', 'content': line})
+        except Exception as e:
+            print(f"❌ Streaming chat error: {str(e)}")
+            import traceback
+            traceback.print_exc()
+            yield sse_event('error', {'success': False, 'error': str(e)})
     
-    return sections
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
 
 @app.route('/api/health', methods=['GET'])
+@app.route('/api/health/live', methods=['GET'])
 def health():
-    """Health check"""
+    """Liveness check (process is up, even while warming up)"""
     return jsonify({'status': 'healthy', 'message': 'API is running'})
 
+@app.route('/api/stats', methods=['GET'])
+def stats():
+    """Cache hit-rate counters of the loaded components and Gemini call metrics"""
+    status = warmup.status()['components']
+    result = {}
+    if status['parser']['state'] == 'ready':
+        result['document_cache'] = get_parser().cache.stats()
+    if status['rag']['state'] == 'ready':
+        rag = warmup.get('rag')
+        result['query_embedding_cache'] = rag.query_cache.stats()
+        if rag.answer_cache is not None:
+            result['answer_cache'] = rag.answer_cache.stats()
+    result['sessions'] = user_sessions.stats()
+    result['llm'] = get_llm_client().metrics()
+    return jsonify(result)
+
+@app.route('/api/health/ready', methods=['GET'])
+def readiness():
+    """Readiness check with model/DB load state and warm-up timings"""
+    status = warmup.status()
+    return jsonify(status), 200 if status['ready'] else 503
+
 if __name__ == '__main__':
     print("="*60)
     print("🚀 DAAD Application System API Started")
     print("="*60)
+    warmup.start()
     app.run(debug=True, port=5001, host='0.0.0.0')
\ No newline at end of file
@@ -0,0 +1,815 @@
+"""
+Benchmarks for the course pipeline
+
+Usage:
+    python benchmark.py ingest [--docs 5000] [--batch-size 256] [--workers -1]
+    python benchmark.py retrieval [--docs 5000] [--queries 200] [--k 10]
+    python benchmark.py batch-search [--docs 5000] [--queries 256] [--k 5]
+    python benchmark.py recommendations [--n-results 10] [--requests 20000]
+    python benchmark.py extract [--docs 16] [--pages 20] [--concurrency 4] [--workers 4]
+    python benchmark.py upload-memory [--uploads 8] [--size-mb 8] [--concurrency 4]
+    python benchmark.py sessions [--workers 4] [--sessions 2000] [--reads 4000]
+    python benchmark.py suite [--sizes 100,1000,5000] [--pages 1,10,40] [--output benchmark_results.json]
+                              [--baseline previous_results.json]
+    python benchmark.py scraper-extract [--pages 200] [--browser]
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+
+SUBJECTS = ["Computer Science", "Data Science", "Mechanical Engineering", "Physics",
+            "Economics", "Biotechnology", "Artificial Intelligence", "Architecture"]
+CITIES = ["Berlin", "Munich", "Hamburg", "Aachen", "Dresden", "Stuttgart", "Bonn", "Leipzig"]
+LANGUAGE_TESTS = ["IELTS 6.5", "TOEFL iBT 90", "TestDaF 4", "DSH-2", "Cambridge C1"]
+
+
+def synthetic_rows(n_rows, seed=42):
+    """Course rows shaped like the scraped CSVs (plus degree_type/source_file)"""
+    rng = random.Random(seed)
+    rows = []
+    for i in range(n_rows):
+        subject = rng.choice(SUBJECTS)
+        city = rng.choice(CITIES)
+        rows.append({
+            'course': f"{subject} {i}",
+            'institution': f"University of {city}",
+            'url': f"https://example.org/course/{i}",
+            'admission req': f"A first degree in {subject.lower()} or a related field. "
+                             + " ".join(rng.choice(SUBJECTS).lower() for _ in range(rng.randint(10, 60))),
+            'language req': rng.choice(LANGUAGE_TESTS),
+            'deadline': f"{rng.randint(1, 28)} {rng.choice(['January', 'March', 'July', 'October'])}",
+            'degree_type': rng.choice(["Bachelor", "Masters", "PhD"]),
+            'source_file': 'synthetic.csv'
+        })
+    return rows
+
+
+def synthetic_records(n_docs, seed=42):
+    """
+    Build {course_id: (document, metadata)} records shaped like real courses
+    """
+    from load_data import prepare_course_text, prepare_course_metadata, course_content_hash
+
+    records = {}
+    for i, row in enumerate(synthetic_rows(n_docs, seed)):
+        doc_text = prepare_course_text(row)
+        metadata = prepare_course_metadata(row)
+        metadata['content_hash'] = course_content_hash(doc_text, metadata)
+        records[f"course_{i}"] = (doc_text, metadata)
+    return records
+
+
+def benchmark_ingest(n_docs=5000, batch_size=256, workers=1):
+    """
+    Compare docs/sec of the legacy add() path (embedding function, batches
+    of 100) with the bulk ingestion engine
+    """
+    import chromadb
+    from chromadb.utils import embedding_functions
+    from ingestion import EmbeddingIngestionEngine, EMBEDDING_MODEL_NAME
+
+    records = synthetic_records(n_docs)
+    items = list(records.items())
+    embedding_function = embedding_functions.SentenceTransformerEmbeddingFunction(
+        model_name=EMBEDDING_MODEL_NAME
+    )
+    results = {}
+
+    db_dir = tempfile.mkdtemp(prefix="bench_ingest_")
+    try:
+        client = chromadb.PersistentClient(path=db_dir)
+
+        # Legacy path: Chroma embeds each batch of 100 through the embedding function
+        collection = client.get_or_create_collection(
+            name="legacy", embedding_function=embedding_function
+        )
+        started = time.perf_counter()
+        for start in range(0, len(items), 100):
+            batch = items[start:start + 100]
+            collection.add(
+                ids=[course_id for course_id, _ in batch],
+                documents=[doc for _, (doc, _) in batch],
+                metadatas=[meta for _, (_, meta) in batch]
+            )
+        seconds = time.perf_counter() - started
+        results['legacy'] = {'seconds': seconds, 'docs_per_sec': n_docs / seconds}
+
+        # Bulk engine: large encode batches, optional process pool, overlapped writes
+        collection = client.get_or_create_collection(
+            name="engine", embedding_function=embedding_function
+        )
+        engine = EmbeddingIngestionEngine(encode_batch_size=batch_size, num_workers=workers)
+        engine.model  # Load outside the timed region, like the legacy path
+        stats = engine.ingest(collection, records)
+        results['engine'] = {'seconds': stats['seconds'], 'docs_per_sec': stats['docs_per_sec'],
+                             'encode_seconds': stats['encode_seconds'],
+                             'write_seconds': stats['write_seconds']}
+    finally:
+        shutil.rmtree(db_dir, ignore_errors=True)
+
+    print("\n" + "="*60)
+    print(f"INGESTION THROUGHPUT ({n_docs} docs, batch={batch_size}, workers={workers})")
+    print("="*60)
+    for name, result in results.items():
+        print(f"{name:>8}: {result['docs_per_sec']:8.1f} docs/sec ({result['seconds']:.1f}s)")
+    print(f" speedup: {results['engine']['docs_per_sec'] / results['legacy']['docs_per_sec']:.2f}x")
+
+    return results
+
+
+def _timed(fn, *args, **kwargs):
+    started = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - started
+
+
+def _percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def benchmark_retrieval(n_docs=5000, n_queries=200, k=10, seed=7):
+    """
+    Latency and recall@k of vector, lexical and hybrid search
+
+    Queries combine exact tokens (language test + city); a course is
+    relevant when its text contains all of them.
+    """
+    from rag_pipeline import DAADCourseRAG
+    from lexical_index import tokenize
+
+    records = synthetic_records(n_docs)
+    rng = random.Random(seed)
+    queries = [f"{rng.choice(LANGUAGE_TESTS).split()[0]} {rng.choice(CITIES)} {rng.choice(SUBJECTS)}"
+               for _ in range(n_queries)]
+    doc_tokens = {course_id: set(tokenize(doc)) for course_id, (doc, _) in records.items()}
+
+    def relevant_ids(query):
+        exact = set(tokenize(query.split()[0] + " " + query.split()[1]))
+        return {course_id for course_id, tokens in doc_tokens.items() if exact <= tokens}
+
+    db_dir = tempfile.mkdtemp(prefix="bench_retrieval_")
+    try:
+        rag = DAADCourseRAG(db_path=db_dir, answer_cache_path=None)
+        rag._upsert_records(records)
+        rag._ensure_lexical_index()
+        for query in queries:
+            rag.embed_query(query)  # Embeddings are cached; compare retrieval work only
+
+        results = {}
+        for mode in ("vector", "lexical", "hybrid"):
+            latencies, recalls = [], []
+            for query in queries:
+                found, seconds = _timed(rag.search_courses, query, n_results=k, mode=mode)
+                relevant = relevant_ids(query)
+                latencies.append(seconds * 1000)
+                if relevant:
+                    hits = len(relevant & set(found['ids'][0]))
+                    recalls.append(hits / min(k, len(relevant)))
+            results[mode] = {
+                'p50_ms': _percentile(latencies, 50),
+                'p95_ms': _percentile(latencies, 95),
+                'recall_at_k': sum(recalls) / len(recalls) if recalls else 0.0
+            }
+    finally:
+        shutil.rmtree(db_dir, ignore_errors=True)
+
+    print("\n" + "="*60)
+    print(f"RETRIEVAL ({n_docs} docs, {n_queries} queries, k={k})")
+    print("="*60)
+    for mode, result in results.items():
+        print(f"{mode:>8}: p50 {result['p50_ms']:6.2f} ms  p95 {result['p95_ms']:6.2f} ms  "
+              f"recall@{k} {result['recall_at_k']:.3f}")
+
+    return results
+
+
+def benchmark_batch_search(n_docs=5000, n_queries=256, k=5, seed=11):
+    """
+    Compare looped search_courses with one search_courses_many call
+    (query embedding cache cleared before each run)
+    """
+    from rag_pipeline import DAADCourseRAG
+
+    records = synthetic_records(n_docs)
+    rng = random.Random(seed)
+    queries = [f"{rng.choice(SUBJECTS)} in {rng.choice(CITIES)} with {rng.choice(LANGUAGE_TESTS)} #{i}"
+               for i in range(n_queries)]
+
+    db_dir = tempfile.mkdtemp(prefix="bench_batch_")
+    try:
+        rag = DAADCourseRAG(db_path=db_dir, answer_cache_path=None)
+        rag._upsert_records(records)
+        rag.embed_query("warm up")
+
+        rag.query_cache.clear()
+        looped, loop_seconds = _timed(lambda: [rag.search_courses(query, k) for query in queries])
+
+        rag.query_cache.clear()
+        batched, batch_seconds = _timed(rag.search_courses_many, queries, k)
+    finally:
+        shutil.rmtree(db_dir, ignore_errors=True)
+
+    same = sum(a['ids'][0] == b['ids'][0] for a, b in zip(looped, batched))
+    results = {
+        'looped': {'seconds': loop_seconds, 'queries_per_sec': n_queries / loop_seconds},
+        'batched': {'seconds': batch_seconds, 'queries_per_sec': n_queries / batch_seconds},
+        'identical_results': same
+    }
+
+    print("\n" + "="*60)
+    print(f"BATCH SEARCH ({n_docs} docs, {n_queries} queries, k={k})")
+    print("="*60)
+    for name in ("looped", "batched"):
+        print(f"{name:>8}: {results[name]['queries_per_sec']:8.1f} queries/sec ({results[name]['seconds']:.2f}s)")
+    print(f" speedup: {loop_seconds / batch_seconds:.2f}x, identical results: {same}/{n_queries}")
+
+    return results
+
+
+def benchmark_recommendations(n_results=10, n_requests=20000):
+    """
+    Per-request CPU cost of building recommendations from metadata fields
+    versus re-parsing the document text (legacy collections)
+    """
+    from recommendations import build_recommendations
+
+    records = list(synthetic_records(n_results).items())
+    with_fields = {
+        'ids': [[course_id for course_id, _ in records]],
+        'documents': [[doc for _, (doc, _) in records]],
+        'metadatas': [[meta for _, (_, meta) in records]]
+    }
+    legacy_keys = ('admission_requirements', 'language_requirements', 'deadline')
+    legacy = dict(with_fields, metadatas=[[
+        {key: value for key, value in meta.items() if key not in legacy_keys}
+        for _, (_, meta) in records
+    ]])
+
+    results = {}
+    for name, search_results in (("parse_documents", legacy), ("metadata", with_fields)):
+        started = time.process_time()
+        for _ in range(n_requests):
+            build_recommendations(search_results)
+        cpu_seconds = time.process_time() - started
+        results[name] = {'cpu_us_per_request': cpu_seconds / n_requests * 1e6}
+
+    print("\n" + "="*60)
+    print(f"RECOMMENDATION BUILDING (n_results={n_results}, {n_requests} requests)")
+    print("="*60)
+    for name, result in results.items():
+        print(f"{name:>16}: {result['cpu_us_per_request']:8.1f} µs CPU/request")
+    print(f"         speedup: {results['parse_documents']['cpu_us_per_request'] / results['metadata']['cpu_us_per_request']:.2f}x")
+
+    return results
+
+
+def synthetic_pdf(n_pages, lines_per_page=40, seed=3, padding_bytes=0):
+    """
+    Build a text PDF (one content stream per page) without external libraries
+
+    padding_bytes adds an unreferenced binary stream (like an embedded scan)
+    to make the file larger without adding text.
+    """
+    rng = random.Random(seed)
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None,
+               "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    page_refs = []
+    for page in range(n_pages):
+        lines = [f"Page {page + 1}: {rng.choice(SUBJECTS)} grade {rng.randint(1, 4)}.{rng.randint(0, 9)} "
+                 f"credits {rng.randint(2, 10)} {rng.choice(CITIES)}" for _ in range(lines_per_page)]
+        stream = "BT /F1 10 Tf 12 TL 40 800 Td " + " ".join(f"({line}) '" for line in lines) + " ET"
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+                       f"/Resources << /Font << /F1 3 0 R >> >> /Contents {len(objects)} 0 R >>")
+        page_refs.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(page_refs)}] /Count {n_pages} >>"
+    if padding_bytes:
+        objects.append(rng.randbytes(padding_bytes))
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        if isinstance(body, bytes):
+            out += f"{number} 0 obj\n<< /Length {len(body)} >>\nstream\n".encode()
+            out += body + f"\nendstream\nendobj\n".encode()
+            continue
+        out += f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1")
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    out += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode()
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return bytes(out)
+
+
+def benchmark_extract(n_docs=16, n_pages=20, concurrency=4, workers=4):
+    """
+    Throughput of DocumentParser.extract_text under concurrent uploads,
+    in-process extraction versus the worker pool
+    """
+    import io
+    from concurrent.futures import ThreadPoolExecutor
+    from document_parser import DocumentParser
+
+    corpus = [synthetic_pdf(n_pages, seed=i) for i in range(n_docs)]
+    results = {}
+
+    for name, n_workers in (("in_process", 0), ("worker_pool", workers)):
+        parser = DocumentParser(extraction_workers=n_workers)
+        if n_workers:
+            parser.extract_text(io.BytesIO(corpus[0]), "warmup.pdf")  # Start the pool untimed
+
+        def extract(content):
+            return len(parser.extract_text(io.BytesIO(content), "synthetic.pdf"))
+
+        with ThreadPoolExecutor(max_workers=concurrency) as uploads:
+            extracted, seconds = _timed(lambda: list(uploads.map(extract, corpus)))
+        results[name] = {
+            'seconds': seconds,
+            'docs_per_sec': n_docs / seconds,
+            'pages_per_sec': n_docs * n_pages / seconds,
+            'characters': sum(extracted)
+        }
+
+    print("\n" + "="*60)
+    print(f"PDF EXTRACTION ({n_docs} docs x {n_pages} pages, {concurrency} concurrent uploads)")
+    print("="*60)
+    for name, result in results.items():
+        print(f"{name:>12}: {result['docs_per_sec']:6.1f} docs/sec  {result['pages_per_sec']:7.1f} pages/sec")
+
+    return results
+
+
+def benchmark_upload_memory(n_uploads=8, size_mb=8, concurrency=4, n_pages=20):
+    """
+    Peak RSS while extracting concurrent large uploads, reading each upload
+    into memory versus spooling it to disk and memory-mapping it
+    """
+    import multiprocessing
+    import os
+    from concurrent.futures import ProcessPoolExecutor
+    from tests.support import upload_memory_run
+
+    folder = tempfile.mkdtemp(prefix="upload_bench_")
+    try:
+        paths = []
+        for i in range(n_uploads):
+            path = os.path.join(folder, f"upload_{i}.pdf")
+            with open(path, 'wb') as f:
+                f.write(synthetic_pdf(n_pages, seed=i, padding_bytes=int(size_mb * 1024 * 1024)))
+            paths.append(path)
+
+        results = {}
+        for mode in ("read_all", "spooled"):
+            with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+                results[mode] = pool.submit(upload_memory_run, mode, paths, concurrency).result()
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+
+    print("\n" + "="*60)
+    print(f"UPLOAD MEMORY ({n_uploads} uploads x {size_mb} MB, {concurrency} concurrent)")
+    print("="*60)
+    for mode, result in results.items():
+        print(f"{mode:>10}: peak RSS {result['peak_rss_mb']:7.1f} MB "
+              f"(+{result['peak_rss_mb'] - result['baseline_rss_mb']:6.1f} MB)  {result['seconds']:.2f}s")
+
+    return results
+
+
+def _session_worker(backend, path, worker, n_workers, n_sessions, n_reads, barrier, results):
+    """
+    One worker process: save n_sessions sessions, wait for every worker,
+    then read random sessions saved by any worker
+    """
+    from session_store import create_session_store
+
+    kwargs = {'path': path} if backend == "sqlite" else {}
+    store = create_session_store(backend, **kwargs)
+    rng = random.Random(worker)
+
+    write_latencies = []
+    for i in range(n_sessions):
+        session = {
+            'profile': {'desired_degree': rng.choice(["Bachelor", "Masters", "PhD"]),
+                        'field_of_study': rng.choice(SUBJECTS), 'gpa': round(rng.uniform(1, 4), 1)},
+            'countries': rng.sample(CITIES, 3),
+            'preferences': {'language': rng.choice(LANGUAGE_TESTS)}
+        }
+        _, seconds = _timed(store.set, f"user_{worker}_{i}", session)
+        write_latencies.append(seconds)
+
+    barrier.wait()
+
+    read_latencies = []
+    found = 0
+    for _ in range(n_reads):
+        user_id = f"user_{rng.randrange(n_workers)}_{rng.randrange(n_sessions)}"
+        session, seconds = _timed(store.get, user_id)
+        read_latencies.append(seconds)
+        found += session is not None
+
+    results.put((write_latencies, read_latencies, found))
+
+
+def benchmark_sessions(n_workers=4, n_sessions=2000, n_reads=4000):
+    """
+    Session store read/write latency with several worker processes writing
+    at once, and how often a worker sees sessions saved by other workers
+    """
+    import multiprocessing
+    import os
+
+    ctx = multiprocessing.get_context("spawn")
+    folder = tempfile.mkdtemp(prefix="session_bench_")
+    results = {}
+    try:
+        for backend in ("memory", "sqlite"):
+            barrier = ctx.Barrier(n_workers)
+            queue = ctx.Queue()
+            path = os.path.join(folder, f"{backend}.sqlite3")
+            workers = [
+                ctx.Process(target=_session_worker,
+                            args=(backend, path, worker, n_workers, n_sessions, n_reads, barrier, queue))
+                for worker in range(n_workers)
+            ]
+            started = time.perf_counter()
+            for process in workers:
+                process.start()
+            outputs = [queue.get() for _ in workers]
+            for process in workers:
+                process.join()
+            seconds = time.perf_counter() - started
+
+            writes = [latency for output in outputs for latency in output[0]]
+            reads = [latency for output in outputs for latency in output[1]]
+            results[backend] = {
+                'seconds': seconds,
+                'write_p50_ms': _percentile(writes, 50) * 1000,
+                'write_p99_ms': _percentile(writes, 99) * 1000,
+                'read_p50_ms': _percentile(reads, 50) * 1000,
+                'read_p99_ms': _percentile(reads, 99) * 1000,
+                'ops_per_sec': (len(writes) + len(reads)) / seconds,
+                'found_rate': sum(output[2] for output in outputs) / len(reads)
+            }
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+
+    print("\n" + "="*60)
+    print(f"SESSION STORE ({n_workers} workers x {n_sessions} writes + {n_reads} reads)")
+    print("="*60)
+    for backend, result in results.items():
+        print(f"{backend:>7}: write p50 {result['write_p50_ms']:6.3f} ms  p99 {result['write_p99_ms']:6.3f} ms  "
+              f"read p50 {result['read_p50_ms']:6.3f} ms  p99 {result['read_p99_ms']:6.3f} ms  "
+              f"sessions found {result['found_rate']:.0%}")
+
+    return results
+
+
+def synthetic_docx(n_paragraphs, seed=5):
+    """Build a DOCX transcript with python-docx"""
+    import io
+    import docx
+
+    rng = random.Random(seed)
+    document = docx.Document()
+    document.add_heading("Transcript of Records", level=1)
+    for i in range(n_paragraphs):
+        document.add_paragraph(f"{i + 1}. {rng.choice(SUBJECTS)} module, grade {rng.randint(1, 4)}.{rng.randint(0, 9)}, "
+                               f"{rng.randint(2, 10)} ECTS, {rng.choice(CITIES)}")
+    out = io.BytesIO()
+    document.save(out)
+    return out.getvalue()
+
+
+def write_synthetic_csvs(folder, n_rows, seed=42):
+    """Write synthetic courses as Bachelor/Masters/PHD CSV folders (load_all_courses layout)"""
+    import csv
+    import os
+
+    columns = ['course', 'institution', 'url', 'admission req', 'language req', 'deadline']
+    folders = {'Bachelor': 'Bachelor', 'Masters': 'Masters', 'PhD': 'PHD'}
+    by_degree = {}
+    for row in synthetic_rows(n_rows, seed):
+        by_degree.setdefault(row['degree_type'], []).append(row)
+
+    for degree_type, rows in by_degree.items():
+        os.makedirs(os.path.join(folder, folders[degree_type]), exist_ok=True)
+        with open(os.path.join(folder, folders[degree_type], "synthetic.csv"), 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=columns, extrasaction='ignore')
+            writer.writeheader()
+            writer.writerows(rows)
+
+
+def fake_gemini_answer(prompt):
+    """Answer text shaped like a real Gemini reply (headers, numbered and bullet lines)"""
+    courses = [line[len("Course: "):] for line in prompt.splitlines() if line.startswith("Course: ")]
+    lines = ["**Recommended programs**", ""]
+    for i, course in enumerate(courses, 1):
+        lines.append(f"{i}. {course}")
+        lines.append("* Strong fit for your background and interests.")
+        lines.append("- Check the admission and language requirements before applying.")
+    lines.append("")
+    lines.append("Good luck with your application!")
+    return "\n".join(lines)
+
+
+def _flatten(results, prefix=""):
+    """{'a': {'b': 1}} -> {'a.b': 1} (numbers only)"""
+    flat = {}
+    for key, value in results.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(_flatten(value, name + "."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[name] = value
+    return flat
+
+
+def _git_commit():
+    import os
+    import subprocess
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              timeout=10, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def benchmark_suite(sizes=(100, 1000, 5000), page_counts=(1, 10, 40), n_queries=50, repeats=5,
+                    output="benchmark_results.json", baseline=None):
+    """
+    Offline timings of each pipeline stage at several data sizes
+
+    Uses synthetic course CSVs, synthetic PDF/DOCX uploads, offline hashing
+    embeddings and a fake Gemini model, so it needs no network or API key.
+    Results are written as JSON; pass an earlier file as baseline to print
+    the change of every metric.
+    """
+    import os
+    import platform
+    import sys
+    from document_parser import DocumentParser
+    from llm_client import LLMClient, FakeGenerativeModel
+    from load_data import load_all_courses, prepare_course_text
+    from rag_pipeline import DAADCourseRAG
+    from formatting import format_response
+
+    llm = LLMClient(model=FakeGenerativeModel(reply=fake_gemini_answer, latency=0), rate=0)
+    rng = random.Random(13)
+    queries = [f"{rng.choice(SUBJECTS)} in {rng.choice(CITIES)} with {rng.choice(LANGUAGE_TESTS)}"
+               for _ in range(n_queries)]
+    results = {'courses': {}, 'documents': {}}
+    cwd = os.getcwd()
+
+    for size in sizes:
+        folder = tempfile.mkdtemp(prefix="bench_suite_")
+        try:
+            write_synthetic_csvs(folder, size)
+            os.chdir(folder)
+
+            courses_df, load_seconds = _timed(load_all_courses)
+            rows = [row for _, row in courses_df.iterrows()]
+            _, prepare_seconds = _timed(lambda: [prepare_course_text(row) for row in rows])
+
+            rag = DAADCourseRAG(db_path=os.path.join(folder, "chroma_db"), answer_cache_path=None,
+                                llm_client=llm, embedding_model="hashing")
+            _, db_seconds = _timed(rag.load_courses_to_db, force_reload=True)
+
+            search_ms, hybrid_ms, prompt_ms, prompt_tokens, answer_ms, format_ms = [], [], [], [], [], []
+            for query in queries:
+                found, seconds = _timed(rag.search_courses, query, n_results=5)
+                search_ms.append(seconds * 1000)
+                hybrid_ms.append(_timed(rag.search_courses, query, n_results=5, mode="hybrid")[1] * 1000)
+                (_, prompt_stats), seconds = _timed(rag.build_prompt_detailed, query, found)
+                prompt_ms.append(seconds * 1000)
+                prompt_tokens.append(prompt_stats['prompt_tokens'])
+                answer, seconds = _timed(rag.generate_answer, query, found)
+                answer_ms.append(seconds * 1000)
+                format_ms.append(_timed(format_response, answer)[1] * 1000)
+        finally:
+            os.chdir(cwd)
+            shutil.rmtree(folder, ignore_errors=True)
+
+        results['courses'][str(size)] = {
+            'load_all_courses_seconds': load_seconds,
+            'prepare_course_text_seconds': prepare_seconds,
+            'load_courses_to_db_seconds': db_seconds,
+            'search_courses_p50_ms': _percentile(search_ms, 50),
+            'search_courses_p95_ms': _percentile(search_ms, 95),
+            'search_courses_hybrid_p50_ms': _percentile(hybrid_ms, 50),
+            'build_prompt_p50_ms': _percentile(prompt_ms, 50),
+            'prompt_tokens_p50': _percentile(prompt_tokens, 50),
+            'generate_answer_p50_ms': _percentile(answer_ms, 50),
+            'format_response_p50_ms': _percentile(format_ms, 50)
+        }
+
+    import io
+    parser = DocumentParser(extraction_workers=0, cache_path=None, llm_client=llm)
+    for pages in page_counts:
+        timings = {}
+        for kind, build, filename in (("pdf", lambda seed: synthetic_pdf(pages, seed=seed), "upload.pdf"),
+                                      ("docx", lambda seed: synthetic_docx(pages * 40, seed=seed), "upload.docx")):
+            # A new seed per repeat so the content-hash cache never answers
+            uploads = [build(seed) for seed in range(repeats)]
+            latencies = [_timed(parser.extract_text, io.BytesIO(content), filename)[1] * 1000
+                         for content in uploads]
+            timings[f"extract_text_{kind}_p50_ms"] = _percentile(latencies, 50)
+        results['documents'][f"{pages}_pages"] = timings
+
+    report = {
+        'commit': _git_commit(),
+        'created_at': time.strftime("%Y-%m-%dT%H:%M:%S"),
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'config': {'sizes': list(sizes), 'page_counts': list(page_counts),
+                   'queries': n_queries, 'repeats': repeats},
+        'results': results
+    }
+    if output:
+        with open(output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    print("\n" + "="*60)
+    print(f"PIPELINE SUITE (commit {report['commit']})")
+    print("="*60)
+    previous = {}
+    if baseline:
+        with open(baseline) as f:
+            previous = _flatten(json.load(f)['results'])
+    for name, value in _flatten(results).items():
+        line = f"{name:<58} {value:10.3f}"
+        if previous.get(name):
+            line += f"  ({value / previous[name]:5.2f}x baseline)"
+        print(line)
+    if output:
+        print(f"\n💾 Results saved to {output}")
+
+    return report
+
+
+FIXTURES_DIR = "fixtures"
+
+
+def benchmark_scraper_extract(n_pages=200, browser=False):
+    """
+    Detail-page extraction: lxml parsing of the saved fixtures, then
+    pages/sec of the HTTP path versus Selenium against a local server
+    """
+    import functools
+    import os
+    import threading
+    from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+    from course_page import create_session, fetch_course, load_fixture_rows, parse_course_html
+
+    fixtures_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), FIXTURES_DIR)
+
+    # Fixture checks (tests/test_course_page.py covers these too); timing a
+    # wrong extractor is pointless, so a mismatch stops here with exit code 1
+    print("\n" + "="*60)
+    print("FIXTURES")
+    print("="*60)
+    mismatches = 0
+    for name, expected in load_fixture_rows(fixtures_dir).items():
+        with open(os.path.join(fixtures_dir, name), encoding='utf-8') as f:
+            row = parse_course_html(f.read(), f"http://fixture/{name}")
+        print(f"{'✓' if row == expected else '✗'} {name}")
+        if row != expected:
+            mismatches += 1
+            print(f"    expected: {expected}\n    got:      {row}")
+    if mismatches:
+        sys.exit(f"✗ {mismatches} fixture pages extracted incorrectly")
+
+    with open(os.path.join(fixtures_dir, "daad_course_detail.html"), encoding='utf-8') as f:
+        page_html = f.read()
+    _, seconds = _timed(lambda: [parse_course_html(page_html, "http://fixture") for _ in range(n_pages)])
+    results = {'parse_only': {'seconds': seconds, 'pages_per_sec': n_pages / seconds}}
+
+    # Serve the fixtures over keep-alive HTTP/1.1
+    class Handler(SimpleHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True  # Headers and body are separate writes
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), functools.partial(Handler, directory=fixtures_dir))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/daad_course_detail.html"
+
+    try:
+        session = create_session()
+        _, seconds = _timed(lambda: [fetch_course(session, url) for _ in range(n_pages)])
+        results['http'] = {'seconds': seconds, 'pages_per_sec': n_pages / seconds}
+
+        if browser:
+            import Daad_scraper
+            from rate_limit import AdaptiveRateLimiter
+            Daad_scraper.politeness = AdaptiveRateLimiter(rate=1e6)
+            driver, wait = Daad_scraper.create_driver(headless=True)
+            try:
+                n_browser = max(1, n_pages // 20)
+                _, seconds = _timed(lambda: [Daad_scraper.scrape_course(driver, wait, url, i + 1, n_browser)
+                                             for i in range(n_browser)])
+                results['selenium'] = {'seconds': seconds, 'pages_per_sec': n_browser / seconds}
+            finally:
+                driver.quit()
+    finally:
+        server.shutdown()
+
+    print("\n" + "="*60)
+    print(f"DETAIL PAGE EXTRACTION ({n_pages} pages)")
+    print("="*60)
+    for name, result in results.items():
+        print(f"{name:>10}: {result['pages_per_sec']:8.1f} pages/sec")
+    if 'selenium' in results:
+        print(f"   speedup: {results['http']['pages_per_sec'] / results['selenium']['pages_per_sec']:.1f}x (http vs selenium)")
+    else:
+        print("  (pass --browser to compare with Selenium; needs Chrome)")
+
+    return results
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Course pipeline benchmarks")
+    commands = arg_parser.add_subparsers(dest="command", required=True)
+
+    ingest = commands.add_parser("ingest", help="Bulk ingestion throughput (docs/sec)")
+    ingest.add_argument("--docs", type=int, default=5000)
+    ingest.add_argument("--batch-size", type=int, default=256)
+    ingest.add_argument("--workers", type=int, default=1, help="-1 uses all CPU cores")
+
+    retrieval = commands.add_parser("retrieval", help="Vector vs lexical vs hybrid latency/recall")
+    retrieval.add_argument("--docs", type=int, default=5000)
+    retrieval.add_argument("--queries", type=int, default=200)
+    retrieval.add_argument("--k", type=int, default=10)
+
+    batch_search = commands.add_parser("batch-search", help="Looped vs batched multi-query search")
+    batch_search.add_argument("--docs", type=int, default=5000)
+    batch_search.add_argument("--queries", type=int, default=256)
+    batch_search.add_argument("--k", type=int, default=5)
+
+    recommendations = commands.add_parser("recommendations", help="Metadata vs document-parsing recommendation cost")
+    recommendations.add_argument("--n-results", type=int, default=10)
+    recommendations.add_argument("--requests", type=int, default=20000)
+
+    extract = commands.add_parser("extract", help="PDF extraction throughput under concurrent uploads")
+    extract.add_argument("--docs", type=int, default=16)
+    extract.add_argument("--pages", type=int, default=20)
+    extract.add_argument("--concurrency", type=int, default=4)
+    extract.add_argument("--workers", type=int, default=4)
+
+    upload_memory = commands.add_parser("upload-memory", help="Peak RSS under concurrent large uploads")
+    upload_memory.add_argument("--uploads", type=int, default=8)
+    upload_memory.add_argument("--size-mb", type=float, default=8)
+    upload_memory.add_argument("--concurrency", type=int, default=4)
+
+    sessions = commands.add_parser("sessions", help="Session store latency under multi-worker load")
+    sessions.add_argument("--workers", type=int, default=4)
+    sessions.add_argument("--sessions", type=int, default=2000)
+    sessions.add_argument("--reads", type=int, default=4000)
+
+    suite = commands.add_parser("suite", help="Offline timings of every pipeline stage (JSON report)")
+    suite.add_argument("--sizes", default="100,1000,5000", help="Comma-separated course counts")
+    suite.add_argument("--pages", default="1,10,40", help="Comma-separated document sizes in pages")
+    suite.add_argument("--queries", type=int, default=50)
+    suite.add_argument("--repeats", type=int, default=5)
+    suite.add_argument("--output", default="benchmark_results.json")
+    suite.add_argument("--baseline", default=None, help="Earlier results file to compare against")
+
+    scraper_extract = commands.add_parser("scraper-extract", help="HTTP/lxml vs Selenium detail page extraction")
+    scraper_extract.add_argument("--pages", type=int, default=200)
+    scraper_extract.add_argument("--browser", action="store_true", help="Also time the Selenium path (needs Chrome)")
+
+    args = arg_parser.parse_args()
+
+    if args.command == "ingest":
+        benchmark_ingest(args.docs, args.batch_size, args.workers)
+    elif args.command == "retrieval":
+        benchmark_retrieval(args.docs, args.queries, args.k)
+    elif args.command == "batch-search":
+        benchmark_batch_search(args.docs, args.queries, args.k)
+    elif args.command == "recommendations":
+        benchmark_recommendations(args.n_results, args.requests)
+    elif args.command == "extract":
+        benchmark_extract(args.docs, args.pages, args.concurrency, args.workers)
+    elif args.command == "upload-memory":
+        benchmark_upload_memory(args.uploads, args.size_mb, args.concurrency)
+    elif args.command == "sessions":
+        benchmark_sessions(args.workers, args.sessions, args.reads)
+    elif args.command == "suite":
+        benchmark_suite([int(size) for size in args.sizes.split(",")],
+                        [int(pages) for pages in args.pages.split(",")],
+                        args.queries, args.repeats, args.output, args.baseline)
+    elif args.command == "scraper-extract":
+        benchmark_scraper_extract(args.pages, args.browser)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,280 @@
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+def normalize_query(query):
+    """Normalize query text so trivially different spellings share a cache entry"""
+    return re.sub(r"\s+", " ", str(query)).strip().lower()
+
+
+class LRUCache:
+    """
+    Bounded, thread-safe LRU cache with optional TTL and hit/miss counters
+    """
+
+    def __init__(self, max_size=1024, ttl=None):
+        """
+        Args:
+            max_size: Maximum number of entries before the least recently used is evicted
+            ttl: Seconds an entry stays valid (None = never expires)
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        """Return the cached value for key, or default on a miss"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at is None or expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+            self.misses += 1
+            return default
+
+    def set(self, key, value):
+        """Store a value, evicting the least recently used entries if full"""
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key):
+        """Remove a single entry"""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        """Drop all entries (counters are kept)"""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        """Return size and hit/miss counters"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0
+            }
+
+
+class SQLiteTTLStore:
+    """
+    Persistent key/value store on a local SQLite file with TTL and size-based
+    (least recently used) eviction
+
+    Values are stored as JSON. The database runs in WAL mode, so several
+    worker processes on one host can share the same file.
+    """
+
+    def __init__(self, path, table="cache", max_entries=10000, ttl=None):
+        """
+        Args:
+            path: SQLite database file (parent folder is created if missing)
+            table: Table holding the entries (several stores can share one file)
+            max_entries: Maximum rows kept before least recently used are evicted
+            ttl: Seconds an entry stays valid (None = never expires)
+        """
+        if not re.fullmatch(r"[A-Za-z_][A-Za-z0-9_]*", table):
+            raise ValueError(f"Invalid table name: {table}")
+
+        self.path = path
+        self.table = table
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+        folder = os.path.dirname(os.path.abspath(path))
+        os.makedirs(folder, exist_ok=True)
+
+        conn = self._connect()
+        conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS {table} (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                accessed_at REAL NOT NULL,
+                expires_at REAL
+            )
+        """)
+        conn.execute(f"CREATE INDEX IF NOT EXISTS {table}_accessed ON {table} (accessed_at)")
+
+    def _connect(self):
+        """
+        One connection per thread (sqlite3 connections are not thread-safe),
+        reopened after a fork so pre-forked workers never share one
+        """
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _count(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def get(self, key, default=None):
+        """Return the stored value for key, or default on a miss"""
+        conn = self._connect()
+        now = time.time()
+        row = conn.execute(
+            f"SELECT value, expires_at FROM {self.table} WHERE key = ?", (key,)
+        ).fetchone()
+
+        if row is None:
+            self._count(False)
+            return default
+
+        value, expires_at = row
+        if expires_at is not None and expires_at <= now:
+            conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+            self._count(False)
+            return default
+
+        conn.execute(f"UPDATE {self.table} SET accessed_at = ? WHERE key = ?", (now, key))
+        self._count(True)
+        return json.loads(value)
+
+    def set(self, key, value, ttl=None):
+        """Store a JSON-serializable value, then evict expired and excess entries"""
+        conn = self._connect()
+        now = time.time()
+        ttl = ttl if ttl is not None else self.ttl
+        expires_at = now + ttl if ttl else None
+
+        conn.execute(
+            f"INSERT OR REPLACE INTO {self.table} (key, value, accessed_at, expires_at) VALUES (?, ?, ?, ?)",
+            (key, json.dumps(value), now, expires_at)
+        )
+        self._evict(conn, now)
+
+    def delete(self, key):
+        """Remove a single entry"""
+        self._connect().execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+
+    def _evict(self, conn, now):
+        conn.execute(
+            f"DELETE FROM {self.table} WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,)
+        )
+        excess = conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0] - self.max_entries
+        if excess > 0:
+            conn.execute(
+                f"DELETE FROM {self.table} WHERE key IN "
+                f"(SELECT key FROM {self.table} ORDER BY accessed_at ASC LIMIT ?)",
+                (excess,)
+            )
+
+    def clear(self):
+        """Drop all entries (counters are kept)"""
+        self._connect().execute(f"DELETE FROM {self.table}")
+
+    def __len__(self):
+        return self._connect().execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+
+    def stats(self):
+        """Return size and hit/miss counters (counters are per process)"""
+        with self._lock:
+            hits, misses = self.hits, self.misses
+        lookups = hits + misses
+        return {
+            'size': len(self),
+            'max_size': self.max_entries,
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': hits / lookups if lookups else 0.0
+        }
+
+
+class TieredCache:
+    """
+    In-memory LRU cache in front of a persistent SQLiteTTLStore
+
+    Lookups check memory first, then disk (promoting disk hits into memory).
+    Values must be JSON-serializable.
+    """
+
+    def __init__(self, memory, disk=None):
+        """
+        Args:
+            memory: LRUCache for the hot tier
+            disk: Optional SQLiteTTLStore for the persistent tier
+        """
+        self.memory = memory
+        self.disk = disk
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        """Return the cached value for key, or default on a miss"""
+        value = self.memory.get(key)
+        if value is not None:
+            with self._lock:
+                self.memory_hits += 1
+            return value
+
+        if self.disk is not None:
+            value = self.disk.get(key)
+            if value is not None:
+                self.memory.set(key, value)
+                with self._lock:
+                    self.disk_hits += 1
+                return value
+
+        with self._lock:
+            self.misses += 1
+        return default
+
+    def set(self, key, value):
+        """Store a value in both tiers"""
+        self.memory.set(key, value)
+        if self.disk is not None:
+            self.disk.set(key, value)
+
+    def stats(self):
+        """Return combined hit/miss counters and per-tier sizes"""
+        with self._lock:
+            memory_hits, disk_hits, misses = self.memory_hits, self.disk_hits, self.misses
+        lookups = memory_hits + disk_hits + misses
+        return {
+            'memory_hits': memory_hits,
+            'disk_hits': disk_hits,
+            'misses': misses,
+            'hit_rate': (memory_hits + disk_hits) / lookups if lookups else 0.0,
+            'memory_size': len(self.memory),
+            'disk_size': len(self.disk) if self.disk is not None else 0
+        }
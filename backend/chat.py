@@ -11,7 +11,7 @@ def main():
     
     # Initialize RAG
     rag = DAADCourseRAG()
-    rag.load_courses_to_db()
+    rag.load_courses_to_db(incremental=True)
     
     print("\n✅ Ready! Ask me anything about German university courses.")
     print("Type 'quit' to exit\n")
@@ -29,9 +29,9 @@ def main():
         
         # Get answer
         print("\nAssistant: ", end="", flush=True)
-        answer = rag.ask(query)
-        print(answer)
-        print()
+        for chunk in rag.ask(query, stream=True):
+            print(chunk, end="", flush=True)
+        print("\n")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,146 @@
+"""
+Build the course context of the answer prompt within a token budget
+"""
+import os
+
+from recommendations import fields_from_document
+
+# Token budget for the course context (the question and instructions come on top)
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "1500"))
+
+# Courses farther than this from the query are left out (ChromaDB's squared L2
+# distance on normalized embeddings: 0 = identical, 2 = unrelated). The best
+# course is always kept; lexical-only hits have no distance and are kept too.
+CONTEXT_MAX_DISTANCE = float(os.getenv("CONTEXT_MAX_DISTANCE", "1.6"))
+
+# Always included for every course that fits
+ESSENTIAL_FIELDS = [
+    ('course', 'Course'),
+    ('institution', 'Institution'),
+    ('degree_type', 'Degree'),
+]
+
+# Filled in this order while budget remains, each cut to at most max tokens
+# (admission requirements share whatever is left between the courses)
+OPTIONAL_FIELDS = [
+    ('language_requirements', 'Language Requirements', 60),
+    ('deadline', 'Deadline', 30),
+    ('admission_requirements', 'Admission Requirements', 250),
+]
+
+# Order fields appear in within a course block
+DISPLAY_ORDER = ['course', 'institution', 'degree_type', 'admission_requirements',
+                 'language_requirements', 'deadline']
+
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text):
+    """Approximate Gemini token count (about 4 characters per token)"""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def truncate_to_tokens(text, max_tokens):
+    """Cut text to roughly max_tokens tokens at a word boundary"""
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    if len(text) <= max_chars:
+        return text
+    if max_chars <= 1:
+        return ""
+    cut = text[:max_chars - 1].rsplit(' ', 1)[0].rstrip(' ,;:')
+    return cut + "…"
+
+
+def _course_fields(metadata, document):
+    """Field values of one course (requirements from metadata, document text for old collections)"""
+    metadata = metadata or {}
+    fields = {key: str(metadata.get(key) or '').strip() for key, _ in ESSENTIAL_FIELDS}
+    requirements = metadata if 'admission_requirements' in metadata else fields_from_document(document)
+    for key, _, _ in OPTIONAL_FIELDS:
+        fields[key] = str(requirements.get(key) or '').strip()
+    fields['url'] = str(metadata.get('url') or 'N/A')
+    return fields
+
+
+def build_course_context(search_results, token_budget=CONTEXT_TOKEN_BUDGET, max_distance=CONTEXT_MAX_DISTANCE):
+    """
+    Build the course context for the answer prompt
+
+    Courses are taken in rank order. Each course that fits gets its name,
+    institution, degree and URL; the remaining budget is then spent on
+    language requirements, deadline and admission requirements in that
+    order, trimming long fields instead of dropping the course.
+
+    Args:
+        search_results: Results from DAADCourseRAG.search_courses
+        token_budget: Max (estimated) tokens of the returned context
+        max_distance: Drop courses farther than this from the query (None = keep all)
+
+    Returns:
+        Dict with context, context_tokens, courses (number used),
+        dropped_irrelevant, dropped_budget and truncated_fields
+    """
+    documents = search_results['documents'][0]
+    metadatas = search_results['metadatas'][0]
+    distances = (search_results.get('distances') or [[None] * len(documents)])[0]
+
+    header = "Here are relevant DAAD courses:\n\n"
+    used = estimate_tokens(header)
+    stats = {'dropped_irrelevant': 0, 'dropped_budget': 0, 'truncated_fields': 0}
+
+    # Relevance cutoff (the best course is always kept)
+    candidates = []
+    for rank, (document, metadata, distance) in enumerate(zip(documents, metadatas, distances)):
+        if rank > 0 and max_distance is not None and distance is not None and distance > max_distance:
+            stats['dropped_irrelevant'] += 1
+            continue
+        candidates.append(_course_fields(metadata, document))
+
+    # Essential fields, in rank order, while they fit
+    courses = []
+    for fields in candidates:
+        lines = {key: f"{label}: {fields[key]}" for key, label in ESSENTIAL_FIELDS if fields[key]}
+        lines['url'] = f"URL: {fields['url']}"
+        cost = estimate_tokens(f"--- Course {len(courses) + 1} ---\n" + "\n".join(lines.values()) + "\n\n")
+        if courses and used + cost > token_budget:
+            stats['dropped_budget'] += 1
+            continue
+        used += cost
+        courses.append((fields, lines))
+
+    # Optional fields by priority; the last one shares what is left evenly
+    for position, (key, label, max_tokens) in enumerate(OPTIONAL_FIELDS):
+        last = position == len(OPTIONAL_FIELDS) - 1
+        waiting = len(courses)
+        for fields, lines in courses:
+            remaining = token_budget - used
+            allowance = min(max_tokens, remaining // waiting if last else remaining)
+            waiting -= 1
+            value = fields[key]
+            if not value:
+                continue
+            prefix = f"{label}: "
+            allowance -= estimate_tokens(prefix) + 1
+            if allowance <= 0:
+                stats['truncated_fields'] += 1
+                continue
+            text = truncate_to_tokens(value, allowance)
+            if text != value:
+                stats['truncated_fields'] += 1
+            if not text:
+                continue
+            lines[key] = prefix + text
+            used += estimate_tokens(lines[key]) + 1
+
+    blocks = [header]
+    for number, (_, lines) in enumerate(courses, 1):
+        body = [lines[key] for key in DISPLAY_ORDER if key in lines] + [lines['url']]
+        blocks.append(f"--- Course {number} ---\n" + "\n".join(body) + "\n\n")
+    context = "".join(blocks)
+
+    return {
+        'context': context,
+        'context_tokens': estimate_tokens(context),
+        'courses': len(courses),
+        **stats
+    }
@@ -0,0 +1,144 @@
+"""
+Read DAAD course detail pages over plain HTTP (no browser)
+"""
+import json
+import os
+
+import requests
+from lxml import html as lxml_html
+from lxml.etree import tostring
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Same selectors the Selenium path uses
+COURSE_TITLE_SELECTOR = "h2.c-detail-header__title > span:nth-child(1)"
+INSTITUTION_SELECTOR = "h3.c-detail-header__subtitle"
+REQUIREMENTS_SELECTOR = "#registration > .container > .c-description-list > *:nth-child({}) > *"
+
+# Column -> child of the registration description list
+REQUIREMENT_ITEMS = {
+    'admission req': 2,
+    'language req': 4,
+    'deadline': 6,
+}
+
+USER_AGENT = ("Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
+              "(KHTML, like Gecko) Chrome/126.0 Safari/537.36")
+
+# Expected rows of the saved detail pages in fixtures/ (null = page needs
+# JavaScript; the url column is null and stands for the URL the page was
+# fetched from)
+FIXTURE_ROWS_FILE = "daad_course_rows.json"
+
+BLOCK_TAGS = {'address', 'article', 'aside', 'blockquote', 'dd', 'div', 'dl', 'dt', 'fieldset',
+              'figure', 'footer', 'form', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'header', 'hr',
+              'li', 'main', 'nav', 'ol', 'p', 'pre', 'section', 'table', 'tr', 'ul'}
+
+
+def create_session(pool_size=4, retries=2):
+    """
+    Keep-alive HTTP session for detail pages
+
+    Args:
+        pool_size: Connections kept open to the host
+        retries: Retries for connection errors and 429/5xx responses
+    """
+    session = requests.Session()
+    retry = Retry(total=retries, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504],
+                  allowed_methods=["GET"])
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({'User-Agent': USER_AGENT, 'Accept-Language': 'en'})
+    return session
+
+
+def inner_text(element):
+    """Approximate the browser's innerText: <br> and block elements become line breaks"""
+    parts = []
+
+    def walk(node):
+        tag = node.tag.lower() if isinstance(node.tag, str) else None
+        if tag in ('script', 'style'):
+            return
+        if tag == 'br':
+            parts.append('\n')
+        block = tag in BLOCK_TAGS
+        if block:
+            parts.append('\n')
+        if tag is not None and node.text:
+            parts.append(node.text)
+        for child in node:
+            walk(child)
+            if child.tail:
+                parts.append(child.tail)
+        if block:
+            parts.append('\n')
+
+    walk(element)
+    lines = (" ".join(line.split()) for line in "".join(parts).split('\n'))
+    return "\n".join(line for line in lines if line)
+
+
+def inner_html(element):
+    """The element's innerHTML"""
+    return (element.text or '') + "".join(
+        tostring(child, method='html', encoding='unicode') for child in element
+    )
+
+
+def parse_course_html(page_html, item_link):
+    """
+    Extract a course row from a detail page's HTML
+
+    Args:
+        page_html: Page source
+        item_link: URL of the page (stored as the url column)
+
+    Returns:
+        [course, institution, url, admission req, language req, deadline],
+        or None if the page has no course header (rendered by JavaScript)
+    """
+    document = lxml_html.fromstring(page_html)
+
+    title = document.cssselect(COURSE_TITLE_SELECTOR)
+    if not title:
+        return None
+    course = inner_text(title[0])
+
+    institution = "N/A"
+    subtitle = document.cssselect(INSTITUTION_SELECTOR)
+    if subtitle:
+        lines = inner_html(subtitle[0]).splitlines()
+        if len(lines) > 1:
+            institution = lines[1].strip()
+
+    row = [course, institution, item_link]
+    for column in ('admission req', 'language req', 'deadline'):
+        items = document.cssselect(REQUIREMENTS_SELECTOR.format(REQUIREMENT_ITEMS[column]))
+        row.append("\n".join(inner_text(item) for item in items) if items else "N/A")
+    return row
+
+
+def fetch_course(session, item_link, timeout=15):
+    """
+    Fetch and parse a detail page over HTTP
+
+    Returns:
+        The course row, or None if the page could not be fetched or needs
+        JavaScript (the caller falls back to Selenium)
+    """
+    response = session.get(item_link, timeout=timeout)
+    if response.status_code != 200:
+        return None
+    return parse_course_html(response.text, item_link)
+
+
+def load_fixture_rows(fixtures_dir, url_for=lambda name: f"http://fixture/{name}"):
+    """Expected row per fixture page, with the url column filled in by url_for(name)"""
+    with open(os.path.join(fixtures_dir, FIXTURE_ROWS_FILE), encoding='utf-8') as f:
+        rows = json.load(f)
+    return {
+        name: None if row is None else row[:2] + [url_for(name)] + row[3:]
+        for name, row in rows.items()
+    }
@@ -1,109 +1,629 @@
-import google.generativeai as genai
 import os
 import PyPDF2
 import docx
 import json
 import io
+import hashlib
+import mmap
+import tempfile
+import threading
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from dotenv import load_dotenv
+from cache import LRUCache, SQLiteTTLStore, TieredCache
+from llm_client import LLMUnavailable, get_llm_client
 
 load_dotenv()
-genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
 
-class DocumentParser:
+# Extraction runs in worker processes so CPU-bound PyPDF2 work does not hold
+# the GIL of the Flask process (0 = extract on the request thread)
+EXTRACTION_WORKERS = int(os.getenv("EXTRACTION_WORKERS", str(min(4, os.cpu_count() or 1))))
+EXTRACTION_TIMEOUT = float(os.getenv("EXTRACTION_TIMEOUT", "30"))
+PAGES_PER_TASK = 8
+
+# Uploads above these limits are rejected (HTTP 413) before any extraction
+MAX_PDF_PAGES = int(os.getenv("MAX_PDF_PAGES", "50"))
+MAX_UPLOAD_FILE_BYTES = int(float(os.getenv("MAX_UPLOAD_FILE_MB", "10")) * 1024 * 1024)
+
+# Whole request bodies larger than this are rejected (HTTP 413) before they are read
+MAX_REQUEST_BYTES = int(float(os.getenv("MAX_UPLOAD_MB", "25")) * 1024 * 1024)
+
+# Uploads larger than this are handled as temporary files, never as one bytes object
+SPOOL_THRESHOLD_BYTES = int(os.getenv("SPOOL_THRESHOLD_BYTES", str(1024 * 1024)))
+SPOOL_CHUNK_BYTES = 1024 * 1024
+
+# Re-uploads of the same file skip extraction and the Gemini call
+# (DOCUMENT_CACHE_PATH="" keeps the cache in memory only)
+DOCUMENT_CACHE_PATH = os.getenv("DOCUMENT_CACHE_PATH", "./document_cache.sqlite3")
+DOCUMENT_CACHE_TTL = int(os.getenv("DOCUMENT_CACHE_TTL", str(7 * 24 * 3600)))
+
+# Bump whenever the parsing prompt changes so cached results are not reused
+PARSE_PROMPT_VERSION = 1
+
+# Characters of each document sent to Gemini
+PARSE_CHAR_LIMIT = 4000
+
+# Max combined document characters for the single-request batch mode
+BATCH_PROMPT_CHAR_BUDGET = int(os.getenv("BATCH_PROMPT_CHAR_BUDGET", "12000"))
+
+PARSED_FIELDS_SCHEMA = """{
+  "student_name": "Full name of the person",
+  "email": "Email address if found",
+  "phone": "Phone number if found",
+  "university": "Name of university/institution",
+  "degree": "Degree program (e.g., Bachelor of Science in Computer Science)",
+  "major": "Major/Field of study",
+  "cgpa": 3.5,
+  "gpa_scale": 4.0,
+  "graduation_date": "Graduation date or expected",
+  "courses": ["Course 1", "Course 2"],
+  "honors": "Any honors/awards",
+  "skills": ["Skill 1", "Skill 2"],
+  "work_experience": "Brief work experience if CV",
+  "nationality": "Nationality if mentioned"
+}"""
+
+# Seconds a new extraction worker may take to start (not counted against EXTRACTION_TIMEOUT)
+WORKER_START_TIMEOUT = 60
+
+
+def _extraction_worker(conn):
+    """Worker process loop: run (fn, args) tasks received on conn until it closes"""
+    conn.send(None)  # Ready
+    while True:
+        try:
+            fn, args = conn.recv()
+        except (EOFError, OSError):
+            return
+        try:
+            result = (True, fn(*args))
+        except Exception as e:
+            result = (False, e)
+        try:
+            conn.send(result)
+        except Exception as e:
+            # Result or exception could not be pickled
+            conn.send((False, RuntimeError(f"{type(e).__name__}: {e}")))
+
+
+class _ExtractionWorker:
+    """One worker process and its pipe"""
+    
+    def __init__(self, context):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_extraction_worker, args=(child_conn,), daemon=True)
+        self.process.start()
+        child_conn.close()
+        if not self.conn.poll(WORKER_START_TIMEOUT):
+            self.kill()
+            raise RuntimeError("extraction worker did not start")
+        self.conn.recv()
+    
+    def run(self, fn, args, timeout):
+        """Returns (ok, result or exception); raises TimeoutError past timeout"""
+        self.conn.send((fn, args))
+        if not self.conn.poll(timeout):
+            raise TimeoutError(f"extraction took longer than {timeout}s")
+        return self.conn.recv()
+    
+    def kill(self):
+        self.process.kill()
+        self.process.join(5)
+        self.conn.close()
+
+
+class ExtractionPool:
     """
-    Parse academic documents and extract structured information using Gemini
+    Worker processes for text extraction that can be killed one at a time
+    
+    A task that runs past its timeout only takes down its own worker (a new
+    one starts on next use); other requests' tasks keep running. The timeout
+    starts when a worker picks the task up, not while it waits for a free
+    worker.
     """
     
-    def __init__(self):
-        self.model = genai.GenerativeModel("models/gemini-2.0-flash-exp")
+    def __init__(self, max_workers, mp_context=None):
+        """
+        Args:
+            max_workers: Max worker processes (and tasks running at once)
+            mp_context: multiprocessing context (defaults to spawn: forking
+                        the multi-threaded Flask process is not safe)
+        """
+        self.max_workers = max_workers
+        self._context = mp_context or multiprocessing.get_context("spawn")
+        self._slots = threading.BoundedSemaphore(max_workers)
+        self._idle = []
+        self._lock = threading.Lock()
     
-    def extract_text_from_pdf(self, file_content):
-        """Extract text from PDF"""
-        try:
-            # Create a BytesIO object from file content
-            pdf_file = io.BytesIO(file_content)
-            pdf_reader = PyPDF2.PdfReader(pdf_file)
-            text = ""
+    def run(self, fn, *args, timeout=None):
+        """
+        Run fn(*args) in a worker process and return its result
+        
+        Raises:
+            TimeoutError: the task ran longer than timeout (its worker is killed)
+            RuntimeError: the worker died (e.g. out of memory)
+            Whatever fn raised
+        """
+        with self._slots:
+            with self._lock:
+                worker = self._idle.pop() if self._idle else None
+            if worker is None:
+                worker = _ExtractionWorker(self._context)
             
-            print(f"📄 PDF has {len(pdf_reader.pages)} pages")
+            try:
+                ok, result = worker.run(fn, args, timeout)
+            except TimeoutError:
+                print(f"⏱️  Extraction timed out, killing its worker")
+                worker.kill()
+                raise
+            except (EOFError, OSError) as e:
+                worker.kill()
+                raise RuntimeError(f"extraction worker died: {e}") from e
             
-            for i, page in enumerate(pdf_reader.pages):
-                page_text = page.extract_text()
-                text += page_text + "\n"
-                print(f"Page {i+1} extracted {len(page_text)} characters")
+            with self._lock:
+                self._idle.append(worker)
+        
+        if not ok:
+            raise result
+        return result
+    
+    def shutdown(self):
+        """Stop the idle workers"""
+        with self._lock:
+            workers, self._idle = self._idle, []
+        for worker in workers:
+            worker.kill()
+
+
+_extraction_pool = None
+_extraction_pool_lock = threading.Lock()
+
+
+def get_extraction_pool(max_workers=EXTRACTION_WORKERS):
+    """Extraction pool shared by all parsers in this process (created on first use)"""
+    global _extraction_pool
+    with _extraction_pool_lock:
+        if _extraction_pool is None:
+            _extraction_pool = ExtractionPool(max_workers)
+        return _extraction_pool
+
+
+class DocumentTooLarge(Exception):
+    """Upload exceeds the configured file size or page limits (HTTP 413)"""
+
+
+@contextmanager
+def open_document(source, memory_map=True):
+    """
+    Open a document source for reading
+    
+    Args:
+        source: bytes (small uploads) or path of a spooled file
+        memory_map: Memory-map files instead of using a plain file stream
+                    (python-docx needs a seekable file object)
+    """
+    if isinstance(source, (bytes, bytearray)):
+        yield io.BytesIO(source)
+        return
+    
+    with open(source, 'rb') as f:
+        if not memory_map or os.fstat(f.fileno()).st_size == 0:
+            yield f
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            yield mapped
+
+
+def upload_size(file):
+    """Bytes left to read in an upload, without reading it (None if the stream cannot tell)"""
+    stream = getattr(file, 'stream', file)
+    path = getattr(stream, 'name', None)
+    if isinstance(path, str) and os.path.isfile(path):
+        return os.path.getsize(path)
+    try:
+        position = stream.tell()
+        end = stream.seek(0, os.SEEK_END)
+        stream.seek(position)
+        return end - position
+    except (AttributeError, OSError, ValueError):
+        return None
+
+
+@contextmanager
+def spool_upload(file, threshold=SPOOL_THRESHOLD_BYTES, max_bytes=MAX_UPLOAD_FILE_BYTES):
+    """
+    Read an upload in chunks, hashing as it goes, without holding large files in memory
+    
+    Uploads that already live in a named temporary file (see UploadRequest in
+    app.py) are used in place. Otherwise small uploads stay in memory and
+    larger ones are spooled to a temporary file that is removed afterwards.
+    
+    Yields:
+        (source, size, content_digest) - source is bytes or a file path
+    
+    Raises:
+        DocumentTooLarge: if the upload is bigger than max_bytes
+    """
+    digest = hashlib.sha256()
+    path = getattr(getattr(file, 'stream', None), 'name', None)
+    
+    if isinstance(path, str) and os.path.isfile(path):
+        size = os.path.getsize(path)
+        if size > max_bytes:
+            raise DocumentTooLarge(f"File is {size} bytes, the limit is {max_bytes}")
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(SPOOL_CHUNK_BYTES), b""):
+                digest.update(chunk)
+        yield path, size, digest.hexdigest()
+        return
+    
+    chunks = []
+    size = 0
+    spooled = None
+    try:
+        for chunk in iter(lambda: file.read(SPOOL_CHUNK_BYTES), b""):
+            size += len(chunk)
+            if size > max_bytes:
+                raise DocumentTooLarge(f"File is larger than the limit of {max_bytes} bytes")
+            digest.update(chunk)
             
-            print(f"✅ Total extracted: {len(text)} characters")
-            return text
+            if spooled is None and size > threshold:
+                spooled = tempfile.NamedTemporaryFile(prefix="upload_", delete=False)
+                spooled.writelines(chunks)
+                chunks = []
+            if spooled is not None:
+                spooled.write(chunk)
+            else:
+                chunks.append(chunk)
+        
+        if spooled is not None:
+            spooled.close()
+            yield spooled.name, size, digest.hexdigest()
+        else:
+            yield b"".join(chunks), size, digest.hexdigest()
+    finally:
+        if spooled is not None:
+            spooled.close()
+            os.unlink(spooled.name)
+
+
+def iter_pdf_pages(pdf_reader, start=0, end=None):
+    """Yield the text of pages [start, end) lazily, one page at a time"""
+    end = len(pdf_reader.pages) if end is None else end
+    for i in range(start, end):
+        yield pdf_reader.pages[i].extract_text() or ""
+
+
+def _count_pdf_pages(source):
+    """Number of pages in a PDF (reads only the page tree)"""
+    with open_document(source) as stream:
+        return len(PyPDF2.PdfReader(stream).pages)
+
+
+def _extract_pdf_pages(source, start, end):
+    """Extract text of pages [start, end) - runs in a worker process"""
+    with open_document(source) as stream:
+        pdf_reader = PyPDF2.PdfReader(stream)
+        return list(iter_pdf_pages(pdf_reader, start, end))
+
+
+def _extract_pdf_pages_until(source, char_budget):
+    """
+    Extract pages in order until char_budget characters are collected
+    - runs in a worker process
+    """
+    pages = []
+    collected = 0
+    with open_document(source) as stream:
+        for page_text in iter_pdf_pages(PyPDF2.PdfReader(stream)):
+            pages.append(page_text)
+            collected += len(page_text) + 1
+            if collected >= char_budget:
+                break
+    return pages
+
+
+def _extract_docx_text(source, char_budget=None):
+    """Extract paragraph text from a DOCX - runs in a worker process"""
+    with open_document(source, memory_map=False) as stream:
+        doc = docx.Document(stream)
+    paragraphs = []
+    collected = 0
+    for paragraph in doc.paragraphs:
+        paragraphs.append(paragraph.text)
+        collected += len(paragraph.text) + 1
+        if char_budget and collected >= char_budget:
+            break
+    return "\n".join(paragraphs)
+
+
+def merge_parsed_data(extracted_data, parsed):
+    """Merge one parsed document into the combined extracted data"""
+    # Merge personal info
+    if parsed.get('student_name') and not extracted_data['personal_info'].get('name'):
+        extracted_data['personal_info']['name'] = parsed['student_name']
+    if parsed.get('email'):
+        extracted_data['personal_info']['email'] = parsed['email']
+    if parsed.get('phone'):
+        extracted_data['personal_info']['phone'] = parsed['phone']
+    if parsed.get('nationality'):
+        extracted_data['personal_info']['nationality'] = parsed['nationality']
+    
+    # Merge academic info
+    if parsed.get('university'):
+        extracted_data['academic_info']['university'] = parsed['university']
+    if parsed.get('degree'):
+        extracted_data['academic_info']['degree'] = parsed['degree']
+    if parsed.get('major'):
+        extracted_data['academic_info']['major'] = parsed['major']
+    if parsed.get('cgpa'):
+        extracted_data['academic_info']['cgpa'] = parsed['cgpa']
+    if parsed.get('gpa_scale'):
+        extracted_data['academic_info']['gpa_scale'] = parsed['gpa_scale']
+    if parsed.get('graduation_date'):
+        extracted_data['academic_info']['graduation_date'] = parsed['graduation_date']
+    if parsed.get('courses'):
+        extracted_data['academic_info']['courses'] = parsed['courses']
+    if parsed.get('honors'):
+        extracted_data['academic_info']['honors'] = parsed['honors']
+    if parsed.get('skills'):
+        extracted_data['academic_info']['skills'] = parsed['skills']
+
+
+def merge_parsed_documents(parsed_documents):
+    """
+    Merge parsed documents into one profile, in the order given
+    
+    Args:
+        parsed_documents: Parsed JSON per document (None entries are skipped)
+    
+    Returns:
+        Dict with 'personal_info' and 'academic_info'
+    """
+    merged = {'personal_info': {}, 'academic_info': {}}
+    for parsed in parsed_documents:
+        if parsed:
+            merge_parsed_data(merged, parsed)
+    return merged
+
+
+class DocumentParser:
+    """
+    Parse academic documents and extract structured information using Gemini
+    """
+    
+    def __init__(self, extraction_workers=EXTRACTION_WORKERS, extraction_timeout=EXTRACTION_TIMEOUT,
+                 max_pages=MAX_PDF_PAGES, pages_per_task=PAGES_PER_TASK,
+                 cache_path=DOCUMENT_CACHE_PATH, cache_size=512, cache_ttl=DOCUMENT_CACHE_TTL,
+                 max_file_bytes=MAX_UPLOAD_FILE_BYTES, spool_threshold=SPOOL_THRESHOLD_BYTES,
+                 llm_client=None):
+        """
+        Args:
+            extraction_workers: Worker processes for text extraction (0 = in-process)
+            extraction_timeout: Seconds allowed to extract one document
+            max_pages: PDFs with more pages are rejected (DocumentTooLarge)
+            pages_per_task: Pages per worker task; larger PDFs are spread across workers
+            cache_path: SQLite file for the on-disk cache tier (empty/None = memory only)
+            cache_size: Max entries in the in-memory cache tier
+            cache_ttl: Seconds a cached extraction/parse result stays valid
+            max_file_bytes: Uploads larger than this are rejected (DocumentTooLarge)
+            spool_threshold: Uploads larger than this are read from a temporary file
+            llm_client: LLMClient for Gemini calls (defaults to the shared client)
+        """
+        self.llm = llm_client or get_llm_client()
+        self.extraction_workers = extraction_workers
+        self.extraction_timeout = extraction_timeout
+        self.max_pages = max_pages
+        self.pages_per_task = pages_per_task
+        self.max_file_bytes = max_file_bytes
+        self.spool_threshold = spool_threshold
+        
+        # Content-addressed cache of extracted text and parsed JSON
+        self.cache = TieredCache(
+            LRUCache(max_size=cache_size, ttl=cache_ttl),
+            SQLiteTTLStore(cache_path, table="documents", max_entries=cache_size * 20, ttl=cache_ttl)
+            if cache_path else None
+        )
+    
+    def _run_tasks(self, tasks):
+        """
+        Run (fn, *args) tasks on the extraction pool (or inline) and return
+        their results in order
+        
+        Each task may run for extraction_timeout seconds once a worker picks
+        it up; past that, TimeoutError is raised and only that task's worker
+        is killed.
+        """
+        if not self.extraction_workers:
+            return [fn(*args) for fn, *args in tasks]
+        
+        pool = get_extraction_pool(self.extraction_workers)
+        
+        def run(task):
+            return pool.run(*task, timeout=self.extraction_timeout)
+        
+        if len(tasks) == 1:
+            return [run(tasks[0])]
+        with ThreadPoolExecutor(max_workers=min(len(tasks), pool.max_workers)) as dispatch:
+            return list(dispatch.map(run, tasks))
+    
+    def extract_text_from_pdf(self, source, char_budget=None):
+        """Extract text from PDF (source is bytes or a file path)"""
+        try:
+            return self.extract_pdf(source, char_budget)['text']
+        except DocumentTooLarge:
+            raise
         except Exception as e:
             print(f"❌ Error reading PDF: {str(e)}")
             return ""
     
-    def extract_text_from_docx(self, file_content):
-        """Extract text from DOCX"""
+    def extract_pdf(self, source, char_budget=None):
+        """
+        Extract text from PDF, optionally stopping early
+        
+        Args:
+            source: PDF bytes or path of a spooled upload
+            char_budget: Stop once this many characters are collected (pages
+                         after that point are never extracted)
+        
+        Returns:
+            Dict with text, page_count, pages_extracted and pages_skipped
+        
+        Raises:
+            DocumentTooLarge: if the PDF has more than max_pages pages
+        """
+        # In a worker too: a malformed PDF can hang PyPDF2 before any page is read
+        page_count = self._run_tasks([(_count_pdf_pages, source)])[0]
+        
+        print(f"📄 PDF has {page_count} pages")
+        
+        if page_count > self.max_pages:
+            raise DocumentTooLarge(f"PDF has {page_count} pages, the limit is {self.max_pages}")
+        
+        if char_budget:
+            # Pages are pulled lazily into a list, so the rest of the PDF is never touched
+            pages = self._run_tasks([(_extract_pdf_pages_until, source, char_budget)])[0]
+        else:
+            # Spread page ranges across workers
+            tasks = [
+                (_extract_pdf_pages, source, start, min(start + self.pages_per_task, page_count))
+                for start in range(0, page_count, self.pages_per_task)
+            ]
+            pages = [page_text for chunk in self._run_tasks(tasks) for page_text in chunk]
+        
+        text = "\n".join(pages) + "\n" if pages else ""
+        pages_skipped = page_count - len(pages)
+        
+        if char_budget and pages_skipped:
+            print(f"⏭️  Reached {char_budget} character budget after {len(pages)} pages, skipped {pages_skipped}")
+        print(f"✅ Total extracted: {len(text)} characters")
+        
+        return {
+            'text': text,
+            'page_count': page_count,
+            'pages_extracted': len(pages),
+            'pages_skipped': pages_skipped
+        }
+    
+    def extract_text_from_docx(self, source, char_budget=None):
+        """Extract text from DOCX (source is bytes or a file path)"""
         try:
-            docx_file = io.BytesIO(file_content)
-            doc = docx.Document(docx_file)
-            text = "\n".join([paragraph.text for paragraph in doc.paragraphs])
+            text = self._run_tasks([(_extract_docx_text, source, char_budget)])[0]
             print(f"✅ DOCX extracted: {len(text)} characters")
             return text
         except Exception as e:
             print(f"❌ Error reading DOCX: {str(e)}")
             return ""
     
-    def extract_text(self, file, filename):
+    def check_upload_size(self, file):
+        """
+        Reject an upload larger than max_file_bytes without reading it
+        
+        Raises:
+            DocumentTooLarge: if the upload is too large (uploads whose size
+            is unknown are checked again while they are spooled)
+        """
+        size = upload_size(file)
+        if size is not None and size > self.max_file_bytes:
+            raise DocumentTooLarge(f"File is {size} bytes, the limit is {self.max_file_bytes}")
+    
+    def extract_text(self, file, filename, char_budget=None):
         """Extract text based on file type"""
+        return self.extract_document(file, filename, char_budget)[0]
+    
+    def extract_document(self, file, filename, char_budget=None):
+        """
+        Extract text based on file type
+        
+        Large uploads are read from a temporary file (memory-mapped for PDFs)
+        instead of being loaded into memory.
+        
+        Args:
+            file: Uploaded file object
+            filename: Original file name (decides PDF vs DOCX)
+            char_budget: Stop extracting once this many characters are collected
+        
+        Returns:
+            (text, content_digest) - the SHA-256 of the uploaded bytes keys the
+            cache for both the extracted text and the parsed result
+        
+        Raises:
+            DocumentTooLarge: if the upload exceeds the size or page limits
+        """
+        if filename.lower().endswith('.pdf'):
+            kind = 'pdf'
+        elif filename.lower().endswith(('.docx', '.doc')):
+            kind = 'docx'
+        else:
+            print(f"❌ Unsupported file format: {filename}")
+            return "", None
+        
         try:
-            # Read file content
-            file_content = file.read()
-            print(f"📥 File size: {len(file_content)} bytes")
-            
-            if filename.lower().endswith('.pdf'):
-                text = self.extract_text_from_pdf(file_content)
-            elif filename.lower().endswith(('.docx', '.doc')):
-                text = self.extract_text_from_docx(file_content)
-            else:
-                print(f"❌ Unsupported file format: {filename}")
-                return ""
+            with spool_upload(file, self.spool_threshold, self.max_file_bytes) as (source, size, content_digest):
+                print(f"📥 File size: {size} bytes")
+                
+                cache_key = f"text:{kind}:{content_digest}:{char_budget or 'all'}"
+                text = self.cache.get(cache_key)
+                if text is not None:
+                    print(f"⚡ Extracted text served from cache ({len(text)} characters)")
+                    return text, content_digest
+                
+                if kind == 'pdf':
+                    text = self.extract_text_from_pdf(source, char_budget)
+                else:
+                    text = self.extract_text_from_docx(source, char_budget)
             
             # Show preview of extracted text
             if text:
                 preview = text[:500].replace('\n', ' ')
                 print(f"📝 Text preview: {preview}...")
+                self.cache.set(cache_key, text)
             
-            return text
+            return text, content_digest
+        except DocumentTooLarge:
+            raise
         except Exception as e:
             print(f"❌ Error extracting text: {str(e)}")
-            return ""
+            return "", None
     
-    def parse_any_document(self, document_text, doc_type="transcript"):
+    def parse_any_document(self, document_text, doc_type="transcript", content_digest=None):
         """
         Parse any document (transcript, CV, degree) and extract all available information
+        
+        Args:
+            document_text: Extracted document text
+            doc_type: Kind of document (transcript, cv, degree, language_cert)
+            content_digest: SHA-256 of the uploaded bytes (from extract_document);
+                            defaults to a hash of the text
         """
+        if content_digest is None:
+            content_digest = hashlib.sha256(document_text.encode('utf-8')).hexdigest()
+        cache_key = f"parsed:{content_digest}:{doc_type}:{PARSE_PROMPT_VERSION}"
+        
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            print(f"⚡ Parsed {doc_type} served from cache")
+            return cached
+        
+        data = self._parse_with_gemini(document_text)
+        if data is not None:
+            self.cache.set(cache_key, data)
+        
+        return data
+    
+    def _parse_with_gemini(self, document_text):
+        """Send one document to Gemini and return the parsed JSON (None on failure)"""
         prompt = f"""
 You are an expert at extracting information from academic documents (transcripts, CVs, resumes, degree certificates).
 
 Analyze this document carefully and extract ALL available information.
 
 Document text:
-{document_text[:4000]}
+{document_text[:PARSE_CHAR_LIMIT]}
 
 Extract and return ONLY this JSON (use null for missing fields):
-{{
-  "student_name": "Full name of the person",
-  "email": "Email address if found",
-  "phone": "Phone number if found",
-  "university": "Name of university/institution",
-  "degree": "Degree program (e.g., Bachelor of Science in Computer Science)",
-  "major": "Major/Field of study",
-  "cgpa": 3.5,
-  "gpa_scale": 4.0,
-  "graduation_date": "Graduation date or expected",
-  "courses": ["Course 1", "Course 2"],
-  "honors": "Any honors/awards",
-  "skills": ["Skill 1", "Skill 2"],
-  "work_experience": "Brief work experience if CV",
-  "nationality": "Nationality if mentioned"
-}}
+{PARSED_FIELDS_SCHEMA}
 
 IMPORTANT: 
 1. Return ONLY the JSON object
@@ -112,10 +632,151 @@ IMPORTANT:
 4. Parse the actual text carefully - there IS information in this document
 """
         
+        print(f"🤖 Sending {len(document_text)} characters to Gemini...")
+        return self._generate_json(prompt)
+    
+    def parse_documents_batch(self, documents, char_budget=None, max_workers=4):
+        """
+        Parse several documents with as few Gemini requests as the budget allows
+        
+        Uncached documents are packed first-fit into batches whose combined
+        text stays within the budget; each batch is one request with
+        delimited sections (a batch of one is a normal per-document request).
+        Batches run concurrently, and documents missing from a batched
+        response are re-parsed one by one, also concurrently.
+        
+        Args:
+            documents: List of (doc_type, document_text, content_digest) tuples
+            char_budget: Max combined document characters for one prompt
+                         (defaults to BATCH_PROMPT_CHAR_BUDGET)
+            max_workers: Max Gemini requests in flight
+        
+        Returns:
+            Dict with 'documents' ({doc_type: parsed JSON or None}), 'merged'
+            (merge_parsed_documents of them, in the order given), 'mode' and
+            'requests' (Gemini requests made)
+        """
+        char_budget = char_budget or BATCH_PROMPT_CHAR_BUDGET
+        results = {}
+        pending = []
+        
+        # Cached documents never go back to Gemini
+        for doc_type, document_text, content_digest in documents:
+            if content_digest is None:
+                content_digest = hashlib.sha256(document_text.encode('utf-8')).hexdigest()
+            cache_key = f"parsed:{content_digest}:{doc_type}:{PARSE_PROMPT_VERSION}"
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                print(f"⚡ Parsed {doc_type} served from cache")
+                results[doc_type] = cached
+            else:
+                pending.append((doc_type, document_text, cache_key))
+        
+        # First-fit packing by (truncated) document size
+        batches = []
+        for document in pending:
+            size = min(len(document[1]), PARSE_CHAR_LIMIT)
+            for batch in batches:
+                if batch['size'] + size <= char_budget:
+                    batch['documents'].append(document)
+                    batch['size'] += size
+                    break
+            else:
+                batches.append({'documents': [document], 'size': size})
+        
+        if batches:
+            print(f"🤖 Parsing {len(pending)} documents in {len(batches)} Gemini requests...")
+        batched = False
+        retry = []
+        for batch, parsed_documents in zip(batches, self._map_concurrently(self._parse_batch, batches, max_workers)):
+            for doc_type, text, cache_key in batch['documents']:
+                parsed = parsed_documents.get(doc_type)
+                if isinstance(parsed, dict):
+                    batched = batched or len(batch['documents']) > 1
+                    results[doc_type] = parsed
+                    self.cache.set(cache_key, parsed)
+                elif len(batch['documents']) > 1:
+                    retry.append((doc_type, text, cache_key))
+                else:
+                    results[doc_type] = None
+        
+        # Fallback: one request per document the batched responses missed
+        if retry:
+            print(f"ℹ️  {len(retry)} documents missing from batched responses, parsing one by one")
+        for (doc_type, _, cache_key), parsed in zip(
+                retry, self._map_concurrently(lambda document: self._parse_with_gemini(document[1]), retry, max_workers)):
+            results[doc_type] = parsed
+            if parsed is not None:
+                self.cache.set(cache_key, parsed)
+        
+        parsed_documents = {doc_type: results.get(doc_type) for doc_type, _, _ in documents}
+        return {
+            'documents': parsed_documents,
+            'merged': merge_parsed_documents(parsed_documents.values()),
+            'mode': 'batch' if batched else 'per_document',
+            'requests': len(batches) + len(retry)
+        }
+    
+    @staticmethod
+    def _map_concurrently(fn, items, max_workers):
+        """fn(item) for every item on a thread pool, results in order"""
+        if len(items) <= 1:
+            return [fn(item) for item in items]
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(items)))) as executor:
+            return list(executor.map(fn, items))
+    
+    def _parse_batch(self, batch):
+        """
+        Parse one packed batch with a single Gemini request
+        
+        Returns:
+            {doc_type: parsed JSON} for the documents in the response
+        """
+        documents = batch['documents']
+        if len(documents) == 1:
+            doc_type, text, _ = documents[0]
+            print(f"\n--- Parsing {doc_type} ---")
+            return {doc_type: self._parse_with_gemini(text)}
+        
+        sections = "\n\n".join(
+            f"=== DOCUMENT {i}: {doc_type} ===\n{text[:PARSE_CHAR_LIMIT]}\n=== END DOCUMENT {i} ==="
+            for i, (doc_type, text, _) in enumerate(documents, 1)
+        )
+        doc_types = ", ".join(f'"{doc_type}"' for doc_type, _, _ in documents)
+        prompt = f"""
+You are an expert at extracting information from academic documents (transcripts, CVs, resumes, degree certificates).
+
+Below are {len(documents)} documents belonging to the same person, each between
+"=== DOCUMENT n: type ===" and "=== END DOCUMENT n ===" markers.
+Analyze every document carefully and extract ALL available information from each one.
+
+{sections}
+
+For each document, fill in this JSON (use null for missing fields):
+{PARSED_FIELDS_SCHEMA}
+
+Return ONLY this JSON object:
+{{
+  "documents": {{ one entry per document type ({doc_types}) with the JSON above }}
+}}
+
+IMPORTANT: 
+1. Return ONLY the JSON object
+2. No markdown code blocks
+3. No explanations
+4. Parse the actual text carefully - there IS information in these documents
+"""
+        print(f"🤖 Sending {len(documents)} documents ({batch['size']} characters) to Gemini in one request...")
+        data = self._generate_json(prompt) or {}
+        return data.get('documents') if isinstance(data.get('documents'), dict) else {}
+    
+    def _generate_json(self, prompt):
+        """
+        Send a prompt to Gemini and return the JSON object in its response
+        (None on failure; LLMUnavailable is raised, not swallowed)
+        """
         try:
-            print(f"🤖 Sending {len(document_text)} characters to Gemini...")
-            response = self.model.generate_content(prompt)
-            text = response.text.strip()
+            text = self.llm.generate(prompt).strip()
             
             print(f"📨 Gemini response length: {len(text)} characters")
             print(f"Raw response: {text[:300]}...")
@@ -144,6 +805,9 @@ IMPORTANT:
                 print("❌ No JSON found in response")
                 return None
             
+        except LLMUnavailable:
+            # Not a parsing failure: the route answers 503 so the client retries
+            raise
         except json.JSONDecodeError as e:
             print(f"❌ JSON parsing error: {e}")
             print(f"Failed text: {text[:500]}")
@@ -152,4 +816,4 @@ IMPORTANT:
             print(f"❌ Error parsing document: {e}")
             import traceback
             traceback.print_exc()
-            return None
\ No newline at end of file
+            return None
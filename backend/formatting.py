@@ -0,0 +1,31 @@
+"""
+Format Gemini answers into the sections the frontend renders
+"""
+
+
+def format_line(line):
+    """Format a single answer line into a section (None for blank lines)"""
+    line = line.strip()
+    if not line:
+        return None
+
+    if line[0].isdigit() and '.' in line[:4]:
+        return {'type': 'numbered', 'content': line}
+    elif line.startswith('*') or line.startswith('-') or line.startswith('•'):
+        return {'type': 'bullet', 'content': line.lstrip('*-• ')}
+    elif line.startswith('**') and line.endswith('**'):
+        return {'type': 'header', 'content': line.strip('*')}
+    else:
+        return {'type': 'text', 'content': line}
+
+
+def format_response(text):
+    """Format response into structured sections"""
+    sections = []
+
+    for line in text.split('\n'):
+        section = format_line(line)
+        if section:
+            sections.append(section)
+
+    return sections
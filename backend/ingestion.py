@@ -0,0 +1,224 @@
+import os
+import queue
+import re
+import threading
+import time
+import zlib
+
+import numpy as np
+from chromadb import EmbeddingFunction
+
+EMBEDDING_MODEL_NAME = "all-MiniLM-L6-v2"
+
+# Model name of the offline HashingEmbeddingModel (no download, no torch)
+HASHING_MODEL_NAME = "hashing"
+
+
+class HashingEmbeddingModel:
+    """
+    Offline stand-in for the SentenceTransformer model
+
+    Embeds text by hashing word unigrams and bigrams into a fixed number of
+    dimensions (L2-normalized). Much weaker than the real model, but
+    deterministic and fast, so benchmarks and offline development run
+    without downloading anything.
+    """
+
+    def __init__(self, dim=384):
+        self.dim = dim
+
+    def encode(self, documents, batch_size=None, convert_to_numpy=True, show_progress_bar=False, **kwargs):
+        embeddings = np.zeros((len(documents), self.dim), dtype=np.float32)
+        for row, document in enumerate(documents):
+            words = re.findall(r"\w+", str(document).lower())
+            for term in words + [a + " " + b for a, b in zip(words, words[1:])]:
+                embeddings[row, zlib.crc32(term.encode()) % self.dim] += 1.0
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        return embeddings / np.maximum(norms, 1e-12)
+
+
+class HashingEmbeddingFunction(EmbeddingFunction):
+    """ChromaDB embedding function backed by HashingEmbeddingModel"""
+
+    def __init__(self, dim=384):
+        self.model = HashingEmbeddingModel(dim)
+
+    def __call__(self, input):
+        return list(self.model.encode(list(input)))
+
+    @staticmethod
+    def name():
+        return "uniadvisor_hashing"
+
+    def get_config(self):
+        return {'dim': self.model.dim}
+
+    @staticmethod
+    def build_from_config(config):
+        return HashingEmbeddingFunction(config.get('dim', 384))
+
+
+class EmbeddingIngestionEngine:
+    """
+    Bulk ingestion engine for the course collection
+
+    Documents are encoded up front in large batches (optionally on a
+    multi-process pool spanning all CPU cores) and the pre-computed
+    embeddings are written to ChromaDB on a background thread, so encoding
+    of the next chunk overlaps with writing the previous one.
+    """
+
+    def __init__(self, model_name=EMBEDDING_MODEL_NAME, encode_batch_size=256,
+                 chunk_size=2048, write_batch_size=1000, num_workers=1,
+                 device="cpu", queue_depth=2):
+        """
+        Args:
+            model_name: SentenceTransformer model (must match the collection's
+                        embedding function so queries and documents agree),
+                        or HASHING_MODEL_NAME for offline hashing embeddings
+            encode_batch_size: Batch size of each model forward pass
+            chunk_size: Documents encoded per pipeline step
+            write_batch_size: Documents per ChromaDB upsert call
+            num_workers: Encode processes; 1 encodes in-process, -1 uses all cores
+            device: Torch device for in-process encoding
+            queue_depth: Encoded chunks allowed to wait for the writer
+        """
+        self.model_name = model_name
+        self.encode_batch_size = encode_batch_size
+        self.chunk_size = chunk_size
+        self.write_batch_size = write_batch_size
+        if num_workers == -1:
+            num_workers = os.cpu_count() or 1
+        self.num_workers = max(1, num_workers)
+        self.device = device
+        self.queue_depth = queue_depth
+
+        self._model = None
+        self._pool = None
+
+    @property
+    def model(self):
+        """SentenceTransformer model, loaded on first use"""
+        if self._model is None and self.model_name == HASHING_MODEL_NAME:
+            self._model = HashingEmbeddingModel()
+        if self._model is None:
+            from sentence_transformers import SentenceTransformer
+            print(f"🧠 Loading embedding model {self.model_name}...")
+            self._model = SentenceTransformer(self.model_name, device=self.device)
+        return self._model
+
+    def start_pool(self):
+        """Start the multi-process encode pool (no-op for a single worker)"""
+        if self.num_workers > 1 and self._pool is None and self.model_name != HASHING_MODEL_NAME:
+            print(f"⚙️  Starting encode pool with {self.num_workers} processes...")
+            self._pool = self.model.start_multi_process_pool(
+                target_devices=["cpu"] * self.num_workers
+            )
+
+    def stop_pool(self):
+        """Shut down the encode pool if one is running"""
+        if self._pool is not None:
+            self.model.stop_multi_process_pool(self._pool)
+            self._pool = None
+
+    def encode(self, documents):
+        """
+        Encode a list of documents into embeddings
+
+        Returns:
+            numpy array of shape (len(documents), dim)
+        """
+        if self._pool is not None:
+            return self.model.encode_multi_process(
+                documents, self._pool, batch_size=self.encode_batch_size
+            )
+        return self.model.encode(
+            documents,
+            batch_size=self.encode_batch_size,
+            convert_to_numpy=True,
+            show_progress_bar=False
+        )
+
+    def ingest(self, collection, records):
+        """
+        Encode and upsert records into a ChromaDB collection
+
+        Args:
+            collection: Target ChromaDB collection
+            records: Dict of {course_id: (document, metadata)}
+
+        Returns:
+            Dict with documents, seconds, encode_seconds, write_seconds and docs_per_sec
+        """
+        items = list(records.items())
+        stats = {'documents': len(items), 'seconds': 0.0, 'encode_seconds': 0.0,
+                 'write_seconds': 0.0, 'docs_per_sec': 0.0}
+        if not items:
+            return stats
+
+        started = time.perf_counter()
+        chunks = queue.Queue(maxsize=self.queue_depth)
+        writer_error = []
+
+        def writer():
+            while True:
+                chunk = chunks.get()
+                if chunk is None:
+                    return
+                if writer_error:
+                    continue  # Drain the queue so the producer never blocks
+                try:
+                    write_started = time.perf_counter()
+                    self._write_chunk(collection, *chunk)
+                    stats['write_seconds'] += time.perf_counter() - write_started
+                except Exception as e:
+                    writer_error.append(e)
+
+        writer_thread = threading.Thread(target=writer, name="chroma-writer", daemon=True)
+        writer_thread.start()
+
+        owns_pool = self.num_workers > 1 and self._pool is None and self.model_name != HASHING_MODEL_NAME
+        try:
+            if owns_pool:
+                self.start_pool()
+
+            for start in range(0, len(items), self.chunk_size):
+                if writer_error:
+                    break
+                batch = items[start:start + self.chunk_size]
+                ids = [course_id for course_id, _ in batch]
+                documents = [doc_text for _, (doc_text, _) in batch]
+                metadatas = [metadata for _, (_, metadata) in batch]
+
+                encode_started = time.perf_counter()
+                embeddings = self.encode(documents)
+                stats['encode_seconds'] += time.perf_counter() - encode_started
+
+                chunks.put((ids, embeddings, documents, metadatas))
+                print(f"   ✓ Encoded {min(start + self.chunk_size, len(items))}/{len(items)} courses...")
+        finally:
+            chunks.put(None)
+            writer_thread.join()
+            if owns_pool:
+                self.stop_pool()
+
+        if writer_error:
+            raise writer_error[0]
+
+        stats['seconds'] = time.perf_counter() - started
+        stats['docs_per_sec'] = len(items) / stats['seconds'] if stats['seconds'] else 0.0
+        print(f"   ⚡ Ingested {len(items)} courses in {stats['seconds']:.1f}s "
+              f"({stats['docs_per_sec']:.0f} docs/sec)")
+
+        return stats
+
+    def _write_chunk(self, collection, ids, embeddings, documents, metadatas):
+        """Upsert one encoded chunk in write_batch_size slices"""
+        for start in range(0, len(ids), self.write_batch_size):
+            end = start + self.write_batch_size
+            collection.upsert(
+                ids=ids[start:end],
+                embeddings=embeddings[start:end],
+                documents=documents[start:end],
+                metadatas=metadatas[start:end]
+            )
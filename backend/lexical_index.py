@@ -0,0 +1,186 @@
+import heapq
+import math
+import re
+import threading
+from array import array
+
+TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(text):
+    """Lowercase word tokens (keeps exact tokens like 'ielts', 'toefl', city names)"""
+    return TOKEN_PATTERN.findall(str(text).lower())
+
+
+def reciprocal_rank_fusion(rankings, k=60):
+    """
+    Fuse several ranked lists of IDs with reciprocal-rank fusion
+
+    Args:
+        rankings: List of ranked ID lists (best first)
+        k: RRF damping constant
+
+    Returns:
+        List of (id, score) sorted by fused score
+    """
+    scores = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, 1):
+            scores[doc_id] = scores.get(doc_id, 0.0) + 1.0 / (k + rank)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+
+class BM25Index:
+    """
+    In-memory BM25 inverted index over course documents
+
+    Postings are stored as compact array('I') pairs (document numbers and
+    term frequencies). Removed documents are tombstoned and dropped from
+    the postings on the next compaction.
+    """
+
+    def __init__(self, k1=1.5, b=0.75, compact_ratio=0.2):
+        """
+        Args:
+            k1: BM25 term-frequency saturation
+            b: BM25 length normalization
+            compact_ratio: Share of tombstoned documents that triggers compaction
+        """
+        self.k1 = k1
+        self.b = b
+        self.compact_ratio = compact_ratio
+        self._lock = threading.RLock()
+        self._reset()
+
+    def _reset(self):
+        self._doc_ids = []              # doc number -> external ID
+        self._doc_numbers = {}          # external ID -> doc number
+        self._doc_lengths = array('I')
+        self._degree_types = []
+        self._postings = {}             # term -> (array doc numbers, array term freqs)
+        self._deleted = set()
+        self._total_length = 0
+
+    def clear(self):
+        """Remove every document"""
+        with self._lock:
+            self._reset()
+
+    def __len__(self):
+        return len(self._doc_numbers)
+
+    def add(self, doc_id, text, degree_type=None):
+        """Index (or re-index) a document"""
+        tokens = tokenize(text)
+        frequencies = {}
+        for token in tokens:
+            frequencies[token] = frequencies.get(token, 0) + 1
+
+        with self._lock:
+            if doc_id in self._doc_numbers:
+                self._remove(doc_id)
+                self._maybe_compact()
+
+            doc_number = len(self._doc_ids)
+            self._doc_ids.append(doc_id)
+            self._doc_numbers[doc_id] = doc_number
+            self._doc_lengths.append(len(tokens))
+            self._degree_types.append(degree_type)
+            self._total_length += len(tokens)
+
+            for term, frequency in frequencies.items():
+                postings = self._postings.get(term)
+                if postings is None:
+                    postings = (array('I'), array('I'))
+                    self._postings[term] = postings
+                postings[0].append(doc_number)
+                postings[1].append(frequency)
+
+    def remove(self, doc_id):
+        """Remove a document (no-op if it is not indexed)"""
+        with self._lock:
+            if doc_id in self._doc_numbers:
+                self._remove(doc_id)
+                self._maybe_compact()
+
+    def _remove(self, doc_id):
+        doc_number = self._doc_numbers.pop(doc_id)
+        self._deleted.add(doc_number)
+        self._total_length -= self._doc_lengths[doc_number]
+
+    def _maybe_compact(self):
+        """Compact once tombstones exceed compact_ratio of all document numbers"""
+        if len(self._deleted) > self.compact_ratio * max(len(self._doc_ids), 1):
+            self._compact()
+
+    def _compact(self):
+        """Renumber live documents and drop tombstoned postings"""
+        remap = {}
+        doc_ids, doc_lengths, degree_types = [], array('I'), []
+        for old_number, doc_id in enumerate(self._doc_ids):
+            if old_number in self._deleted:
+                continue
+            remap[old_number] = len(doc_ids)
+            doc_ids.append(doc_id)
+            doc_lengths.append(self._doc_lengths[old_number])
+            degree_types.append(self._degree_types[old_number])
+
+        postings = {}
+        for term, (numbers, frequencies) in self._postings.items():
+            new_numbers, new_frequencies = array('I'), array('I')
+            for number, frequency in zip(numbers, frequencies):
+                if number in remap:
+                    new_numbers.append(remap[number])
+                    new_frequencies.append(frequency)
+            if new_numbers:
+                postings[term] = (new_numbers, new_frequencies)
+
+        self._doc_ids = doc_ids
+        self._doc_numbers = {doc_id: number for number, doc_id in enumerate(doc_ids)}
+        self._doc_lengths = doc_lengths
+        self._degree_types = degree_types
+        self._postings = postings
+        self._deleted = set()
+
+    def search(self, query, n_results=5, degree_filter=None):
+        """
+        Rank documents for a query with BM25
+
+        Args:
+            query: Query text
+            n_results: Number of documents to return
+            degree_filter: Only return documents with this degree type
+
+        Returns:
+            List of (doc_id, score), best first
+        """
+        with self._lock:
+            n_docs = len(self._doc_numbers)
+            if n_docs == 0:
+                return []
+
+            avg_length = self._total_length / n_docs
+            scores = {}
+
+            for term in set(tokenize(query)):
+                postings = self._postings.get(term)
+                if postings is None:
+                    continue
+                numbers, frequencies = postings
+                doc_freq = len(numbers)
+                if self._deleted:
+                    doc_freq -= sum(1 for number in numbers if number in self._deleted)
+                if doc_freq == 0:
+                    continue
+                idf = math.log(1 + (n_docs - doc_freq + 0.5) / (doc_freq + 0.5))
+
+                for number, frequency in zip(numbers, frequencies):
+                    if number in self._deleted:
+                        continue
+                    if degree_filter and self._degree_types[number] != degree_filter:
+                        continue
+                    norm = self.k1 * (1 - self.b + self.b * self._doc_lengths[number] / avg_length)
+                    scores[number] = scores.get(number, 0.0) + idf * frequency * (self.k1 + 1) / (frequency + norm)
+
+            best = heapq.nlargest(n_results, scores.items(), key=lambda item: item[1])
+            return [(self._doc_ids[number], score) for number, score in best]
@@ -0,0 +1,449 @@
+import os
+import random
+import threading
+import time
+from collections import deque
+
+import google.generativeai as genai
+from google.api_core import exceptions as google_exceptions
+
+from rate_limit import TokenBucket
+
+# 'fake' uses FakeGenerativeModel (no API key or network needed)
+GEMINI_MODEL = os.getenv("GEMINI_MODEL", "models/gemini-2.0-flash-exp")
+
+LLM_RATE_LIMIT = float(os.getenv("LLM_RATE_LIMIT", "5"))        # requests/sec
+LLM_BURST = int(os.getenv("LLM_BURST", "10"))
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "30"))              # seconds per call, retries included
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "3"))
+LLM_BACKOFF_BASE = float(os.getenv("LLM_BACKOFF_BASE", "0.5"))
+LLM_BACKOFF_MAX = float(os.getenv("LLM_BACKOFF_MAX", "8"))
+LLM_BREAKER_THRESHOLD = int(os.getenv("LLM_BREAKER_THRESHOLD", "5"))
+LLM_BREAKER_RESET = float(os.getenv("LLM_BREAKER_RESET", "30"))
+
+# Upstream errors worth retrying (throttling, overload, timeouts)
+RETRYABLE_ERRORS = (
+    google_exceptions.ResourceExhausted,
+    google_exceptions.TooManyRequests,
+    google_exceptions.ServiceUnavailable,
+    google_exceptions.InternalServerError,
+    google_exceptions.BadGateway,
+    google_exceptions.GatewayTimeout,
+    google_exceptions.DeadlineExceeded,
+    google_exceptions.Aborted,
+    ConnectionError,
+    TimeoutError,
+)
+
+
+class LLMError(Exception):
+    """A Gemini call failed"""
+
+
+class LLMUnavailable(LLMError):
+    """Gemini is not being called right now (circuit open, rate limit or deadline reached)"""
+
+
+class CircuitBreaker:
+    """
+    Fails fast after repeated upstream failures
+
+    After failure_threshold consecutive failures the breaker opens and
+    rejects calls for reset_timeout seconds, then lets a single trial call
+    through (half-open); its outcome closes or re-opens the breaker.
+    """
+
+    def __init__(self, failure_threshold=LLM_BREAKER_THRESHOLD, reset_timeout=LLM_BREAKER_RESET):
+        """
+        Args:
+            failure_threshold: Consecutive failures that open the breaker
+            reset_timeout: Seconds the breaker stays open before a trial call
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._state = 'closed'
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trials = 0
+        self._trial_running = None
+
+    @property
+    def state(self):
+        with self._lock:
+            if self._state == 'open' and time.monotonic() - self._opened_at >= self.reset_timeout:
+                return 'half_open'
+            return self._state
+
+    def allow(self):
+        """
+        Check whether a call may go upstream now
+
+        Returns:
+            (allowed, trial) - trial identifies the half-open trial call
+            (None for a normal call); pass it to release() when the call ends
+        """
+        with self._lock:
+            if self._state == 'closed':
+                return True, None
+            if self._state == 'open':
+                if time.monotonic() - self._opened_at < self.reset_timeout:
+                    return False, None
+                self._state = 'half_open'
+            if self._trial_running is not None:
+                return False, None
+            self._trials += 1
+            self._trial_running = self._trials
+            return True, self._trial_running
+
+    def release(self, trial):
+        """End a call; frees the half-open trial slot if this call was that trial"""
+        if trial is None:
+            return
+        with self._lock:
+            if self._trial_running == trial:
+                self._trial_running = None
+
+    def record_success(self):
+        with self._lock:
+            self._state = 'closed'
+            self._failures = 0
+            self._trial_running = None
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._trial_running = None
+            if self._state == 'half_open' or self._failures >= self.failure_threshold:
+                if self._state != 'open':
+                    print(f"🔌 Gemini circuit breaker opened after {self._failures} failures")
+                self._state = 'open'
+                self._opened_at = time.monotonic()
+
+
+class LLMClient:
+    """
+    Shared Gemini client with rate limiting, bounded concurrency, per-call
+    deadlines, jittered exponential backoff and a circuit breaker
+
+    Every Gemini call in the backend goes through one instance (see
+    get_llm_client), so limits apply to the whole process. Any object with
+    a generate_content(prompt, stream=..., request_options=...) method can
+    stand in for the model, e.g. FakeGenerativeModel.
+    """
+
+    def __init__(self, model=None, model_name=GEMINI_MODEL, rate=LLM_RATE_LIMIT, burst=LLM_BURST,
+                 max_concurrency=LLM_MAX_CONCURRENCY, timeout=LLM_TIMEOUT,
+                 max_retries=LLM_MAX_RETRIES, backoff_base=LLM_BACKOFF_BASE,
+                 backoff_max=LLM_BACKOFF_MAX, breaker=None, metrics_window=1000):
+        """
+        Args:
+            model: Model object to call (built from model_name when None)
+            model_name: Gemini model name, or 'fake' for FakeGenerativeModel
+            rate: Sustained requests per second (0 disables rate limiting)
+            burst: Requests allowed back to back before rate limiting starts
+            max_concurrency: Max Gemini calls in flight at once
+            timeout: Default seconds per call, including waiting and retries
+            max_retries: Retries after the first attempt for retryable errors
+            backoff_base: First backoff delay in seconds (doubles per retry)
+            backoff_max: Upper bound of a single backoff delay
+            breaker: CircuitBreaker (a default one is created when None)
+            metrics_window: Number of recent calls kept for latency percentiles
+        """
+        self.model_name = model_name
+        self._model = model
+        self._model_lock = threading.Lock()
+        self.rate_limiter = TokenBucket(rate, burst) if rate else None
+        self.max_concurrency = max_concurrency
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.breaker = breaker or CircuitBreaker()
+
+        self._metrics_lock = threading.Lock()
+        self._latencies = deque(maxlen=metrics_window)
+        self._counters = {
+            'calls': 0, 'successes': 0, 'failures': 0, 'retries': 0,
+            'rejected': 0, 'timeouts': 0, 'in_flight': 0,
+            'prompt_tokens': 0, 'completion_tokens': 0
+        }
+
+    @property
+    def model(self):
+        """Model object, built on first use"""
+        if self._model is None:
+            with self._model_lock:
+                if self._model is None:
+                    if self.model_name == "fake":
+                        self._model = FakeGenerativeModel()
+                    else:
+                        genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
+                        self._model = genai.GenerativeModel(self.model_name)
+        return self._model
+
+    def generate(self, prompt, timeout=None):
+        """
+        Generate a complete response
+
+        Args:
+            prompt: Prompt text
+            timeout: Seconds allowed for the call (defaults to self.timeout)
+
+        Returns:
+            Response text
+
+        Raises:
+            LLMUnavailable: circuit open, or no rate/concurrency slot before the deadline
+            LLMError: the call failed (after retries for retryable errors)
+        """
+        deadline = time.monotonic() + (timeout or self.timeout)
+
+        def call(remaining):
+            response = self.model.generate_content(prompt, request_options={'timeout': remaining})
+            return response.text, response
+
+        text, _ = self._call(call, deadline)
+        return text
+
+    def stream(self, prompt, timeout=None):
+        """
+        Stream a response chunk by chunk
+
+        Failures before the first chunk are retried like generate(); once
+        text has been yielded an error is raised as LLMError instead.
+
+        Yields:
+            Text chunks
+        """
+        deadline = time.monotonic() + (timeout or self.timeout)
+        trial = self._admit(deadline)
+        started = time.perf_counter()
+        try:
+            for attempt in range(self.max_retries + 1):
+                yielded = False
+                try:
+                    remaining = self._remaining(deadline)
+                    response = self.model.generate_content(
+                        prompt, stream=True, request_options={'timeout': remaining}
+                    )
+                    for chunk in response:
+                        if chunk.text:
+                            yielded = True
+                            yield chunk.text
+                    self._record_success(started, response)
+                    return
+                except LLMUnavailable:
+                    raise
+                except Exception as e:
+                    if not self._handle_failure(e, attempt, deadline, retry=not yielded):
+                        raise LLMError(f"Gemini streaming failed: {e}") from e
+        finally:
+            self._release(trial)
+
+    def _call(self, call, deadline):
+        """Run call(remaining_seconds) with admission control and retries"""
+        trial = self._admit(deadline)
+        started = time.perf_counter()
+        try:
+            for attempt in range(self.max_retries + 1):
+                try:
+                    text, response = call(self._remaining(deadline))
+                    self._record_success(started, response)
+                    return text, response
+                except LLMUnavailable:
+                    raise
+                except Exception as e:
+                    if not self._handle_failure(e, attempt, deadline, retry=True):
+                        raise LLMError(f"Gemini call failed: {e}") from e
+        finally:
+            self._release(trial)
+
+    def _admit(self, deadline):
+        """
+        Check the breaker, then wait for a rate token and a concurrency slot
+
+        Returns:
+            The breaker trial token (None unless this is the half-open trial call)
+        """
+        with self._metrics_lock:
+            self._counters['calls'] += 1
+
+        # Cheap check first so an open breaker never waits for a token
+        if self.breaker.state == 'open':
+            self._reject("circuit breaker is open")
+        if self.rate_limiter is not None and not self.rate_limiter.acquire(timeout=self._remaining(deadline)):
+            self._reject("rate limit reached")
+        if not self._slots.acquire(timeout=self._remaining(deadline)):
+            self._reject("too many concurrent requests")
+        allowed, trial = self.breaker.allow()
+        if not allowed:
+            self._slots.release()
+            self._reject("circuit breaker is open")
+
+        with self._metrics_lock:
+            self._counters['in_flight'] += 1
+        return trial
+
+    def _release(self, trial):
+        self.breaker.release(trial)
+        with self._metrics_lock:
+            self._counters['in_flight'] -= 1
+        self._slots.release()
+
+    def _reject(self, reason):
+        with self._metrics_lock:
+            self._counters['rejected'] += 1
+        raise LLMUnavailable(f"Gemini unavailable: {reason}")
+
+    def _remaining(self, deadline):
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            with self._metrics_lock:
+                self._counters['timeouts'] += 1
+            raise LLMUnavailable("Gemini call deadline exceeded")
+        return remaining
+
+    def _handle_failure(self, error, attempt, deadline, retry):
+        """
+        Record a failed attempt and sleep before the next one
+
+        Returns:
+            True if the call should be retried
+        """
+        retryable = isinstance(error, RETRYABLE_ERRORS)
+        if retryable:
+            self.breaker.record_failure()
+        if isinstance(error, (google_exceptions.DeadlineExceeded, TimeoutError)):
+            with self._metrics_lock:
+                self._counters['timeouts'] += 1
+
+        delay = min(self.backoff_max, self.backoff_base * 2 ** attempt) * random.random()
+        if (not retry or not retryable or attempt >= self.max_retries
+                or time.monotonic() + delay >= deadline or self.breaker.state != 'closed'):
+            with self._metrics_lock:
+                self._counters['failures'] += 1
+            print(f"❌ Gemini call failed: {error}")
+            return False
+
+        print(f"🔁 Gemini call failed ({error}), retrying in {delay:.2f}s...")
+        with self._metrics_lock:
+            self._counters['retries'] += 1
+        time.sleep(delay)
+        return True
+
+    def _record_success(self, started, response):
+        self.breaker.record_success()
+        usage = getattr(response, 'usage_metadata', None)
+        with self._metrics_lock:
+            self._counters['successes'] += 1
+            self._latencies.append(time.perf_counter() - started)
+            if usage is not None:
+                self._counters['prompt_tokens'] += getattr(usage, 'prompt_token_count', 0) or 0
+                self._counters['completion_tokens'] += getattr(usage, 'candidates_token_count', 0) or 0
+
+    def metrics(self):
+        """Call counters, token totals, latency percentiles and breaker state"""
+        with self._metrics_lock:
+            counters = dict(self._counters)
+            latencies = sorted(self._latencies)
+
+        def percentile(pct):
+            if not latencies:
+                return None
+            return round(latencies[min(len(latencies) - 1, int(pct / 100 * len(latencies)))], 4)
+
+        return {
+            **counters,
+            'latency_p50': percentile(50),
+            'latency_p95': percentile(95),
+            'latency_p99': percentile(99),
+            'breaker_state': self.breaker.state,
+            'max_concurrency': self.max_concurrency
+        }
+
+
+class FakeGenerativeModel:
+    """
+    Local stand-in for genai.GenerativeModel (no network)
+
+    Sleeps for a configurable latency, can fail a share of calls with
+    ServiceUnavailable and honours request_options timeouts, so the client's
+    retry/timeout/breaker behaviour can be exercised offline.
+    """
+
+    def __init__(self, reply=None, latency=0.05, failure_rate=0.0, seed=None):
+        """
+        Args:
+            reply: Response text, or a callable(prompt) -> text
+            latency: Seconds each call takes
+            failure_rate: Share of calls that raise ServiceUnavailable
+            seed: Random seed for failures
+        """
+        self.reply = reply
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.calls = 0
+
+    def generate_content(self, prompt, stream=False, request_options=None, **kwargs):
+        with self._lock:
+            self.calls += 1
+            fail = self._rng.random() < self.failure_rate
+
+        timeout = (request_options or {}).get('timeout')
+        if timeout is not None and self.latency > timeout:
+            time.sleep(timeout)
+            raise google_exceptions.DeadlineExceeded("Fake model timed out")
+        time.sleep(self.latency)
+        if fail:
+            raise google_exceptions.ServiceUnavailable("Fake model is overloaded")
+
+        if callable(self.reply):
+            text = self.reply(prompt)
+        elif self.reply is not None:
+            text = self.reply
+        else:
+            text = f"Fake answer for a prompt of {len(prompt)} characters."
+        return _FakeResponse(prompt, text, stream)
+
+
+class _FakeUsage:
+    def __init__(self, prompt, text):
+        # Roughly 4 characters per token
+        self.prompt_token_count = len(prompt) // 4
+        self.candidates_token_count = len(text) // 4
+
+
+class _FakeChunk:
+    def __init__(self, text):
+        self.text = text
+
+
+class _FakeResponse:
+    def __init__(self, prompt, text, stream):
+        self.text = text
+        self.usage_metadata = _FakeUsage(prompt, text)
+        self._stream = stream
+
+    def __iter__(self):
+        words = self.text.split(" ")
+        for i in range(0, len(words), 8):
+            yield _FakeChunk(" ".join(words[i:i + 8]) + (" " if i + 8 < len(words) else ""))
+
+
+_shared_client = None
+_shared_client_lock = threading.Lock()
+
+
+def get_llm_client():
+    """Process-wide LLMClient configured from the LLM_* environment variables"""
+    global _shared_client
+    if _shared_client is None:
+        with _shared_client_lock:
+            if _shared_client is None:
+                _shared_client = LLMClient()
+    return _shared_client
@@ -1,7 +1,45 @@
 import pandas as pd
 import os
+import hashlib
+import json
 from pathlib import Path
 
+# Bump when the stored document/metadata layout changes so that an
+# incremental sync rewrites every course instead of keeping stale rows
+INGEST_SCHEMA_VERSION = 2
+
+# Max characters kept for the requirement fields stored as metadata
+METADATA_FIELD_LIMITS = {
+    'admission_requirements': 2000,
+    'language_requirements': 1000,
+    'deadline': 500
+}
+
+# Folder names and their degree types
+COURSE_FOLDERS = {
+    'Bachelor': 'Bachelor',
+    'Masters': 'Masters', 
+    'PHD': 'PhD'
+}
+
+
+def course_files_signature():
+    """
+    Fingerprint of the course CSV files (path, size, mtime) and the ingest schema
+    
+    Changes whenever a sync could change the database, so a process can
+    tell that the stored courses are already up to date.
+    """
+    files = []
+    for folder in COURSE_FOLDERS:
+        for csv_file in sorted(Path(folder).glob('*.csv')):
+            stat = csv_file.stat()
+            files.append([str(csv_file), stat.st_size, stat.st_mtime_ns])
+    
+    payload = json.dumps({'schema': INGEST_SCHEMA_VERSION, 'files': files})
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
 def load_all_courses():
     """
     Load all CSV files from Bachelor, Masters, and PHD folders
@@ -9,14 +47,7 @@ def load_all_courses():
     """
     all_courses = []
     
-    # Define folder names and their degree types
-    folders = {
-        'Bachelor': 'Bachelor',
-        'Masters': 'Masters', 
-        'PHD': 'PhD'
-    }
-    
-    for folder, degree_type in folders.items():
+    for folder, degree_type in COURSE_FOLDERS.items():
         folder_path = Path(folder)
         
         # Check if folder exists
@@ -90,6 +121,60 @@ def prepare_course_text(row):
     return "\n".join(text_parts)
 
 
+def _metadata_text(row, column, field):
+    """Requirement text for metadata: '' when missing, cut to the field's limit"""
+    value = row.get(column)
+    if not pd.notna(value):
+        return ''
+    return str(value).strip()[:METADATA_FIELD_LIMITS[field]]
+
+
+def prepare_course_metadata(row):
+    """
+    Build the structured metadata stored next to each course
+    (used for filtering and for building recommendations)
+    """
+    return {
+        'course': str(row.get('course', 'N/A')),
+        'institution': str(row.get('institution', 'N/A')),
+        'degree_type': str(row.get('degree_type', 'N/A')),
+        'url': str(row.get('url', 'N/A')),
+        'source_file': str(row.get('source_file', 'N/A')),
+        'admission_requirements': _metadata_text(row, 'admission req', 'admission_requirements'),
+        'language_requirements': _metadata_text(row, 'language req', 'language_requirements'),
+        'deadline': _metadata_text(row, 'deadline', 'deadline')
+    }
+
+
+def course_id(row):
+    """
+    Stable ID for a course, derived from its DAAD URL
+    Falls back to course + institution + degree when the URL is missing,
+    so IDs no longer shift when rows are added or removed from a CSV
+    """
+    url = row.get('url')
+    if pd.notna(url) and str(url).strip() not in ('', 'N/A'):
+        key = str(url).strip()
+    else:
+        key = "|".join(str(row.get(col, '')) for col in ('course', 'institution', 'degree_type'))
+    
+    return "course_" + hashlib.sha1(key.encode('utf-8')).hexdigest()[:20]
+
+
+def course_content_hash(doc_text, metadata):
+    """
+    Hash of everything we store for a course
+    Used by incremental sync to detect changed rows
+    """
+    payload = json.dumps({
+        'schema': INGEST_SCHEMA_VERSION,
+        'document': doc_text,
+        'metadata': metadata
+    }, sort_keys=True, ensure_ascii=False)
+    
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
 if __name__ == "__main__":
     # Test the loading
     courses_df = load_all_courses()
@@ -1,62 +1,150 @@
-import google.generativeai as genai
 import chromadb
 from chromadb.utils import embedding_functions
 import os
-from load_data import load_all_courses, prepare_course_text
-import pandas as pd
+from load_data import (
+    load_all_courses,
+    prepare_course_text,
+    prepare_course_metadata,
+    course_content_hash,
+    course_id as make_course_id,
+    course_files_signature,
+)
+from ingestion import (
+    EmbeddingIngestionEngine,
+    HashingEmbeddingFunction,
+    EMBEDDING_MODEL_NAME,
+    HASHING_MODEL_NAME,
+)
+from cache import LRUCache, SQLiteTTLStore, normalize_query
+from lexical_index import BM25Index, reciprocal_rank_fusion
+from llm_client import get_llm_client
+from context_builder import (
+    build_course_context,
+    estimate_tokens,
+    CONTEXT_TOKEN_BUDGET,
+    CONTEXT_MAX_DISTANCE,
+)
+import threading
+import hashlib
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locks, every process syncs
+    fcntl = None
+import json
 from dotenv import load_dotenv
 
 load_dotenv()
-# Configure Gemini
-genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
+
+# Bump whenever the answer prompt changes so cached answers are not reused
+PROMPT_VERSION = 2
 
 class DAADCourseRAG:
     """
     RAG Pipeline for DAAD Course Search
     """
     
-    def __init__(self, db_path="./chroma_db"):
+    def __init__(self, db_path="./chroma_db", encode_batch_size=256, encode_workers=1,
+                 query_cache_size=1024, query_cache_ttl=3600,
+                 answer_cache_path="./answer_cache.sqlite3", answer_cache_size=5000,
+                 answer_cache_ttl=86400, search_mode="vector", llm_client=None,
+                 embedding_model=EMBEDDING_MODEL_NAME, context_token_budget=CONTEXT_TOKEN_BUDGET,
+                 context_max_distance=CONTEXT_MAX_DISTANCE):
         """
         Initialize the RAG pipeline
         
         Args:
             db_path: Path where vector database will be stored
+            encode_batch_size: Batch size used when bulk-embedding courses
+            encode_workers: Encode processes for bulk ingestion (-1 = all CPU cores)
+            query_cache_size: Max number of cached query embeddings
+            query_cache_ttl: Seconds a cached query embedding stays valid
+            answer_cache_path: SQLite file for cached Gemini answers (None disables it)
+            answer_cache_size: Max number of cached answers
+            answer_cache_ttl: Seconds a cached answer stays valid
+            search_mode: Default retrieval mode ('vector', 'lexical' or 'hybrid')
+            llm_client: LLMClient for Gemini calls (defaults to the shared client)
+            embedding_model: SentenceTransformer model name, or 'hashing' for
+                             offline embeddings (benchmarks, no model download)
+            context_token_budget: Max tokens of course context in the answer prompt
+            context_max_distance: Courses farther than this from the query are
+                                  left out of the prompt (None keeps all)
         """
         print("🚀 Initializing DAAD Course RAG Pipeline...")
         
         # Initialize ChromaDB (vector database)
+        self.db_path = db_path
         self.client = chromadb.PersistentClient(path=db_path)
         
         # Use sentence transformers for embeddings (converts text to vectors)
-        self.embedding_function = embedding_functions.SentenceTransformerEmbeddingFunction(
-            model_name="all-MiniLM-L6-v2"
+        if embedding_model == HASHING_MODEL_NAME:
+            self.embedding_function = HashingEmbeddingFunction()
+        else:
+            self.embedding_function = embedding_functions.SentenceTransformerEmbeddingFunction(
+                model_name=embedding_model
+            )
+        
+        # Bulk ingestion encodes up front and writes pre-computed embeddings
+        self.ingestion_engine = EmbeddingIngestionEngine(
+            model_name=embedding_model,
+            encode_batch_size=encode_batch_size,
+            num_workers=encode_workers
         )
         
+        # Repeated queries skip the embedding model (normalized text -> vector)
+        self.query_cache = LRUCache(max_size=query_cache_size, ttl=query_cache_ttl)
+        
+        # BM25 index over the same course text (built from the collection on first use)
+        self.search_mode = search_mode
+        self.context_token_budget = context_token_budget
+        self.context_max_distance = context_max_distance
+        self.lexical_index = BM25Index()
+        self._lexical_index_ready = False
+        self._lexical_index_lock = threading.Lock()
+        
         # Create or get collection (like a table in a database)
         self.collection = self.client.get_or_create_collection(
             name="daad_courses",
             embedding_function=self.embedding_function
         )
         
-        # Initialize Gemini model
-        self.model = genai.GenerativeModel("models/gemini-2.0-flash-exp")
+        # Gemini calls go through the shared, rate-limited client
+        self.llm = llm_client or get_llm_client()
+        
+        # Answers survive restarts and are shared by all workers on this host
+        self.answer_cache = None
+        if answer_cache_path:
+            self.answer_cache = SQLiteTTLStore(
+                answer_cache_path,
+                table="answers",
+                max_entries=answer_cache_size,
+                ttl=answer_cache_ttl
+            )
         
         print("✅ RAG Pipeline initialized!")
     
-    def load_courses_to_db(self, force_reload=False):
+    def load_courses_to_db(self, force_reload=False, incremental=False):
         """
         Load all courses into the vector database
         
         Args:
             force_reload: If True, delete existing data and reload
+            incremental: If True, only add/update/delete courses that changed
+                         since the last load (see sync_courses_to_db)
+        
+        Returns:
+            Dict with added/updated/deleted/unchanged counts (None if skipped)
         """
+        if incremental:
+            return self.sync_courses_to_db()
+        
         # Check if database already has data
         existing_count = self.collection.count()
         
         if existing_count > 0 and not force_reload:
             print(f"ℹ️  Database already contains {existing_count} courses")
-            print("   Use force_reload=True to reload data")
-            return
+            print("   Use force_reload=True to reload data, or incremental=True to sync changes")
+            return None
         
         if force_reload and existing_count > 0:
             print(f"🗑️  Deleting {existing_count} existing courses...")
@@ -66,62 +154,232 @@ class DAADCourseRAG:
                 name="daad_courses",
                 embedding_function=self.embedding_function
             )
+            self.lexical_index.clear()
         
         print("\n📥 Loading courses from CSV files...")
         courses_df = load_all_courses()
         
         if courses_df.empty:
             print("❌ No courses to load!")
-            return
+            return None
+        
+        records = self._prepare_records(courses_df)
+        
+        print(f"\n💾 Adding {len(records)} courses to vector database...")
+        self._upsert_records(records)
+        
+        total_count = self.collection.count()
+        print(f"\n✅ Database now contains {total_count} courses!")
+        
+        return {'added': len(records), 'updated': 0, 'deleted': existing_count if force_reload else 0, 'unchanged': 0}
+    
+    def sync_courses_once(self, lock_path=None):
+        """
+        Sync the vector database from a single process
+        
+        ChromaDB's persistent client must not be written by several processes
+        at once, but every server process warms up its own pipeline. The
+        first process to take the lock file runs sync_courses_to_db; the
+        others wait for it and then only read the collection. The lock file
+        also records which CSV files were synced, so processes started later
+        skip the sync while nothing has changed.
+        
+        Args:
+            lock_path: Lock file (defaults to courses_sync.lock in db_path)
+        
+        Returns:
+            Dict with sync counts (None if there was nothing to sync here)
+        """
+        if fcntl is None:
+            return self.sync_courses_to_db()
+        
+        lock_path = lock_path or os.path.join(self.db_path, "courses_sync.lock")
+        with open(lock_path, "a+") as lock_file:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                print("⏳ Another process is syncing courses, waiting for it...")
+                fcntl.flock(lock_file, fcntl.LOCK_SH)
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+                return None
+            
+            try:
+                signature = course_files_signature()
+                lock_file.seek(0)
+                if lock_file.read().strip() == signature:
+                    print(f"ℹ️  Courses already synced ({self.collection.count()} in database)")
+                    return None
+                
+                counts = self.sync_courses_to_db()
+                
+                lock_file.seek(0)
+                lock_file.truncate()
+                lock_file.write(signature)
+                lock_file.flush()
+                return counts
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+    
+    def sync_courses_to_db(self, batch_size=100):
+        """
+        Incrementally sync the vector database with the CSV files
+        
+        Courses are keyed by a stable ID derived from their URL and carry a
+        content hash in their metadata, so only new, changed or removed
+        courses touch the embedding model and ChromaDB.
+        
+        Args:
+            batch_size: Number of courses per delete call
+        
+        Returns:
+            Dict with added/updated/deleted/unchanged counts
+        """
+        counts = {'added': 0, 'updated': 0, 'deleted': 0, 'unchanged': 0}
         
-        print(f"\n💾 Adding {len(courses_df)} courses to vector database...")
+        print("\n📥 Loading courses from CSV files...")
+        courses_df = load_all_courses()
         
-        # Prepare data for ChromaDB
-        documents = []  # Text descriptions
-        metadatas = []  # Structured data
-        ids = []        # Unique IDs
+        if courses_df.empty:
+            # Never wipe the database because the CSV folders are missing
+            print("❌ No courses to sync, leaving database untouched")
+            return counts
+        
+        records = self._prepare_records(courses_df)
+        
+        # Content hashes of everything currently stored
+        existing = self.collection.get(include=["metadatas"])
+        existing_hashes = {
+            course_id: (metadata or {}).get('content_hash')
+            for course_id, metadata in zip(existing['ids'], existing['metadatas'])
+        }
+        
+        changed = {}
+        for course_id, (doc_text, metadata) in records.items():
+            if course_id not in existing_hashes:
+                counts['added'] += 1
+                changed[course_id] = (doc_text, metadata)
+            elif existing_hashes[course_id] != metadata['content_hash']:
+                counts['updated'] += 1
+                changed[course_id] = (doc_text, metadata)
+            else:
+                counts['unchanged'] += 1
+        
+        removed = [course_id for course_id in existing_hashes if course_id not in records]
+        counts['deleted'] = len(removed)
+        
+        print(f"\n🔄 Sync plan: {counts['added']} new, {counts['updated']} changed, "
+              f"{counts['deleted']} removed, {counts['unchanged']} unchanged")
+        
+        if changed:
+            self._upsert_records(changed)
+        
+        for start in range(0, len(removed), batch_size):
+            batch = removed[start:start + batch_size]
+            self.collection.delete(ids=batch)
+            for course_id in batch:
+                self.lexical_index.remove(course_id)
+            print(f"   ✓ Deleted {len(batch)} courses...")
+        
+        print(f"\n✅ Database now contains {self.collection.count()} courses!")
+        
+        return counts
+    
+    def _prepare_records(self, courses_df):
+        """
+        Turn course rows into {course_id: (document, metadata)}
         
-        for idx, row in courses_df.iterrows():
+        Rows sharing a URL are stored once (first occurrence wins).
+        """
+        records = {}
+        duplicates = 0
+        
+        for _, row in courses_df.iterrows():
+            course_id = make_course_id(row)
+            if course_id in records:
+                duplicates += 1
+                continue
+            
             # Create searchable text
             doc_text = prepare_course_text(row)
-            documents.append(doc_text)
             
             # Store metadata (structured info we can filter on)
-            metadata = {
-                'course': str(row.get('course', 'N/A')),
-                'institution': str(row.get('institution', 'N/A')),
-                'degree_type': str(row.get('degree_type', 'N/A')),
-                'url': str(row.get('url', 'N/A')),
-                'source_file': str(row.get('source_file', 'N/A'))
-            }
-            metadatas.append(metadata)
+            metadata = prepare_course_metadata(row)
+            metadata['content_hash'] = course_content_hash(doc_text, metadata)
+            
+            records[course_id] = (doc_text, metadata)
+        
+        if duplicates:
+            print(f"   ℹ️  Skipped {duplicates} duplicate course rows")
+        
+        return records
+    
+    def _upsert_records(self, records):
+        """Embed and write {course_id: (document, metadata)} to ChromaDB"""
+        stats = self.ingestion_engine.ingest(self.collection, records)
+        
+        # Keep the lexical index in sync with what was written
+        if self._lexical_index_ready:
+            for course_id, (doc_text, metadata) in records.items():
+                self.lexical_index.add(course_id, doc_text, metadata.get('degree_type'))
+        
+        return stats
+    
+    def _ensure_lexical_index(self):
+        """Build the BM25 index from the stored courses the first time it is needed"""
+        if self._lexical_index_ready:
+            return
+        
+        with self._lexical_index_lock:
+            if self._lexical_index_ready:
+                return
             
-            # Create unique ID
-            ids.append(f"course_{idx}")
+            print("📚 Building lexical index...")
+            stored = self.collection.get(include=["documents", "metadatas"])
+            for course_id, doc_text, metadata in zip(stored['ids'], stored['documents'], stored['metadatas']):
+                self.lexical_index.add(course_id, doc_text, (metadata or {}).get('degree_type'))
             
-            # Add in batches of 100 (ChromaDB works better with batches)
-            if len(documents) >= 100:
-                self.collection.add(
-                    documents=documents,
-                    metadatas=metadatas,
-                    ids=ids
-                )
-                print(f"   ✓ Added {len(documents)} courses...")
-                documents, metadatas, ids = [], [], []
-        
-        # Add remaining courses
-        if documents:
-            self.collection.add(
-                documents=documents,
-                metadatas=metadatas,
-                ids=ids
-            )
-            print(f"   ✓ Added {len(documents)} courses...")
+            self._lexical_index_ready = True
+            print(f"✅ Lexical index contains {len(self.lexical_index)} courses")
+    
+    def embed_query(self, query):
+        """
+        Embed a query, reusing the cached vector for repeated queries
         
-        total_count = self.collection.count()
-        print(f"\n✅ Database now contains {total_count} courses!")
+        Args:
+            query: User's search question
+        
+        Returns:
+            Embedding vector for the normalized query text
+        """
+        return self.embed_queries([query])[0]
+    
+    def embed_queries(self, queries):
+        """
+        Embed several queries, running all cache misses in one batched forward pass
+        
+        Args:
+            queries: List of query strings
+        
+        Returns:
+            List of embedding vectors, in the same order as queries
+        """
+        keys = [normalize_query(query) for query in queries]
+        embeddings = [self.query_cache.get(key) for key in keys]
+        
+        # Embed each distinct missing query once
+        missing = list(dict.fromkeys(key for key, embedding in zip(keys, embeddings) if embedding is None))
+        if missing:
+            computed = dict(zip(missing, self.embedding_function(missing)))
+            for key, embedding in computed.items():
+                self.query_cache.set(key, embedding)
+            embeddings = [
+                embedding if embedding is not None else computed[key]
+                for key, embedding in zip(keys, embeddings)
+            ]
+        
+        return embeddings
     
-    def search_courses(self, query, n_results=5, degree_filter=None):
+    def search_courses(self, query, n_results=5, degree_filter=None, mode=None):
         """
         Search for relevant courses
         
@@ -129,11 +387,14 @@ class DAADCourseRAG:
             query: User's search question
             n_results: Number of courses to return
             degree_filter: Filter by degree type (e.g., 'Bachelor', 'Masters', 'PhD')
+            mode: 'vector' (embeddings), 'lexical' (BM25) or 'hybrid'
+                  (both fused with reciprocal-rank fusion); defaults to search_mode
         
         Returns:
             List of relevant courses
         """
-        print(f"\n🔍 Searching for: '{query}'")
+        mode = mode or self.search_mode
+        print(f"\n🔍 Searching for: '{query}' ({mode})")
         
         # Build filter if degree type specified
         where_filter = None
@@ -141,78 +402,298 @@ class DAADCourseRAG:
             where_filter = {"degree_type": degree_filter}
             print(f"   Filtering by: {degree_filter}")
         
-        # Search in vector database
+        if mode == "vector":
+            # Search in vector database
+            results = self.collection.query(
+                query_embeddings=[self.embed_query(query)],
+                n_results=n_results,
+                where=where_filter
+            )
+        elif mode in ("lexical", "hybrid"):
+            results = self._search_with_lexical(query, n_results, degree_filter, where_filter, mode)
+        else:
+            raise ValueError(f"Unknown search mode: {mode}")
+        
+        print(f"✅ Found {len(results['documents'][0])} relevant courses\n")
+        
+        return results
+    
+    def search_courses_many(self, queries, n_results=5, degree_filter=None, mode=None):
+        """
+        Search for several queries at once
+        
+        Vector searches embed all queries in one batched forward pass and run a
+        single collection query; lexical/hybrid modes fall back to one search per query.
+        
+        Args:
+            queries: List of search questions
+            n_results: Number of courses to return per query
+            degree_filter: Filter by degree type (e.g., 'Bachelor', 'Masters', 'PhD')
+            mode: Retrieval mode (see search_courses)
+        
+        Returns:
+            List of results, one per query, each shaped like search_courses output
+        """
+        queries = list(queries)
+        mode = mode or self.search_mode
+        if not queries:
+            return []
+        
+        if mode != "vector":
+            return [self.search_courses(query, n_results, degree_filter, mode=mode) for query in queries]
+        
+        print(f"\n🔍 Searching for {len(queries)} queries (batched)")
+        
+        where_filter = {"degree_type": degree_filter} if degree_filter else None
         results = self.collection.query(
-            query_texts=[query],
+            query_embeddings=self.embed_queries(queries),
             n_results=n_results,
             where=where_filter
         )
         
-        print(f"✅ Found {len(results['documents'][0])} relevant courses\n")
+        # Split the batched result into one search_courses-shaped result per query
+        per_query = []
+        for i in range(len(queries)):
+            per_query.append({
+                key: [value[i]] if isinstance(value, list) and key != 'included' else value
+                for key, value in results.items()
+            })
         
-        return results
+        print(f"✅ Completed {len(queries)} searches\n")
+        
+        return per_query
     
-    def generate_answer(self, query, search_results):
+    def _search_with_lexical(self, query, n_results, degree_filter, where_filter, mode):
+        """Lexical-only or hybrid (RRF) search, returned in the same shape as collection.query"""
+        self._ensure_lexical_index()
+        
+        # Over-fetch candidates so fusion has something to re-rank
+        candidates = n_results if mode == "lexical" else max(n_results * 4, 20)
+        lexical_hits = self.lexical_index.search(query, candidates, degree_filter)
+        lexical_ids = [course_id for course_id, _ in lexical_hits]
+        
+        distances = {}
+        if mode == "lexical":
+            ranked = lexical_hits[:n_results]
+        else:
+            vector_results = self.collection.query(
+                query_embeddings=[self.embed_query(query)],
+                n_results=candidates,
+                where=where_filter,
+                include=["distances"]
+            )
+            vector_ids = vector_results['ids'][0]
+            distances = dict(zip(vector_ids, vector_results['distances'][0]))
+            ranked = reciprocal_rank_fusion([vector_ids, lexical_ids])[:n_results]
+        
+        ids = [course_id for course_id, _ in ranked]
+        stored = self.collection.get(ids=ids, include=["documents", "metadatas"]) if ids else {
+            'ids': [], 'documents': [], 'metadatas': []
+        }
+        by_id = {
+            course_id: (doc_text, metadata)
+            for course_id, doc_text, metadata in zip(stored['ids'], stored['documents'], stored['metadatas'])
+        }
+        ids = [course_id for course_id in ids if course_id in by_id]
+        scores = dict(ranked)
+        
+        return {
+            'ids': [ids],
+            'documents': [[by_id[course_id][0] for course_id in ids]],
+            'metadatas': [[by_id[course_id][1] for course_id in ids]],
+            # Vector distance where the course was also a vector hit (None otherwise)
+            'distances': [[distances.get(course_id) for course_id in ids]],
+            'scores': [[scores[course_id] for course_id in ids]]
+        }
+    
+    def build_prompt(self, query, search_results):
         """
-        Use Gemini to generate a helpful answer based on search results
+        Build the Gemini prompt from the user's question and search results
         
         Args:
             query: User's question
             search_results: Results from vector database search
         
         Returns:
-            Generated answer from Gemini
+            Prompt text
         """
-        # Extract course information
-        courses = search_results['documents'][0]
-        metadatas = search_results['metadatas'][0]
+        return self.build_prompt_detailed(query, search_results)[0]
+    
+    def build_prompt_detailed(self, query, search_results):
+        """
+        Build the Gemini prompt and report its size
         
-        # Build context for Gemini
-        context = "Here are relevant DAAD courses:\n\n"
+        The course context is cut to context_token_budget tokens (see
+        context_builder.build_course_context), so prompt size no longer grows
+        with n_results or with how verbose a course is.
         
-        for i, (course_text, metadata) in enumerate(zip(courses, metadatas), 1):
-            context += f"--- Course {i} ---\n"
-            context += course_text
-            context += f"\nURL: {metadata.get('url', 'N/A')}\n\n"
+        Returns:
+            (prompt, stats) - stats has prompt_tokens, context_tokens, courses,
+            dropped_irrelevant, dropped_budget and truncated_fields
+        """
+        context = build_course_context(
+            search_results,
+            token_budget=self.context_token_budget,
+            max_distance=self.context_max_distance
+        )
         
         # Create prompt for Gemini
         prompt = f"""You are a helpful study abroad advisor for German universities.
 
 User Question: {query}
 
-{context}
-
+{context['context']}
 Based on the courses above, provide a helpful and detailed answer to the user's question.
 Include specific course names, institutions, and URLs when relevant.
 If admission or language requirements are mentioned, include those details.
 Be friendly and encouraging!"""
         
+        stats = {key: value for key, value in context.items() if key != 'context'}
+        stats['prompt_tokens'] = estimate_tokens(prompt)
+        
+        return prompt, stats
+    
+    def generate_answer(self, query, search_results, prompt=None):
+        """
+        Use Gemini to generate a helpful answer based on search results
+        
+        Args:
+            query: User's question
+            search_results: Results from vector database search
+            prompt: Prompt already built by build_prompt_detailed (optional)
+        
+        Returns:
+            Generated answer from Gemini
+        """
+        if prompt is None:
+            prompt = self.build_prompt(query, search_results)
+        
         print("🤖 Generating answer with Gemini...\n")
         
-        # Generate response
-        response = self.model.generate_content(prompt)
+        return self.llm.generate(prompt)
+    
+    def generate_answer_stream(self, query, search_results, prompt=None):
+        """
+        Stream the Gemini answer chunk by chunk as it is generated
+        
+        Args:
+            query: User's question
+            search_results: Results from vector database search
+            prompt: Prompt already built by build_prompt_detailed (optional)
+        
+        Yields:
+            Text chunks of the generated answer
+        """
+        if prompt is None:
+            prompt = self.build_prompt(query, search_results)
+        
+        print("🤖 Streaming answer from Gemini...\n")
         
-        return response.text
+        yield from self.llm.stream(prompt)
     
-    def ask(self, query, n_results=5, degree_filter=None):
+    def answer_cache_key(self, query, search_results, degree_filter=None, mode=None):
         """
-        Main method: Ask a question and get an AI-generated answer
+        Cache key for a generated answer: normalized query, degree filter,
+        ordered retrieved course IDs and their content hashes, search mode,
+        prompt version, Gemini model and the context settings that shape
+        the prompt
+        """
+        metadatas = (search_results.get('metadatas') or [[]])[0]
+        payload = json.dumps({
+            'query': normalize_query(query),
+            'degree_filter': degree_filter,
+            'course_ids': search_results['ids'][0],
+            'content_hashes': [(metadata or {}).get('content_hash') for metadata in metadatas],
+            'mode': mode or self.search_mode,
+            'prompt_version': PROMPT_VERSION,
+            'model': getattr(self.llm, 'model_name', None),
+            'context_token_budget': self.context_token_budget,
+            'context_max_distance': self.context_max_distance
+        }, sort_keys=True)
+        
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+    
+    def ask_detailed(self, query, n_results=5, degree_filter=None, stream=False, mode=None):
+        """
+        Ask a question and get the answer together with response metadata
         
         Args:
             query: User's question
             n_results: Number of courses to consider
             degree_filter: Filter by degree type
+            stream: If True, 'answer' is an iterator of text chunks
+            mode: Retrieval mode passed to search_courses
         
         Returns:
-            AI-generated answer
+            Dict with 'answer', 'search_results' (the retrieval the answer was
+            built from) and 'metadata' (cache_hit, course_ids, prompt_version
+            and the prompt size stats of build_prompt_detailed)
         """
         # Step 1: Search for relevant courses
-        search_results = self.search_courses(query, n_results, degree_filter)
+        search_results = self.search_courses(query, n_results, degree_filter, mode=mode)
+        
+        # Step 2: Reuse a cached answer for the same question and course set
+        cache_key = None
+        answer = None
+        if self.answer_cache is not None:
+            cache_key = self.answer_cache_key(query, search_results, degree_filter, mode)
+            answer = self.answer_cache.get(cache_key)
+        
+        prompt, prompt_stats = self.build_prompt_detailed(query, search_results)
+        print(f"📏 Prompt: {prompt_stats['prompt_tokens']} tokens, {prompt_stats['courses']} courses "
+              f"({prompt_stats['dropped_irrelevant']} below relevance cutoff, "
+              f"{prompt_stats['dropped_budget']} over budget)")
+        
+        cache_hit = answer is not None
+        if cache_hit:
+            print("⚡ Answer served from cache\n")
+            if stream:
+                answer = iter([answer])
+        elif stream:
+            # Step 3: Stream answer from Gemini (cached once fully received)
+            answer = self._stream_and_cache(query, search_results, cache_key, prompt)
+        else:
+            # Step 3: Generate answer with Gemini
+            answer = self.generate_answer(query, search_results, prompt)
+            if cache_key is not None:
+                self.answer_cache.set(cache_key, answer)
+        
+        return {
+            'answer': answer,
+            'search_results': search_results,
+            'metadata': {
+                'cache_hit': cache_hit,
+                'course_ids': search_results['ids'][0],
+                'prompt_version': PROMPT_VERSION,
+                **prompt_stats
+            }
+        }
+    
+    def _stream_and_cache(self, query, search_results, cache_key, prompt=None):
+        """Yield answer chunks and cache the full answer once the stream completes"""
+        chunks = []
+        for chunk in self.generate_answer_stream(query, search_results, prompt):
+            chunks.append(chunk)
+            yield chunk
+        
+        if cache_key is not None:
+            self.answer_cache.set(cache_key, "".join(chunks))
+    
+    def ask(self, query, n_results=5, degree_filter=None, stream=False, mode=None):
+        """
+        Main method: Ask a question and get an AI-generated answer
         
-        # Step 2: Generate answer with Gemini
-        answer = self.generate_answer(query, search_results)
+        Args:
+            query: User's question
+            n_results: Number of courses to consider
+            degree_filter: Filter by degree type
+            stream: If True, return an iterator yielding answer chunks as they arrive
+            mode: Retrieval mode ('vector', 'lexical' or 'hybrid')
         
-        return answer
+        Returns:
+            AI-generated answer (or iterator of chunks when streaming)
+        """
+        return self.ask_detailed(query, n_results, degree_filter, stream=stream, mode=mode)['answer']
 
 
 def main():
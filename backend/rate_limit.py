@@ -0,0 +1,185 @@
+import threading
+import time
+from urllib.parse import urlparse
+
+
+class TokenBucket:
+    """
+    Thread-safe token-bucket rate limiter
+
+    Tokens refill continuously at `rate` per second up to `capacity`, so
+    short bursts of up to `capacity` calls go through immediately and the
+    sustained rate never exceeds `rate`.
+    """
+
+    def __init__(self, rate, capacity=None):
+        """
+        Args:
+            rate: Tokens added per second
+            capacity: Maximum tokens stored (burst size, defaults to rate)
+        """
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(rate, 1))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self, tokens=1):
+        """Take tokens if available right now; returns True on success"""
+        with self._lock:
+            self._refill(time.monotonic())
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return True
+            return False
+
+    def acquire(self, tokens=1, timeout=None):
+        """
+        Take tokens, waiting for the bucket to refill if needed
+
+        Args:
+            tokens: Number of tokens to take
+            timeout: Max seconds to wait (None = wait as long as needed)
+
+        Returns:
+            True if the tokens were taken, False if timeout ran out first
+        """
+        if tokens > self.capacity:
+            raise ValueError(f"Cannot take {tokens} tokens from a bucket of {self.capacity}")
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return True
+                wait = (tokens - self._tokens) / self.rate
+
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or wait > remaining:
+                    # The bucket cannot refill in time, fail without sleeping
+                    return False
+            time.sleep(wait)
+
+    def set_rate(self, rate):
+        """Change the refill rate (tokens already earned are kept)"""
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        with self._lock:
+            self._refill(time.monotonic())
+            self.rate = float(rate)
+
+    def available(self):
+        """Tokens currently in the bucket"""
+        with self._lock:
+            self._refill(time.monotonic())
+            return self._tokens
+
+
+class AdaptiveRateLimiter:
+    """
+    Per-host rate limiter that adapts to how each host is coping
+
+    Every host gets its own token bucket (no bursts). Each healthy response
+    raises that host's rate by `increase` up to `max_rate`; an error or a
+    response slower than `slow_seconds` cuts it by the factor `decrease`
+    down to `min_rate` (additive increase, multiplicative decrease).
+    """
+
+    def __init__(self, rate, min_rate=None, max_rate=None, increase=0.1, decrease=0.5, slow_seconds=5.0):
+        """
+        Args:
+            rate: Starting requests per second for a new host
+            min_rate: Lowest rate backoff goes to (defaults to rate / 10)
+            max_rate: Highest rate healthy responses lead to (defaults to rate)
+            increase: Requests per second added after each healthy response
+            decrease: Factor the rate is multiplied by after an error or slow response
+            slow_seconds: Responses taking longer than this count as slow
+        """
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.start_rate = float(rate)
+        self.min_rate = float(min_rate if min_rate is not None else rate / 10)
+        self.max_rate = float(max_rate if max_rate is not None else rate)
+        self.increase = increase
+        self.decrease = decrease
+        self.slow_seconds = slow_seconds
+        self._hosts = {}
+        self._lock = threading.Lock()
+
+    def _host(self, url):
+        host = urlparse(url).netloc or url
+        with self._lock:
+            if host not in self._hosts:
+                rate = min(max(self.start_rate, self.min_rate), self.max_rate)
+                self._hosts[host] = {
+                    'bucket': TokenBucket(rate, capacity=1),
+                    'rate': rate,
+                    'requests': 0,
+                    'errors': 0,
+                    'slow': 0,
+                    'waited': 0.0,
+                    'response_seconds': 0.0,
+                }
+            return self._hosts[host]
+
+    def acquire(self, url):
+        """
+        Wait until a request to url's host is allowed
+
+        Returns:
+            Seconds spent waiting
+        """
+        host = self._host(url)
+        started = time.monotonic()
+        host['bucket'].acquire()
+        waited = time.monotonic() - started
+        with self._lock:
+            host['requests'] += 1
+            host['waited'] += waited
+        return waited
+
+    def record(self, url, seconds, ok=True):
+        """
+        Feed a response back to the limiter
+
+        Args:
+            url: Requested URL
+            seconds: How long the response took
+            ok: False if the request failed
+        """
+        host = self._host(url)
+        with self._lock:
+            host['response_seconds'] += seconds
+            if not ok or seconds > self.slow_seconds:
+                if ok:
+                    host['slow'] += 1
+                else:
+                    host['errors'] += 1
+                rate = max(self.min_rate, host['rate'] * self.decrease)
+            else:
+                rate = min(self.max_rate, host['rate'] + self.increase)
+            if rate != host['rate']:
+                host['rate'] = rate
+                host['bucket'].set_rate(rate)
+
+    def rate(self, url):
+        """Current requests per second for url's host"""
+        return self._host(url)['rate']
+
+    def stats(self):
+        """Per host: current rate, requests, errors, slow responses, seconds waited and seconds spent on responses"""
+        with self._lock:
+            return {
+                host: {key: value for key, value in state.items() if key != 'bucket'}
+                for host, state in self._hosts.items()
+            }
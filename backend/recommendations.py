@@ -0,0 +1,64 @@
+"""
+Build recommendation cards from search results
+"""
+
+# Legacy fallback: courses ingested before the requirement fields were stored
+# as metadata only have them inside the document text
+DOCUMENT_FIELDS = {
+    'Admission Requirements:': 'admission_requirements',
+    'Language Requirements:': 'language_requirements',
+    'Deadline:': 'deadline'
+}
+
+
+def fields_from_document(doc_text):
+    """Parse requirement fields out of the document text (old collections only)"""
+    fields = {field: '' for field in DOCUMENT_FIELDS.values()}
+    for line in (doc_text or '').split('\n'):
+        for label, field in DOCUMENT_FIELDS.items():
+            if label in line:
+                fields[field] = line.split(label)[1].strip()
+                break
+    return fields
+
+
+def build_recommendations(search_results, match_score=None, limit=None):
+    """
+    Turn search results into recommendation dicts
+    
+    Args:
+        search_results: Results from DAADCourseRAG.search_courses
+        match_score: Fixed score for every course, or None for a rank-based score
+        limit: Only use the first `limit` results
+    
+    Returns:
+        List of recommendation dicts
+    """
+    recommendations = []
+    if not search_results or not search_results.get('metadatas'):
+        return recommendations
+    
+    metadatas = search_results['metadatas'][0]
+    documents = (search_results.get('documents') or [[]])[0] or []
+    if limit is not None:
+        metadatas = metadatas[:limit]
+    
+    for i, metadata in enumerate(metadatas):
+        metadata = metadata or {}
+        if 'admission_requirements' in metadata:
+            fields = metadata
+        else:
+            fields = fields_from_document(documents[i] if i < len(documents) else '')
+        
+        recommendations.append({
+            'course': metadata.get('course', 'N/A'),
+            'institution': metadata.get('institution', 'N/A'),
+            'url': metadata.get('url', '#'),
+            'degree_type': metadata.get('degree_type', 'N/A'),
+            'admission_requirements': fields.get('admission_requirements', ''),
+            'language_requirements': fields.get('language_requirements', ''),
+            'deadline': fields.get('deadline', ''),
+            'match_score': match_score if match_score is not None else max(70, min(95, 85 + (i * -2)))
+        })
+    
+    return recommendations
@@ -0,0 +1,113 @@
+import os
+from abc import ABC, abstractmethod
+
+from cache import LRUCache, SQLiteTTLStore
+
+SESSION_STORE = os.getenv("SESSION_STORE", "sqlite")
+SESSION_STORE_PATH = os.getenv("SESSION_STORE_PATH", "./sessions.sqlite3")
+SESSION_MAX = int(os.getenv("SESSION_MAX", "50000"))
+SESSION_TTL = int(os.getenv("SESSION_TTL", str(30 * 24 * 3600)))
+
+
+class SessionStore(ABC):
+    """
+    Saved user applications (profile, countries, preferences) keyed by user ID
+
+    Backends are bounded (least recently used sessions are evicted) and
+    sessions expire after a TTL. Values must be JSON-serializable.
+    """
+
+    @abstractmethod
+    def get(self, user_id, default=None):
+        """Return the saved session for user_id, or default"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def set(self, user_id, session):
+        """Save (or replace) the session for user_id"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def delete(self, user_id):
+        """Forget the session for user_id"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def stats(self):
+        """Return size and hit/miss counters"""
+        raise NotImplementedError
+
+
+class MemorySessionStore(SessionStore):
+    """
+    In-process LRU/TTL session store
+
+    Fastest option, but sessions are lost on restart and are not shared
+    between worker processes - use it for a single-process server.
+    """
+
+    def __init__(self, max_sessions=SESSION_MAX, ttl=SESSION_TTL):
+        """
+        Args:
+            max_sessions: Maximum sessions kept before the least recently used is evicted
+            ttl: Seconds a session stays valid (None = never expires)
+        """
+        self._cache = LRUCache(max_size=max_sessions, ttl=ttl)
+
+    def get(self, user_id, default=None):
+        return self._cache.get(str(user_id), default)
+
+    def set(self, user_id, session):
+        self._cache.set(str(user_id), session)
+
+    def delete(self, user_id):
+        self._cache.delete(str(user_id))
+
+    def stats(self):
+        return {'backend': 'memory', **self._cache.stats()}
+
+
+class SQLiteSessionStore(SessionStore):
+    """
+    Session store on a local SQLite file (WAL mode)
+
+    Sessions survive restarts and are shared by every worker process on the
+    host (e.g. gunicorn workers), so a follow-up request sees the session no
+    matter which worker saved it.
+    """
+
+    def __init__(self, path=SESSION_STORE_PATH, max_sessions=SESSION_MAX, ttl=SESSION_TTL):
+        """
+        Args:
+            path: SQLite database file
+            max_sessions: Maximum sessions kept before the least recently used are evicted
+            ttl: Seconds a session stays valid (None = never expires)
+        """
+        self._store = SQLiteTTLStore(path, table="sessions", max_entries=max_sessions, ttl=ttl)
+
+    def get(self, user_id, default=None):
+        return self._store.get(str(user_id), default)
+
+    def set(self, user_id, session):
+        self._store.set(str(user_id), session)
+
+    def delete(self, user_id):
+        self._store.delete(str(user_id))
+
+    def stats(self):
+        return {'backend': 'sqlite', **self._store.stats()}
+
+
+def create_session_store(backend=SESSION_STORE, **kwargs):
+    """
+    Build the session store selected by SESSION_STORE ('sqlite' or 'memory')
+
+    Args:
+        backend: Backend name
+        **kwargs: Passed to the backend constructor
+    """
+    if backend == "memory":
+        return MemorySessionStore(**kwargs)
+    if backend == "sqlite":
+        return SQLiteSessionStore(**kwargs)
+    raise ValueError(f"Unknown session store backend: {backend}")
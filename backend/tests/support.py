@@ -0,0 +1,47 @@
+"""Helpers shared by the tests and benchmark.py"""
+import time
+
+
+def upload_memory_run(mode, paths, concurrency):
+    """
+    Extract every upload concurrently and report this process's peak RSS
+    (runs in a fresh process so each mode starts from the same baseline)
+
+    Args:
+        mode: 'read_all' reads each upload into one bytes object, 'spooled'
+              extracts it the way a request spooled by UploadRequest is
+        paths: Upload files
+        concurrency: Uploads extracted at once
+
+    Returns:
+        Dict with 'seconds', 'baseline_rss_mb', 'peak_rss_mb' and 'characters'
+    """
+    import resource
+    from concurrent.futures import ThreadPoolExecutor
+    from werkzeug.datastructures import FileStorage
+    from document_parser import DocumentParser, PARSE_CHAR_LIMIT
+
+    parser = DocumentParser(extraction_workers=0, cache_path=None,
+                            max_file_bytes=1 << 40, max_pages=1 << 20)
+
+    def upload(path):
+        with open(path, 'rb') as stream:
+            if mode == "read_all":
+                # What extract_text used to do: the whole upload as one bytes object
+                return len(parser.extract_text_from_pdf(stream.read(), PARSE_CHAR_LIMIT))
+            file = FileStorage(stream=stream, filename="upload.pdf")
+            return len(parser.extract_text(file, file.filename, PARSE_CHAR_LIMIT))
+
+    baseline_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as uploads:
+        extracted = list(uploads.map(upload, paths))
+    seconds = time.perf_counter() - started
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    return {
+        'seconds': seconds,
+        'baseline_rss_mb': baseline_kb / 1024,
+        'peak_rss_mb': peak_kb / 1024,
+        'characters': sum(extracted)
+    }
@@ -0,0 +1,54 @@
+import functools
+import os
+import threading
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from lxml import html as lxml_html
+
+from course_page import create_session, fetch_course, inner_text, load_fixture_rows, parse_course_html
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "fixtures")
+FIXTURE_ROWS = load_fixture_rows(FIXTURES_DIR)
+
+
+def read_fixture(name):
+    with open(os.path.join(FIXTURES_DIR, name), encoding='utf-8') as f:
+        return f.read()
+
+
+@pytest.mark.parametrize("name", sorted(FIXTURE_ROWS))
+def test_parse_fixture(name):
+    assert parse_course_html(read_fixture(name), f"http://fixture/{name}") == FIXTURE_ROWS[name]
+
+
+def test_inner_text_breaks_blocks_and_br():
+    element = lxml_html.fromstring("<div>One <b>two</b><br>three<p>four</p>  five  </div>")
+    assert inner_text(element) == "One two\nthree\nfour\nfive"
+
+
+def test_inner_text_skips_scripts():
+    element = lxml_html.fromstring("<div>text<script>var x = 1;</script></div>")
+    assert inner_text(element) == "text"
+
+
+@pytest.fixture
+def fixture_server():
+    class Handler(SimpleHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), functools.partial(Handler, directory=FIXTURES_DIR))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/"
+    server.shutdown()
+
+
+def test_fetch_course_over_http(fixture_server):
+    session = create_session(retries=0)
+    rows = load_fixture_rows(FIXTURES_DIR, url_for=lambda name: fixture_server + name)
+    for name, expected in rows.items():
+        assert fetch_course(session, fixture_server + name) == expected
+    assert fetch_course(session, fixture_server + "missing.html") is None
@@ -0,0 +1,72 @@
+import importlib
+
+import pytest
+from selenium.webdriver.support.ui import WebDriverWait
+
+from rate_limit import AdaptiveRateLimiter
+
+
+class FakeElement:
+    def __init__(self, href):
+        self.href = href
+
+    def get_attribute(self, name):
+        return self.href
+
+
+class FakeListingDriver:
+    """Serves listing pages by offset: a list of links, 'empty' or None (never renders)"""
+
+    def __init__(self, pages):
+        self.pages = pages
+        self.loads = []
+        self.current = None
+
+    def get(self, url):
+        self.current = self.pages.get(int(url.split("&offset=")[1].split("&")[0]))
+        self.loads.append(url)
+
+    def find_elements(self, by, selector):
+        scraper = importlib.import_module("Daad_scraper")
+        if selector == scraper.COURSE_LINK_SELECTOR and isinstance(self.current, list):
+            return [FakeElement(link) for link in self.current]
+        if selector == scraper.NO_RESULTS_SELECTOR and self.current == "empty":
+            return [FakeElement(None)]
+        return []
+
+
+@pytest.fixture
+def scraper(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # The module creates ./logs on import
+    module = importlib.import_module("Daad_scraper")
+    monkeypatch.setattr(module, "politeness", AdaptiveRateLimiter(rate=1000))
+    return module
+
+
+def crawl(scraper, tmp_path, pages):
+    driver = FakeListingDriver(pages)
+    checkpoint = scraper.CrawlCheckpoint(str(tmp_path / "crawl.checkpoint.json"), scraper.base_url)
+    wait = WebDriverWait(driver, 0.2, poll_frequency=0.05)
+    return driver, checkpoint, lambda: scraper.collect_links(driver, wait, checkpoint)
+
+
+def test_listing_ends_on_a_no_results_page(scraper, tmp_path):
+    driver, checkpoint, collect = crawl(scraper, tmp_path, {0: ["a", "b"], 100: ["c"], 200: "empty"})
+
+    assert collect() == ["a", "b", "c"]
+    assert checkpoint.listing_done
+    assert len(driver.loads) == 3
+
+
+def test_listing_timeout_is_retried_and_not_checkpointed(scraper, tmp_path):
+    driver, checkpoint, collect = crawl(scraper, tmp_path, {0: ["a"], 100: None})
+
+    with pytest.raises(scraper.ListingPageTimeout):
+        collect()
+
+    assert len(driver.loads) == 1 + scraper.LISTING_ATTEMPTS
+    assert not checkpoint.listing_done
+    assert checkpoint.completed_offsets == [0]
+
+    resumed = scraper.CrawlCheckpoint(checkpoint.path, scraper.base_url)
+    assert resumed.load() and not resumed.listing_done
@@ -0,0 +1,184 @@
+import json
+import re
+import threading
+import time
+
+import pytest
+
+from document_parser import DocumentParser, ExtractionPool, merge_parsed_documents
+
+
+def make_parser(**kwargs):
+    kwargs.setdefault('cache_path', None)
+    return DocumentParser(llm_client=object(), **kwargs)
+
+
+def run_in_thread(fn, *args, **kwargs):
+    """Start fn in a thread; returns a dict that gets 'result' or 'error'"""
+    outcome = {}
+
+    def target():
+        try:
+            outcome['result'] = fn(*args, **kwargs)
+        except Exception as e:
+            outcome['error'] = e
+
+    thread = threading.Thread(target=target)
+    thread.start()
+    outcome['thread'] = thread
+    return outcome
+
+
+def test_timeout_kills_only_the_stuck_task():
+    pool = ExtractionPool(max_workers=2)
+    try:
+        assert pool.run(abs, -1, timeout=5) == 1
+        assert pool.run(abs, -1, timeout=5) == 1  # Both workers started
+
+        stuck = run_in_thread(pool.run, time.sleep, 60, timeout=1)
+        healthy = run_in_thread(pool.run, time.sleep, 1.5, timeout=5)
+        stuck['thread'].join(10)
+        healthy['thread'].join(10)
+
+        assert isinstance(stuck.get('error'), TimeoutError)
+        assert 'error' not in healthy
+        assert pool.run(abs, -2, timeout=30) == 2
+    finally:
+        pool.shutdown()
+
+
+def test_timeout_starts_when_the_task_runs():
+    pool = ExtractionPool(max_workers=1)
+    try:
+        pool.run(abs, -1, timeout=30)  # Start the worker
+        # The second task queues behind the first for 0.8s but runs within its timeout
+        tasks = [run_in_thread(pool.run, time.sleep, 0.8, timeout=1.2) for _ in range(2)]
+        for task in tasks:
+            task['thread'].join(10)
+            assert 'error' not in task
+    finally:
+        pool.shutdown()
+
+
+def test_task_errors_are_raised_and_keep_the_worker():
+    pool = ExtractionPool(max_workers=1)
+    try:
+        with pytest.raises(ValueError):
+            pool.run(int, "not a number", timeout=30)
+        worker = pool._idle[0]
+        assert pool.run(abs, -3, timeout=5) == 3
+        assert pool._idle == [worker]
+    finally:
+        pool.shutdown()
+
+
+def test_parser_runs_page_count_under_the_timeout(monkeypatch):
+    import document_parser
+    monkeypatch.setattr(document_parser, "_extraction_pool", ExtractionPool(max_workers=1))
+    parser = make_parser(extraction_workers=1, extraction_timeout=30)
+    assert parser._run_tasks([(abs, -1), (abs, -2)]) == [1, 2]
+    try:
+        parser.extract_pdf(b"%PDF-1.4 not really a pdf")
+    except TimeoutError:
+        raise AssertionError("a malformed PDF should fail, not hang")
+    except Exception:
+        pass
+    finally:
+        document_parser._extraction_pool.shutdown()
+
+
+def test_inline_extraction_without_workers():
+    parser = make_parser(extraction_workers=0)
+    assert parser._run_tasks([(abs, -3), (abs, 4)]) == [3, 4]
+
+
+class ScriptedLLM:
+    """Answers batch prompts with one entry per document (except `drop`) and records prompts"""
+
+    def __init__(self, drop=()):
+        self.drop = drop
+        self.prompts = []
+        self.lock = threading.Lock()
+
+    def generate(self, prompt):
+        with self.lock:
+            self.prompts.append(prompt)
+        doc_types = re.findall(r"=== DOCUMENT \d+: (\w+) ===", prompt)
+        if not doc_types:
+            return json.dumps({'student_name': 'single'})
+        return json.dumps({'documents': {
+            doc_type: {'student_name': doc_type} for doc_type in doc_types if doc_type not in self.drop
+        }})
+
+
+DOCUMENTS = [(doc_type, doc_type * 2000, None) for doc_type in ('transcript', 'cv', 'degree', 'language_cert')]
+
+
+def test_batch_packs_documents_within_budget():
+    llm = ScriptedLLM()
+    parser = DocumentParser(llm_client=llm, cache_path=None)
+    batch = parser.parse_documents_batch(DOCUMENTS, char_budget=12000)
+
+    # 4 x 4000 characters with a 12000 budget: one batch of three plus one single
+    assert batch['requests'] == 2
+    assert batch['mode'] == 'batch'
+    assert batch['documents']['transcript'] == {'student_name': 'transcript'}
+    assert batch['documents']['language_cert'] == {'student_name': 'single'}
+    # The merged profile is built locally, in document order
+    assert batch['merged'] == {'personal_info': {'name': 'transcript'}, 'academic_info': {}}
+    assert all('"merged"' not in prompt for prompt in llm.prompts)
+
+
+def test_batch_retries_missing_documents_one_by_one():
+    llm = ScriptedLLM(drop=('cv',))
+    parser = DocumentParser(llm_client=llm, cache_path=None)
+    batch = parser.parse_documents_batch(DOCUMENTS[:2], char_budget=12000)
+
+    assert batch['requests'] == 2
+    assert batch['documents'] == {'transcript': {'student_name': 'transcript'}, 'cv': {'student_name': 'single'}}
+
+    # Both are cached now
+    assert parser.parse_documents_batch(DOCUMENTS[:2])['requests'] == 0
+
+
+def test_merge_parsed_documents_is_ordered():
+    transcript = {'student_name': 'Ada', 'major': 'Physics', 'cgpa': '3.9'}
+    cv = {'student_name': 'Ada L.', 'major': 'Computer Science', 'email': 'ada@example.org'}
+
+    assert merge_parsed_documents([transcript, None, cv]) == {
+        'personal_info': {'name': 'Ada', 'email': 'ada@example.org'},
+        'academic_info': {'major': 'Computer Science', 'cgpa': '3.9'},
+    }
+
+
+def test_check_upload_size_rejects_without_reading(tmp_path):
+    import io
+    from werkzeug.datastructures import FileStorage
+    from document_parser import DocumentTooLarge
+
+    parser = make_parser(max_file_bytes=100)
+    stream = io.BytesIO(b"x" * 101)
+    with pytest.raises(DocumentTooLarge):
+        parser.check_upload_size(FileStorage(stream=stream, filename="big.pdf"))
+    assert stream.tell() == 0
+
+    path = tmp_path / "upload.pdf"
+    path.write_bytes(b"x" * 100)
+    with open(path, 'rb') as f:
+        parser.check_upload_size(FileStorage(stream=f, filename="upload.pdf"))
+
+
+class UnavailableLLM:
+    def generate(self, prompt):
+        from llm_client import LLMUnavailable
+        raise LLMUnavailable("circuit open")
+
+
+def test_llm_unavailable_is_not_swallowed():
+    from llm_client import LLMUnavailable
+
+    parser = DocumentParser(llm_client=UnavailableLLM(), cache_path=None)
+    with pytest.raises(LLMUnavailable):
+        parser.parse_any_document("transcript text " * 10, "transcript")
+    with pytest.raises(LLMUnavailable):
+        parser.parse_documents_batch(DOCUMENTS[:2], char_budget=12000)
@@ -0,0 +1,40 @@
+from lexical_index import BM25Index, reciprocal_rank_fusion
+
+
+def test_search_ranks_matching_documents():
+    index = BM25Index()
+    index.add("a", "Informatics in Munich, IELTS 6.5")
+    index.add("b", "Mechanical Engineering in Aachen")
+    ids = [doc_id for doc_id, _ in index.search("ielts informatics")]
+    assert ids[0] == "a" and "b" not in ids
+
+
+def test_readding_documents_keeps_tombstones_bounded():
+    index = BM25Index(compact_ratio=0.2)
+    for i in range(50):
+        index.add(f"course-{i}", f"course {i} data science")
+
+    # Incremental syncs re-add updated courses many times over
+    for round_number in range(20):
+        for i in range(50):
+            index.add(f"course-{i}", f"course {i} data science round {round_number}")
+        assert len(index._deleted) <= 0.2 * len(index._doc_ids) + 1
+        assert len(index._doc_ids) <= 50 * 1.25 + 1
+
+    assert len(index) == 50
+    assert max(len(numbers) for numbers, _ in index._postings.values()) <= len(index._doc_ids)
+    results = index.search("round 19", n_results=50)
+    assert len(results) == 50
+
+
+def test_remove_drops_document():
+    index = BM25Index()
+    index.add("a", "physics")
+    index.add("b", "physics")
+    index.remove("a")
+    assert [doc_id for doc_id, _ in index.search("physics")] == ["b"]
+
+
+def test_reciprocal_rank_fusion_prefers_documents_ranked_high_in_both():
+    fused = reciprocal_rank_fusion([["a", "b", "c"], ["b", "a", "d"]])
+    assert {doc_id for doc_id, _ in fused[:2]} == {"a", "b"}
@@ -0,0 +1,148 @@
+import threading
+import time
+
+import pytest
+from google.api_core import exceptions as google_exceptions
+
+from llm_client import CircuitBreaker, FakeGenerativeModel, LLMClient, LLMError, LLMUnavailable
+
+
+class FlakyModel(FakeGenerativeModel):
+    """Fails the first `failures` calls with `error`, then answers like FakeGenerativeModel"""
+
+    def __init__(self, failures, error=google_exceptions.ServiceUnavailable, **kwargs):
+        super().__init__(latency=0, **kwargs)
+        self.failures = failures
+        self.error = error
+
+    def generate_content(self, prompt, stream=False, request_options=None, **kwargs):
+        with self._lock:
+            fail = self.calls < self.failures
+        if fail:
+            with self._lock:
+                self.calls += 1
+            raise self.error("flaky")
+        return super().generate_content(prompt, stream=stream, request_options=request_options)
+
+
+def make_client(model, **kwargs):
+    kwargs.setdefault('rate', 0)
+    kwargs.setdefault('timeout', 5)
+    kwargs.setdefault('backoff_base', 0.01)
+    kwargs.setdefault('backoff_max', 0.05)
+    kwargs.setdefault('breaker', CircuitBreaker(failure_threshold=10, reset_timeout=60))
+    return LLMClient(model=model, **kwargs)
+
+
+def test_generate_returns_text():
+    client = make_client(FakeGenerativeModel(reply="hello", latency=0))
+    assert client.generate("prompt") == "hello"
+    metrics = client.metrics()
+    assert metrics['successes'] == 1 and metrics['in_flight'] == 0
+
+
+def test_retryable_errors_are_retried_with_backoff():
+    model = FlakyModel(failures=2, reply="ok")
+    client = make_client(model, max_retries=3)
+    assert client.generate("prompt") == "ok"
+    assert model.calls == 3
+    assert client.metrics()['retries'] == 2
+
+
+def test_gives_up_after_max_retries():
+    model = FlakyModel(failures=100)
+    client = make_client(model, max_retries=2)
+    with pytest.raises(LLMError):
+        client.generate("prompt")
+    assert model.calls == 3
+    assert client.metrics()['failures'] == 1
+
+
+def test_non_retryable_errors_are_not_retried():
+    model = FlakyModel(failures=1, error=google_exceptions.InvalidArgument)
+    client = make_client(model, max_retries=3)
+    with pytest.raises(LLMError):
+        client.generate("prompt")
+    assert model.calls == 1
+    assert client.breaker.state == 'closed'
+
+
+def test_call_deadline_is_enforced():
+    client = make_client(FakeGenerativeModel(latency=2), max_retries=5)
+    started = time.monotonic()
+    with pytest.raises(LLMError):
+        client.generate("prompt", timeout=0.3)
+    assert time.monotonic() - started < 1.5
+    assert client.metrics()['timeouts'] >= 1
+
+
+def test_breaker_opens_and_rejects_without_calling_the_model():
+    model = FlakyModel(failures=100)
+    client = make_client(model, max_retries=0, breaker=CircuitBreaker(failure_threshold=2, reset_timeout=60))
+    for _ in range(2):
+        with pytest.raises(LLMError):
+            client.generate("prompt")
+    assert client.breaker.state == 'open'
+
+    with pytest.raises(LLMUnavailable):
+        client.generate("prompt")
+    assert model.calls == 2
+    assert client.metrics()['rejected'] == 1
+
+
+def test_half_open_lets_one_trial_through_and_closes_on_success():
+    model = FakeGenerativeModel(reply="ok", latency=0.3)
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.1)
+    client = make_client(model, breaker=breaker)
+    breaker.record_failure()
+    assert breaker.state == 'open'
+    time.sleep(0.15)
+    assert breaker.state == 'half_open'
+
+    results = {}
+    trial = threading.Thread(target=lambda: results.setdefault('trial', client.generate("prompt")))
+    trial.start()
+    time.sleep(0.1)  # Trial call is in flight
+    with pytest.raises(LLMUnavailable):
+        client.generate("prompt")
+    trial.join()
+
+    assert results['trial'] == "ok"
+    assert breaker.state == 'closed'
+    assert model.calls == 1
+
+
+def test_half_open_trial_reopens_on_failure():
+    model = FlakyModel(failures=1)
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.1)
+    client = make_client(model, max_retries=3, breaker=breaker)
+    breaker.record_failure()
+    time.sleep(0.15)
+    with pytest.raises(LLMError):
+        client.generate("prompt")
+    assert breaker.state == 'open'
+    assert model.calls == 1
+
+
+def test_only_the_trial_call_frees_the_trial_slot():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+    assert breaker.allow() == (True, None)
+    breaker.record_failure()
+
+    allowed, trial = breaker.allow()
+    assert allowed and trial is not None
+
+    # A call admitted before the breaker opened ends: the trial keeps its slot
+    breaker.release(None)
+    assert breaker.allow() == (False, None)
+
+    breaker.release(trial)
+    allowed, next_trial = breaker.allow()
+    assert allowed and next_trial != trial
+
+
+def test_stream_yields_chunks():
+    text = "one two three four five six seven eight nine ten"
+    client = make_client(FakeGenerativeModel(reply=text, latency=0))
+    assert "".join(client.stream("prompt")) == text
+    assert client.metrics()['in_flight'] == 0
@@ -0,0 +1,92 @@
+import os
+import threading
+
+import pytest
+
+from llm_client import FakeGenerativeModel, LLMClient
+from rag_pipeline import DAADCourseRAG
+
+SEARCH_RESULTS = {
+    'ids': [["course-1", "course-2"]],
+    'metadatas': [[{'content_hash': "hash-1"}, {'content_hash': "hash-2"}]],
+}
+
+
+def make_rag(tmp_path, model_name="fake", **kwargs):
+    llm = LLMClient(model=FakeGenerativeModel(latency=0), model_name=model_name, rate=0)
+    return DAADCourseRAG(db_path=str(tmp_path / "chroma"), answer_cache_path=None,
+                         embedding_model="hashing", llm_client=llm, **kwargs)
+
+
+@pytest.fixture
+def rag(tmp_path):
+    return make_rag(tmp_path)
+
+
+def test_answer_cache_key_ignores_query_formatting(rag):
+    assert (rag.answer_cache_key("Data Science in Berlin?", SEARCH_RESULTS)
+            == rag.answer_cache_key("  data science in berlin? ", SEARCH_RESULTS))
+
+
+@pytest.mark.parametrize("change", [
+    {'model_name': "other-model"},
+    {'context_token_budget': 500},
+    {'context_max_distance': 0.5},
+    {'search_mode': "hybrid"},
+])
+def test_answer_cache_key_covers_prompt_settings(tmp_path, rag, change):
+    other = make_rag(tmp_path / "other", **change)
+    assert rag.answer_cache_key("query", SEARCH_RESULTS) != other.answer_cache_key("query", SEARCH_RESULTS)
+
+
+def test_answer_cache_key_covers_per_request_mode(rag):
+    assert (rag.answer_cache_key("query", SEARCH_RESULTS, mode="lexical")
+            != rag.answer_cache_key("query", SEARCH_RESULTS, mode="vector"))
+    assert rag.answer_cache_key("query", SEARCH_RESULTS) == rag.answer_cache_key("query", SEARCH_RESULTS, mode="vector")
+
+
+def test_answer_cache_key_covers_course_content(rag):
+    edited = dict(SEARCH_RESULTS, metadatas=[[{'content_hash': "hash-1"}, {'content_hash': "edited"}]])
+    assert rag.answer_cache_key("query", SEARCH_RESULTS) != rag.answer_cache_key("query", edited)
+
+
+def write_course_csv(folder, rows=1):
+    folder.mkdir(exist_ok=True)
+    lines = ["course,university,url"] + [f"Course {i},Uni,https://example.org/{i}" for i in range(rows)]
+    (folder / "courses.csv").write_text("\n".join(lines) + "\n")
+
+
+@pytest.fixture
+def synced(tmp_path, monkeypatch, rag):
+    """Counts sync_courses_to_db calls, with course CSVs in the working directory"""
+    monkeypatch.chdir(tmp_path)
+    write_course_csv(tmp_path / "Masters")
+    calls = []
+    monkeypatch.setattr(rag, "sync_courses_to_db", lambda: calls.append(1) or {'added': 1})
+    return calls
+
+
+def test_sync_courses_once_skips_unchanged_csv_files(tmp_path, rag, synced):
+    assert rag.sync_courses_once() == {'added': 1}
+    assert rag.sync_courses_once() is None
+    assert len(synced) == 1
+
+    write_course_csv(tmp_path / "Masters", rows=2)
+    assert rag.sync_courses_once() == {'added': 1}
+    assert len(synced) == 2
+
+
+def test_sync_courses_once_waits_for_the_process_holding_the_lock(rag, synced):
+    fcntl = pytest.importorskip("fcntl")
+    outcome = {}
+    with open(os.path.join(rag.db_path, "courses_sync.lock"), "a+") as other_process:
+        fcntl.flock(other_process, fcntl.LOCK_EX)
+        thread = threading.Thread(target=lambda: outcome.update(result=rag.sync_courses_once()))
+        thread.start()
+        thread.join(0.5)
+        assert thread.is_alive()
+        fcntl.flock(other_process, fcntl.LOCK_UN)
+    thread.join(5)
+
+    assert outcome == {'result': None}
+    assert synced == []
@@ -0,0 +1,30 @@
+import pytest
+
+from session_store import MemorySessionStore, SessionStore, SQLiteSessionStore, create_session_store
+
+
+def test_incomplete_backend_fails_at_instantiation():
+    class Incomplete(SessionStore):
+        def get(self, user_id, default=None):
+            return default
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+@pytest.mark.parametrize("backend", ["memory", "sqlite"])
+def test_backends_round_trip(backend, tmp_path):
+    kwargs = {'path': str(tmp_path / "sessions.sqlite3")} if backend == "sqlite" else {}
+    store = create_session_store(backend, max_sessions=10, ttl=60, **kwargs)
+    assert isinstance(store, (MemorySessionStore, SQLiteSessionStore))
+
+    store.set(42, {'profile': {'name': 'A'}, 'countries': ['Germany']})
+    assert store.get("42") == {'profile': {'name': 'A'}, 'countries': ['Germany']}
+    store.delete(42)
+    assert store.get(42, 'missing') == 'missing'
+    assert store.stats()['backend'] == backend
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        create_session_store("redis")
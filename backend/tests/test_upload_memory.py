@@ -0,0 +1,32 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from benchmark import synthetic_pdf
+from document_parser import MAX_REQUEST_BYTES
+from tests.support import upload_memory_run
+
+resource = pytest.importorskip("resource")
+
+CONCURRENCY = 4
+
+
+def test_spooled_uploads_bound_peak_rss(tmp_path):
+    # Uploads as large as a request may be
+    paths = []
+    for i in range(CONCURRENCY):
+        path = os.path.join(tmp_path, f"upload_{i}.pdf")
+        with open(path, 'wb') as f:
+            f.write(synthetic_pdf(20, seed=i, padding_bytes=MAX_REQUEST_BYTES - 64 * 1024))
+        paths.append(path)
+
+    # Fresh process so ru_maxrss starts from a clean baseline
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+        result = pool.submit(upload_memory_run, "spooled", paths, CONCURRENCY).result()
+
+    # Buffering the bodies would need CONCURRENCY * MAX_REQUEST_BYTES on top of the baseline
+    growth = (result['peak_rss_mb'] - result['baseline_rss_mb']) * 1024 * 1024
+    assert result['characters'] > 0
+    assert growth < CONCURRENCY * MAX_REQUEST_BYTES / 3
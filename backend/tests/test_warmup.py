@@ -0,0 +1,45 @@
+import os
+import time
+
+import pytest
+
+from warmup import ComponentWarmup, ComponentNotReady
+
+
+def test_get_waits_for_component():
+    warmup = ComponentWarmup(timeout=5)
+    warmup.register('slow', lambda: (time.sleep(0.1), 'value')[1])
+    assert warmup.get('slow') == 'value'
+    assert warmup.status()['ready']
+
+
+def test_failed_component_raises():
+    warmup = ComponentWarmup(timeout=5)
+    warmup.register('broken', lambda: 1 / 0)
+    with pytest.raises(ComponentNotReady):
+        warmup.get('broken')
+    assert warmup.status()['components']['broken']['state'] == 'failed'
+
+
+def test_status_starts_warmup():
+    warmup = ComponentWarmup(timeout=5)
+    warmup.register('value', lambda: 42)
+    assert warmup.status()['components']['value']['state'] in ('pending', 'loading', 'ready')
+    assert warmup.get('value') == 42
+
+
+@pytest.mark.skipif(not hasattr(os, 'fork'), reason="needs os.fork")
+def test_forked_process_warms_up_again():
+    warmup = ComponentWarmup(timeout=5)
+    warmup.register('pid', lambda: (time.sleep(0.3), os.getpid())[1])
+    warmup.start()
+    time.sleep(0.05)  # Fork while the parent is still loading
+
+    pid = os.fork()
+    if pid == 0:
+        ok = warmup.get('pid') == os.getpid()
+        os._exit(0 if ok else 1)
+    _, status = os.waitpid(pid, 0)
+
+    assert os.waitstatus_to_exitcode(status) == 0
+    assert warmup.get('pid') == os.getpid()
@@ -0,0 +1,119 @@
+import os
+import threading
+import time
+import traceback
+
+
+class ComponentNotReady(Exception):
+    """Raised when a component is still warming up (or failed to load)"""
+
+
+class ComponentWarmup:
+    """
+    Build heavy components (models, vector DB) on a background thread
+
+    Steps run in registration order. Callers use get(name), which blocks
+    until that step has finished, so early requests wait instead of crashing.
+
+    Warm-up belongs to the process that started it: a process forked after
+    start() (e.g. gunicorn --preload workers) does not inherit the thread, so
+    it starts its own warm-up on first get()/status().
+    """
+
+    def __init__(self, timeout=120):
+        """
+        Args:
+            timeout: Default seconds get() waits for a component
+        """
+        self.timeout = timeout
+        self._steps = []
+        self._state = {}
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+        self.started_at = None
+        self.finished_at = None
+
+    def register(self, name, factory):
+        """Add a step; factory() returns the component (later steps may call get())"""
+        self._steps.append((name, factory))
+        self._state[name] = self._new_step()
+
+    @staticmethod
+    def _new_step():
+        return {
+            'state': 'pending',
+            'seconds': None,
+            'error': None,
+            'value': None,
+            'event': threading.Event()
+        }
+
+    def start(self):
+        """Start warming up in a daemon thread (no-op if already started in this process)"""
+        with self._lock:
+            pid = os.getpid()
+            if self._pid == pid:
+                return
+            if self._pid is not None:
+                # Forked after the parent started: its thread is gone, start over
+                self._state = {name: self._new_step() for name, _ in self._steps}
+                self.finished_at = None
+            self._pid = pid
+            self.started_at = time.time()
+            self._thread = threading.Thread(target=self._run, name="warmup", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        for name, factory in self._steps:
+            step = self._state[name]
+            step['state'] = 'loading'
+            print(f"🔥 Warming up {name}...")
+            started = time.perf_counter()
+            try:
+                step['value'] = factory()
+                step['state'] = 'ready'
+                print(f"✅ {name} ready in {time.perf_counter() - started:.1f}s")
+            except Exception as e:
+                step['state'] = 'failed'
+                step['error'] = str(e)
+                print(f"❌ Failed to load {name}: {e}")
+                traceback.print_exc()
+            finally:
+                step['seconds'] = round(time.perf_counter() - started, 3)
+                step['event'].set()
+        self.finished_at = time.time()
+
+    def get(self, name, timeout=None):
+        """
+        Return a component, waiting for its warm-up step to finish
+
+        Raises:
+            ComponentNotReady: if it is not ready within timeout or failed to load
+        """
+        self.start()
+        step = self._state[name]
+        if not step['event'].wait(self.timeout if timeout is None else timeout):
+            raise ComponentNotReady(f"{name} is still loading")
+        if step['state'] != 'ready':
+            raise ComponentNotReady(f"{name} failed to load: {step['error']}")
+        return step['value']
+
+    def is_ready(self):
+        """True once every step finished successfully"""
+        return all(step['state'] == 'ready' for step in self._state.values())
+
+    def status(self):
+        """Readiness report with per-component state and warm-up timings"""
+        self.start()
+        total = None
+        if self.started_at is not None:
+            total = round((self.finished_at or time.time()) - self.started_at, 3)
+        return {
+            'ready': self.is_ready(),
+            'warmup_seconds': total,
+            'components': {
+                name: {key: step[key] for key in ('state', 'seconds', 'error')}
+                for name, step in self._state.items()
+            }
+        }